@@ -25,6 +25,10 @@ from app.models import (
     sale,
     inventory,
     audit_log,
+    stock,
+    alert,
+    medicine_database,
+    stock_ledger,
 )
 
 # Alembic Config
@@ -0,0 +1,53 @@
+"""Add inventory alerts and alert thresholds
+
+Revision ID: 038e1e024098
+Revises: 13c734142242
+Create Date: 2026-10-18 10:03:17.284511
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '038e1e024098'
+down_revision: Union[str, None] = '13c734142242'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('medications', sa.Column('low_stock_threshold', sa.Integer(), nullable=True))
+    op.add_column('medications', sa.Column('expiry_alert_days', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_inventory_items_expiration_date'), 'inventory_items', ['expiration_date'], unique=False)
+    op.create_table('inventory_alerts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('priority', sa.String(length=20), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.String(length=500), nullable=False),
+    sa.Column('medication_id', sa.Integer(), nullable=False),
+    sa.Column('inventory_item_id', sa.Integer(), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.Column('time', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['inventory_item_id'], ['inventory_items.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['medication_id'], ['medications.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inventory_alerts_id'), 'inventory_alerts', ['id'], unique=False)
+    op.create_index('ix_inventory_alerts_type_medication', 'inventory_alerts', ['type', 'medication_id'], unique=False)
+    op.create_index('ix_inventory_alerts_inventory_item_id', 'inventory_alerts', ['inventory_item_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_inventory_alerts_inventory_item_id', table_name='inventory_alerts')
+    op.drop_index('ix_inventory_alerts_type_medication', table_name='inventory_alerts')
+    op.drop_index(op.f('ix_inventory_alerts_id'), table_name='inventory_alerts')
+    op.drop_table('inventory_alerts')
+    op.drop_index(op.f('ix_inventory_items_expiration_date'), table_name='inventory_items')
+    op.drop_column('medications', 'expiry_alert_days')
+    op.drop_column('medications', 'low_stock_threshold')
@@ -0,0 +1,36 @@
+"""Add indexes for sales listing
+
+Revision ID: 12ff90211a0d
+Revises: 038e1e024098
+Create Date: 2026-10-18 11:20:45.906132
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '12ff90211a0d'
+down_revision: Union[str, None] = '038e1e024098'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_sales_created_at_id', 'sales', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sales_patient_id_created_at', 'sales', ['patient_id', 'created_at'], unique=False)
+    op.create_index('ix_sales_payment_status_created_at', 'sales', ['payment_status', 'created_at'], unique=False)
+    op.create_index('ix_sales_payment_method_created_at', 'sales', ['payment_method', 'created_at'], unique=False)
+    op.create_index(op.f('ix_sale_items_sale_id'), 'sale_items', ['sale_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_sale_items_sale_id'), table_name='sale_items')
+    op.drop_index('ix_sales_payment_method_created_at', table_name='sales')
+    op.drop_index('ix_sales_payment_status_created_at', table_name='sales')
+    op.drop_index('ix_sales_patient_id_created_at', table_name='sales')
+    op.drop_index('ix_sales_created_at_id', table_name='sales')
@@ -0,0 +1,58 @@
+"""Add medication_stock projection
+
+Revision ID: 13c734142242
+Revises: 17395bf764f3
+Create Date: 2026-10-18 09:12:41.530214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '13c734142242'
+down_revision: Union[str, None] = '17395bf764f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('medication_stock',
+    sa.Column('medication_id', sa.Integer(), nullable=False),
+    sa.Column('total_quantity', sa.Integer(), nullable=False),
+    sa.Column('batches', sa.JSON(), nullable=False),
+    sa.Column('earliest_expiry', sa.DateTime(), nullable=True),
+    sa.Column('last_purchase_price', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['medication_id'], ['medications.id'], ),
+    sa.PrimaryKeyConstraint('medication_id')
+    )
+
+    # Backfill from existing inventory batches
+    op.execute("""
+        INSERT INTO medication_stock
+            (medication_id, total_quantity, batches, earliest_expiry, last_purchase_price, updated_at)
+        SELECT
+            i.fhir_medication_id,
+            SUM(i.stock_quantity),
+            json_agg(json_build_object(
+                'inventory_item_id', i.id,
+                'batch_number', i.batch_number,
+                'supplier_id', i.supplier_id,
+                'quantity', i.stock_quantity,
+                'expiration_date', to_char(i.expiration_date, 'YYYY-MM-DD"T"HH24:MI:SS')
+            ) ORDER BY i.purchase_date),
+            MIN(i.expiration_date) FILTER (WHERE i.stock_quantity > 0),
+            (array_agg(i.purchase_price ORDER BY i.purchase_date DESC))[1],
+            now()
+        FROM inventory_items i
+        GROUP BY i.fhir_medication_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('medication_stock')
@@ -0,0 +1,45 @@
+"""Add medicine_database table
+
+Revision ID: 30d5f4400249
+Revises: ce037d945e66
+Create Date: 2026-10-19 09:12:37.552190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '30d5f4400249'
+down_revision: Union[str, None] = 'ce037d945e66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('medicine_database',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('active_ingredient', sa.String(), nullable=True),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('manufacturer', sa.String(), nullable=True),
+    sa.Column('dosage_form', sa.String(), nullable=True),
+    sa.Column('effects', sa.String(), nullable=True),
+    sa.Column('ai_classification', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_medicine_database_id'), 'medicine_database', ['id'], unique=False)
+    op.create_index(op.f('ix_medicine_database_name'), 'medicine_database', ['name'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_medicine_database_name'), table_name='medicine_database')
+    op.drop_index(op.f('ix_medicine_database_id'), table_name='medicine_database')
+    op.drop_table('medicine_database')
@@ -0,0 +1,28 @@
+"""Add version column to inventory_items for optimistic locking
+
+Revision ID: 4b7e2d9c1a6f
+Revises: 30d5f4400249
+Create Date: 2026-10-19 09:12:37.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2d9c1a6f'
+down_revision: Union[str, None] = '30d5f4400249'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('inventory_items', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('inventory_items', 'version')
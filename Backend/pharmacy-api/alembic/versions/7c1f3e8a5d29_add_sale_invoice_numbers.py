@@ -0,0 +1,72 @@
+"""Enforce globally unique sale invoice numbers
+
+Revision ID: 7c1f3e8a5d29
+Revises: e2a7c4f90b16
+Create Date: 2026-10-19 17:22:45.693018
+
+Since sales is partitioned, its unique index can only cover
+(invoice_number, created_at). Invoice numbers are claimed in the
+unpartitioned sale_invoice_numbers table instead, by a trigger on sales, so
+a duplicate fails the sale's INSERT whatever path it comes from.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f3e8a5d29'
+down_revision: Union[str, None] = 'e2a7c4f90b16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'sale_invoice_numbers',
+        sa.Column('invoice_number', sa.String(), nullable=False),
+        sa.Column('sale_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('invoice_number'),
+    )
+    # Fails on invoice numbers duplicated since sales was partitioned; fix those first
+    op.execute("""
+        INSERT INTO sale_invoice_numbers (invoice_number, sale_id, created_at)
+        SELECT invoice_number, id, created_at FROM sales WHERE invoice_number IS NOT NULL
+    """)
+
+    op.execute("""
+        CREATE FUNCTION sales_claim_invoice_number() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.invoice_number IS NOT NULL THEN
+                DELETE FROM sale_invoice_numbers WHERE invoice_number = OLD.invoice_number;
+            END IF;
+            IF NEW.invoice_number IS NOT NULL THEN
+                INSERT INTO sale_invoice_numbers (invoice_number, sale_id, created_at)
+                VALUES (NEW.invoice_number, NEW.id, NEW.created_at);
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER sales_claim_invoice_number_insert
+        AFTER INSERT ON sales
+        FOR EACH ROW EXECUTE FUNCTION sales_claim_invoice_number()
+    """)
+    op.execute("""
+        CREATE TRIGGER sales_claim_invoice_number_update
+        AFTER UPDATE OF invoice_number ON sales
+        FOR EACH ROW WHEN (OLD.invoice_number IS DISTINCT FROM NEW.invoice_number)
+        EXECUTE FUNCTION sales_claim_invoice_number()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER sales_claim_invoice_number_update ON sales")
+    op.execute("DROP TRIGGER sales_claim_invoice_number_insert ON sales")
+    op.execute("DROP FUNCTION sales_claim_invoice_number()")
+    op.drop_table('sale_invoice_numbers')
@@ -0,0 +1,101 @@
+"""Add append-only stock ledger and per-batch snapshots
+
+Revision ID: 9e3f61c0b8d2
+Revises: 4b7e2d9c1a6f
+Create Date: 2026-10-19 11:40:06.218553
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3f61c0b8d2'
+down_revision: Union[str, None] = '4b7e2d9c1a6f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_movements',
+        sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+        sa.Column('occurred_at', sa.DateTime(), nullable=False),
+        sa.Column('movement_type', sa.String(length=30), nullable=False),
+        sa.Column('medication_id', sa.Integer(), nullable=False),
+        sa.Column('inventory_item_id', sa.Integer(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('balance_after', sa.Integer(), nullable=True),
+        sa.Column('reference_type', sa.String(length=30), nullable=True),
+        sa.Column('reference_id', sa.String(length=64), nullable=True),
+        # occurred_at is part of the key so the table can be range-partitioned by month
+        sa.PrimaryKeyConstraint('id', 'occurred_at'),
+    )
+    op.create_index('ix_stock_movements_occurred_at', 'stock_movements', ['occurred_at'], unique=False)
+    op.create_index('ix_stock_movements_inventory_item_occurred_at', 'stock_movements', ['inventory_item_id', 'occurred_at'], unique=False)
+    op.create_index('ix_stock_movements_medication_occurred_at', 'stock_movements', ['medication_id', 'occurred_at'], unique=False)
+    op.create_index('ix_stock_movements_reference', 'stock_movements', ['reference_type', 'reference_id'], unique=False)
+
+    op.create_table(
+        'stock_snapshots',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(), nullable=False),
+        sa.Column('medication_id', sa.Integer(), nullable=False),
+        sa.Column('inventory_item_id', sa.Integer(), nullable=True),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_stock_snapshots_taken_at_medication', 'stock_snapshots', ['taken_at', 'medication_id'], unique=False)
+
+    # Append-only: corrections are new movements, never edits
+    op.execute("""
+        CREATE FUNCTION stock_movements_append_only() RETURNS trigger AS $$
+        BEGIN
+            RAISE EXCEPTION 'stock_movements is append-only (% rejected)', TG_OP;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER stock_movements_append_only
+        BEFORE UPDATE OR DELETE ON stock_movements
+        FOR EACH ROW EXECUTE FUNCTION stock_movements_append_only()
+    """)
+
+    # Opening balances, so the ledger sums to the current stock: one movement
+    # per batch, plus each medication's unbatched remainder
+    op.execute("""
+        INSERT INTO stock_movements
+            (occurred_at, movement_type, medication_id, inventory_item_id, quantity, balance_after, reference_type, reference_id)
+        SELECT now() AT TIME ZONE 'utc', 'opening', fhir_medication_id, id, stock_quantity, stock_quantity,
+               'inventory_item', id::text
+        FROM inventory_items
+        WHERE stock_quantity <> 0
+    """)
+    op.execute("""
+        INSERT INTO stock_movements (occurred_at, movement_type, medication_id, quantity)
+        SELECT now() AT TIME ZONE 'utc', 'opening', ms.medication_id,
+               ms.total_quantity - COALESCE(batches.quantity, 0)
+        FROM medication_stock ms
+        LEFT JOIN (
+            SELECT fhir_medication_id, SUM(stock_quantity) AS quantity
+            FROM inventory_items
+            GROUP BY fhir_medication_id
+        ) batches ON batches.fhir_medication_id = ms.medication_id
+        WHERE ms.total_quantity - COALESCE(batches.quantity, 0) <> 0
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER stock_movements_append_only ON stock_movements")
+    op.execute("DROP FUNCTION stock_movements_append_only()")
+    op.drop_index('ix_stock_snapshots_taken_at_medication', table_name='stock_snapshots')
+    op.drop_table('stock_snapshots')
+    op.drop_index('ix_stock_movements_reference', table_name='stock_movements')
+    op.drop_index('ix_stock_movements_medication_occurred_at', table_name='stock_movements')
+    op.drop_index('ix_stock_movements_inventory_item_occurred_at', table_name='stock_movements')
+    op.drop_index('ix_stock_movements_occurred_at', table_name='stock_movements')
+    op.drop_table('stock_movements')
@@ -0,0 +1,252 @@
+"""Partition sales, sale_items and stock_audit_logs by month
+
+Revision ID: b5d18a7e4c03
+Revises: 9e3f61c0b8d2
+Create Date: 2026-10-19 14:05:52.870341
+
+Each table is rebuilt as a RANGE-partitioned parent with one partition per
+month, from the oldest existing row up to PARTITION_PREMAKE_MONTHS ahead;
+the application keeps creating future months (app.core.partitions). The
+rows are copied, so this takes an exclusive lock on the three tables for the
+duration of the copy: run it in a maintenance window. Needs PostgreSQL 12+
+(14+ for non-blocking detach of old months).
+
+Postgres requires the partition key in every unique constraint, so:
+- sales: primary key (id, created_at), invoice_number unique per (invoice_number, created_at)
+- sale_items: gets sale_created_at (its sale's created_at), primary key
+  (id, sale_created_at) and a foreign key (sale_id, sale_created_at) -> sales
+- stock_audit_logs: timestamp becomes NOT NULL, primary key (id, timestamp)
+"""
+import os
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d18a7e4c03'
+down_revision: Union[str, None] = '9e3f61c0b8d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PREMAKE_MONTHS = int(os.getenv("PARTITION_PREMAKE_MONTHS", "3"))
+
+# table -> (partition key, column definitions, copy SELECT from the old table)
+TABLES = {
+    "sales": ("created_at", """
+        id integer NOT NULL DEFAULT nextval('sales_id_seq'),
+        invoice_number varchar,
+        date timestamp without time zone,
+        created_at timestamp without time zone NOT NULL,
+        organization_id integer REFERENCES organizations (id),
+        customer_name varchar,
+        patient_id integer REFERENCES patients (id),
+        payment_method varchar,
+        payment_status varchar,
+        total_amount double precision,
+        status varchar,
+        CONSTRAINT sales_pkey PRIMARY KEY (id, created_at)
+    """, """
+        SELECT id, invoice_number, date, COALESCE(created_at, date, now() AT TIME ZONE 'utc'), organization_id,
+               customer_name, patient_id, payment_method, payment_status, total_amount, status
+        FROM sales_unpartitioned
+    """),
+    "sale_items": ("sale_created_at", """
+        id integer NOT NULL DEFAULT nextval('sale_items_id_seq'),
+        sequence integer,
+        charge_item json,
+        price_component json,
+        sale_id integer,
+        sale_created_at timestamp without time zone NOT NULL,
+        medication_id integer REFERENCES medications (id),
+        inventory_item_id integer REFERENCES inventory_items (id),
+        organization_id integer REFERENCES organizations (id),
+        quantity integer,
+        unit_price double precision,
+        total_price double precision,
+        CONSTRAINT sale_items_pkey PRIMARY KEY (id, sale_created_at),
+        CONSTRAINT sale_items_sale_fkey FOREIGN KEY (sale_id, sale_created_at) REFERENCES sales (id, created_at)
+    """, """
+        SELECT si.id, si.sequence, si.charge_item, si.price_component, s.id,
+               COALESCE(s.created_at, now() AT TIME ZONE 'utc'), si.medication_id, si.inventory_item_id,
+               si.organization_id, si.quantity, si.unit_price, si.total_price
+        FROM sale_items_unpartitioned si
+        LEFT JOIN sales s ON s.id = si.sale_id
+    """),
+    "stock_audit_logs": ("timestamp", """
+        id integer NOT NULL DEFAULT nextval('stock_audit_logs_id_seq'),
+        action varchar NOT NULL,
+        inventory_item_id integer,
+        quantity_changed integer NOT NULL,
+        performed_by varchar NOT NULL,
+        details json,
+        timestamp timestamp without time zone NOT NULL DEFAULT now(),
+        CONSTRAINT stock_audit_logs_pkey PRIMARY KEY (id, timestamp)
+    """, """
+        SELECT id, action, inventory_item_id, quantity_changed, performed_by, details,
+               COALESCE(timestamp, now() AT TIME ZONE 'utc')
+        FROM stock_audit_logs_unpartitioned
+    """),
+}
+
+INDEXES = {
+    "sales": {
+        "ix_sales_id": "(id)",
+        "ix_sales_invoice_number": "(invoice_number, created_at)",
+        "ix_sales_created_at_id": "(created_at, id)",
+        "ix_sales_patient_id_created_at": "(patient_id, created_at)",
+        "ix_sales_payment_status_created_at": "(payment_status, created_at)",
+        "ix_sales_payment_method_created_at": "(payment_method, created_at)",
+    },
+    "sale_items": {
+        "ix_sale_items_id": "(id)",
+        "ix_sale_items_sale_id": "(sale_id)",
+    },
+    "stock_audit_logs": {
+        "ix_stock_audit_logs_id": "(id)",
+        "ix_stock_audit_logs_timestamp": "(timestamp)",
+    },
+}
+UNIQUE_INDEXES = {"ix_sales_invoice_number"}
+
+
+def _add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _set_aside(table: str) -> None:
+    """Rename the current table out of the way and release its names (indexes, key, sequence)."""
+    conn = op.get_bind()
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+    op.execute(f"ALTER TABLE {table}_unpartitioned RENAME CONSTRAINT {table}_pkey TO {table}_unpartitioned_pkey")
+    indexes = conn.execute(sa.text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :table AND indexname NOT LIKE '%pkey'"
+    ), {"table": f"{table}_unpartitioned"}).scalars().all()
+    for name in indexes:
+        op.execute(f"DROP INDEX {name}")
+    # Keep the id sequence when the old table is dropped
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+
+
+def _create_partitioned(table: str, first_month: date, last_month: date) -> None:
+    key, columns, copy_select = TABLES[table]
+    op.execute(f"CREATE TABLE {table} ({columns}) PARTITION BY RANGE ({key})")
+    op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+    month = first_month
+    while month <= last_month:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_add_months(month, 1).isoformat()}')"
+        )
+        month = _add_months(month, 1)
+    for name, columns in INDEXES[table].items():
+        op.execute(f"CREATE {'UNIQUE ' if name in UNIQUE_INDEXES else ''}INDEX {name} ON {table} {columns}")
+    op.execute(f"INSERT INTO {table} {copy_select}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    oldest = conn.execute(sa.text("""
+        SELECT min(value) FROM (
+            SELECT min(COALESCE(created_at, date)) AS value FROM sales
+            UNION ALL SELECT min(timestamp) FROM stock_audit_logs
+        ) oldest
+    """)).scalar()
+    today = date.today()
+    first_month = date((oldest or today).year, (oldest or today).month, 1)
+    last_month = _add_months(date(today.year, today.month, 1), PREMAKE_MONTHS)
+
+    op.execute("ALTER TABLE sale_items DROP CONSTRAINT IF EXISTS sale_items_sale_id_fkey")
+    for table in TABLES:
+        _set_aside(table)
+    # Parents first: the sale_items copy reads sale dates from the new sales table
+    for table in TABLES:
+        _create_partitioned(table, first_month, last_month)
+    for table in reversed(list(TABLES)):
+        op.execute(f"DROP TABLE {table}_unpartitioned")
+    for table in TABLES:
+        op.execute(f"ANALYZE {table}")
+
+
+def downgrade() -> None:
+    """Downgrade schema (detached months are not brought back)."""
+    for table in reversed(list(TABLES)):
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitioned")
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY NONE")
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table}_partitioned RENAME CONSTRAINT {table}_pkey TO {table}_partitioned_pkey")
+    for indexes in INDEXES.values():
+        for name in indexes:
+            op.execute(f"DROP INDEX {name}")
+
+    op.execute("""
+        CREATE TABLE sales (
+            id integer NOT NULL DEFAULT nextval('sales_id_seq') PRIMARY KEY,
+            invoice_number varchar,
+            date timestamp without time zone,
+            created_at timestamp without time zone,
+            organization_id integer REFERENCES organizations (id),
+            customer_name varchar,
+            patient_id integer REFERENCES patients (id),
+            payment_method varchar,
+            payment_status varchar,
+            total_amount double precision,
+            status varchar
+        )
+    """)
+    op.execute("""
+        INSERT INTO sales SELECT id, invoice_number, date, created_at, organization_id, customer_name,
+                                 patient_id, payment_method, payment_status, total_amount, status
+        FROM sales_partitioned
+    """)
+    op.execute("""
+        CREATE TABLE sale_items (
+            id integer NOT NULL DEFAULT nextval('sale_items_id_seq') PRIMARY KEY,
+            sequence integer,
+            charge_item json,
+            price_component json,
+            sale_id integer REFERENCES sales (id),
+            medication_id integer REFERENCES medications (id),
+            inventory_item_id integer REFERENCES inventory_items (id),
+            organization_id integer REFERENCES organizations (id),
+            quantity integer,
+            unit_price double precision,
+            total_price double precision
+        )
+    """)
+    op.execute("""
+        INSERT INTO sale_items SELECT id, sequence, charge_item, price_component, sale_id, medication_id,
+                                      inventory_item_id, organization_id, quantity, unit_price, total_price
+        FROM sale_items_partitioned
+    """)
+    op.execute("""
+        CREATE TABLE stock_audit_logs (
+            id integer NOT NULL DEFAULT nextval('stock_audit_logs_id_seq') PRIMARY KEY,
+            action varchar NOT NULL,
+            inventory_item_id integer,
+            quantity_changed integer NOT NULL,
+            performed_by varchar NOT NULL,
+            details json,
+            timestamp timestamp without time zone
+        )
+    """)
+    op.execute("INSERT INTO stock_audit_logs SELECT * FROM stock_audit_logs_partitioned")
+
+    for table in reversed(list(TABLES)):
+        op.execute(f"DROP TABLE {table}_partitioned")
+    for table in TABLES:
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+
+    op.create_index(op.f('ix_sales_id'), 'sales', ['id'], unique=False)
+    op.create_index(op.f('ix_sales_invoice_number'), 'sales', ['invoice_number'], unique=True)
+    op.create_index('ix_sales_created_at_id', 'sales', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sales_patient_id_created_at', 'sales', ['patient_id', 'created_at'], unique=False)
+    op.create_index('ix_sales_payment_status_created_at', 'sales', ['payment_status', 'created_at'], unique=False)
+    op.create_index('ix_sales_payment_method_created_at', 'sales', ['payment_method', 'created_at'], unique=False)
+    op.create_index(op.f('ix_sale_items_id'), 'sale_items', ['id'], unique=False)
+    op.create_index(op.f('ix_sale_items_sale_id'), 'sale_items', ['sale_id'], unique=False)
+    op.create_index(op.f('ix_stock_audit_logs_id'), 'stock_audit_logs', ['id'], unique=False)
@@ -0,0 +1,50 @@
+"""Add updated_at to patients and purchases and index it for bulk export
+
+Revision ID: ce037d945e66
+Revises: 12ff90211a0d
+Create Date: 2026-10-18 12:04:51.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ce037d945e66'
+down_revision: Union[str, None] = '12ff90211a0d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('patients', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.add_column('purchases', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # Existing rows count as changed now, so the next _since export picks them up
+    op.execute("UPDATE patients SET updated_at = now() AT TIME ZONE 'utc'")
+    op.execute("UPDATE purchases SET updated_at = now() AT TIME ZONE 'utc'")
+
+    op.create_index(op.f('ix_patients_updated_at'), 'patients', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_purchases_updated_at'), 'purchases', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_medications_updated_at'), 'medications', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_medication_dispenses_updated_at'), 'medication_dispenses', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_prescriptions_created_at'), 'prescriptions', ['created_at'], unique=False)
+    op.create_index(op.f('ix_prescriptions_updated_at'), 'prescriptions', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_inventory_items_created_at'), 'inventory_items', ['created_at'], unique=False)
+    op.create_index(op.f('ix_inventory_items_updated_at'), 'inventory_items', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_inventory_items_updated_at'), table_name='inventory_items')
+    op.drop_index(op.f('ix_inventory_items_created_at'), table_name='inventory_items')
+    op.drop_index(op.f('ix_prescriptions_updated_at'), table_name='prescriptions')
+    op.drop_index(op.f('ix_prescriptions_created_at'), table_name='prescriptions')
+    op.drop_index(op.f('ix_medication_dispenses_updated_at'), table_name='medication_dispenses')
+    op.drop_index(op.f('ix_medications_updated_at'), table_name='medications')
+    op.drop_index(op.f('ix_purchases_updated_at'), table_name='purchases')
+    op.drop_index(op.f('ix_patients_updated_at'), table_name='patients')
+    op.drop_column('purchases', 'updated_at')
+    op.drop_column('patients', 'updated_at')
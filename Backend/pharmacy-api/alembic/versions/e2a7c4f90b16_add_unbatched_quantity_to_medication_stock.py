@@ -0,0 +1,40 @@
+"""Add unbatched_quantity to medication_stock
+
+Revision ID: e2a7c4f90b16
+Revises: b5d18a7e4c03
+Create Date: 2026-10-19 16:41:08.215937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2a7c4f90b16'
+down_revision: Union[str, None] = 'b5d18a7e4c03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('medication_stock', sa.Column('unbatched_quantity', sa.Integer(), server_default='0', nullable=False))
+    # Same rule as rebuild_stock_on_hand: the ledger movements not tied to a batch
+    op.execute("""
+        UPDATE medication_stock ms
+        SET unbatched_quantity = unbatched.quantity
+        FROM (
+            SELECT medication_id, SUM(quantity) AS quantity
+            FROM stock_movements
+            WHERE inventory_item_id IS NULL
+            GROUP BY medication_id
+        ) unbatched
+        WHERE unbatched.medication_id = ms.medication_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('medication_stock', 'unbatched_quantity')
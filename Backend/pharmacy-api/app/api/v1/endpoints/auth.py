@@ -4,15 +4,17 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.auth import jwt_backend, get_user_manager
 from app.core.config import settings
+from app.core.security import get_password_hash_async
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserRead
 from app.core.verification import (
     generate_verification_code, 
-    store_verification_code, 
-    verify_code,
-    load_verification_data,
-    save_verification_data
+    store_verification_code,
+    store_pending_registration,
+    get_verification_code,
+    get_pending_registration,
+    clear_verification,
 )
 from app.utils.email_utils import send_email
 from typing import Dict
@@ -29,9 +31,6 @@ fastapi_users = FastAPIUsers[User, str](
     [jwt_backend],
 )
 
-# Load verification data from file
-verification_codes, pending_registrations = load_verification_data()
-
 class EmailRequest(BaseModel):
     email: str
 
@@ -56,16 +55,13 @@ async def register(user_data: UserCreate, background_tasks: BackgroundTasks, db:
     if result.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Email already registered and verified")
     
-    # Check if there's already a pending registration
-    if user_data.email in pending_registrations:
-        raise HTTPException(status_code=400, detail="A verification code has already been sent to this email. Please check your email or request a new code.")
-    
     # Generate verification code
     code = generate_verification_code()
     print(f"Generated verification code: {code}")
     
-    # Store verification code and user data
-    store_verification_code(user_data.email, code, user_data.dict())
+    # Store verification code and user data (atomic: fails if a registration is already pending)
+    if not await store_pending_registration(user_data.email, code, user_data.model_dump()):
+        raise HTTPException(status_code=400, detail="A verification code has already been sent to this email. Please check your email or request a new code.")
     print(f"Stored verification code for: {user_data.email}")
     
     # Send verification email
@@ -90,18 +86,16 @@ async def verify_registration(request: VerifyRequest, db: AsyncSession = Depends
     print(f"Verifying code for email: {request.email}")
     
     # Check if verification code exists and is valid
-    if request.email not in verification_codes:
+    stored = await get_verification_code(request.email)
+    if stored is None:
         raise HTTPException(status_code=400, detail="No pending verification found for this email")
     
-    stored_code, expiration = verification_codes[request.email]
+    stored_code, expiration = stored
     print(f"Stored code: {stored_code}, Provided code: {request.code}")
     
     # Check if code has expired
     if datetime.utcnow() > expiration:
-        del verification_codes[request.email]
-        if request.email in pending_registrations:
-            del pending_registrations[request.email]
-        save_verification_data(verification_codes, pending_registrations)
+        await clear_verification(request.email)
         raise HTTPException(status_code=400, detail="Verification code has expired")
     
     # Verify code
@@ -111,7 +105,9 @@ async def verify_registration(request: VerifyRequest, db: AsyncSession = Depends
     print("Code verified successfully")
     
     # Get user data from pending registrations
-    user_data, _ = pending_registrations[request.email]
+    user_data = await get_pending_registration(request.email)
+    if user_data is None:
+        raise HTTPException(status_code=400, detail="No pending registration found for this email")
     
     # Create user in database only after successful verification
     try:
@@ -132,10 +128,13 @@ async def verify_registration(request: VerifyRequest, db: AsyncSession = Depends
                 'use': 'mobile'
             })
         
+        # Hash the password off the event loop
+        hashed_password = await get_password_hash_async(user_data['password'])
+
         # Create user directly using SQLAlchemy
         user = User(
             email=user_data['email'],
-            hashed_password=user_data['password'],
+            hashed_password=hashed_password,
             is_active=True,
             is_superuser=False,
             is_verified=True,
@@ -145,7 +144,8 @@ async def verify_registration(request: VerifyRequest, db: AsyncSession = Depends
                 'second': user_data.get('second_name', '')
             },
             telecom=telecom,
-            birth_date=user_data.get('birthdate'),  # Map birthdate to birth_date
+            # Map birthdate to birth_date (stored as an ISO string in the shared state)
+            birth_date=datetime.fromisoformat(user_data['birthdate']) if user_data.get('birthdate') else None,
             identifier=generate_identifier(),  # Generate a unique identifier
             username=user_data['email'],  # Use email as username
             **filtered_data
@@ -157,22 +157,18 @@ async def verify_registration(request: VerifyRequest, db: AsyncSession = Depends
     except Exception as e:
         print(f"Error creating user: {e}")
         # If there's an error creating the user (e.g., email already exists), clean up verification data
-        del verification_codes[request.email]
-        del pending_registrations[request.email]
-        save_verification_data(verification_codes, pending_registrations)
+        await clear_verification(request.email)
         raise HTTPException(status_code=400, detail="Failed to create user. Please try registering again.")
     
     # Clean up temporary data
-    del verification_codes[request.email]
-    del pending_registrations[request.email]
-    save_verification_data(verification_codes, pending_registrations)
+    await clear_verification(request.email)
     
     return {"message": "Registration completed successfully. You can now login."}
 
 @router.post("/request-verification")
 async def request_verification(request: EmailRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     # Check if there's a pending registration
-    if request.email not in pending_registrations:
+    if await get_pending_registration(request.email) is None:
         # Check if email is already registered and verified
         stmt = select(User).where(User.email == request.email)
         result = await db.execute(stmt)
@@ -189,7 +185,7 @@ async def request_verification(request: EmailRequest, background_tasks: Backgrou
     code = generate_verification_code()
     
     # Update verification code
-    store_verification_code(request.email, code)
+    await store_verification_code(request.email, code)
     
     # Send new verification email
     background_tasks.add_task(
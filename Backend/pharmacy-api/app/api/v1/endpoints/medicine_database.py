@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List, Optional
-import pandas as pd
 from io import StringIO
-from app.core.deps import get_db
+from app.database import get_db
 from app.models.medicine_database import MedicineDatabase
-from app.core.ai import classify_medicine
+from app.schemas.medicine_database import MedicineOut
+from app.core.response_cache import response_cache
+from app.utils.serialization import ORMSerializer
 
 router = APIRouter()
 
+medicine_serializer = ORMSerializer(MedicineOut)
+
 @router.post("/upload")
 async def upload_medicine_database(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
+    # Heavy optional dependencies, only needed for uploads
+    import pandas as pd
+    from app.core.ai import classify_medicine
+
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="Only CSV files are allowed")
     
@@ -33,7 +41,7 @@ async def upload_medicine_database(
         # Process each row
         for _, row in df.iterrows():
             # Get AI classification for the medicine
-            classification = classify_medicine(row['name'])
+            classification = await classify_medicine(row['name'])
             
             # Create medicine entry
             medicine = MedicineDatabase(
@@ -49,29 +57,38 @@ async def upload_medicine_database(
             
             db.add(medicine)
         
-        db.commit()
+        await db.commit()
         return {"message": "Medicine database uploaded successfully"}
         
+    except HTTPException:
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/search")
-def search_medicines(
+@router.get("/search", response_model=List[MedicineOut])
+async def search_medicines(
     query: str = Query(..., min_length=1),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    medicines = db.query(MedicineDatabase).filter(
-        MedicineDatabase.name.ilike(f"%{query}%")
-    ).all()
-    return medicines
+    result = await db.execute(
+        select(MedicineDatabase).filter(MedicineDatabase.name.ilike(f"%{query}%"))
+    )
+    return medicine_serializer.list_response(result.scalars().all())
 
-@router.get("/{medicine_id}")
-def get_medicine(
+@router.get("/{medicine_id}", response_model=MedicineOut)
+async def get_medicine(
     medicine_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db)
 ):
-    medicine = db.query(MedicineDatabase).filter(MedicineDatabase.id == medicine_id).first()
+    tags = (f"medicine_database:{medicine_id}",)
+    cached = await response_cache.lookup(request, tags)
+    if cached is not None:
+        return cached
+
+    medicine = await db.get(MedicineDatabase, medicine_id)
     if not medicine:
         raise HTTPException(status_code=404, detail="Medicine not found")
-    return medicine 
\ No newline at end of file
+    response = medicine_serializer.response(medicine)
+    return await response_cache.store(request, response, tags)
@@ -1,5 +1,4 @@
 from typing import Dict
-import openai
 from app.core.config import settings
 
 async def classify_medicine(medicine_name: str) -> Dict:
@@ -8,6 +7,8 @@ async def classify_medicine(medicine_name: str) -> Dict:
     Returns a dictionary with classification results.
     """
     try:
+        import openai  # Heavy client, only needed when a classification is requested
+
         response = await openai.ChatCompletion.acreate(
             model="gpt-3.5-turbo",
             messages=[
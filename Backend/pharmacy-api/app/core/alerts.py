@@ -0,0 +1,212 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, delete, func, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.shared_state import WORKER_ID, shared_state
+from app.models.alert import InventoryAlert
+from app.models.inventory import InventoryItem
+from app.models.medication import Medication
+from app.models.stock import MedicationStock
+
+logger = logging.getLogger(__name__)
+
+
+def _expiry_alert(item: InventoryItem, medication: Medication, now: datetime) -> Optional[InventoryAlert]:
+    alert_days = medication.expiry_alert_days or settings.EXPIRY_ALERT_DAYS
+    if not item.stock_quantity or item.stock_quantity <= 0:
+        return None
+    if item.expiration_date > now + timedelta(days=alert_days):
+        return None
+
+    name = medication.code_display or "Medication"
+    days_left = (item.expiration_date - now).days
+    if item.expiration_date <= now:
+        priority, title = "critical", f"{name} batch expired"
+        description = f"Batch {item.batch_number} expired on {item.expiration_date:%Y-%m-%d} ({item.stock_quantity} units)"
+    else:
+        priority = "high" if days_left <= 30 else "medium"
+        title = f"{name} batch expiring soon"
+        description = f"Batch {item.batch_number} expires in {days_left} days ({item.stock_quantity} units)"
+
+    return InventoryAlert(
+        type="expiry",
+        priority=priority,
+        title=title,
+        description=description,
+        medication_id=medication.id,
+        inventory_item_id=item.id,
+        details={
+            "batch_number": item.batch_number,
+            "expiration_date": item.expiration_date.isoformat(),
+            "stock_quantity": item.stock_quantity,
+        },
+        time=now,
+    )
+
+
+def _low_stock_alert(stock: MedicationStock, medication: Medication, now: datetime) -> Optional[InventoryAlert]:
+    threshold = medication.low_stock_threshold
+    if threshold is None:
+        threshold = settings.LOW_STOCK_THRESHOLD
+    if stock.total_quantity > threshold:
+        return None
+
+    name = medication.code_display or "Medication"
+    if stock.total_quantity <= 0:
+        priority, title = "critical", f"{name} out of stock"
+    else:
+        priority, title = "high", f"{name} low on stock"
+
+    return InventoryAlert(
+        type="stock",
+        priority=priority,
+        title=title,
+        description=f"{stock.total_quantity} units on hand (threshold {threshold})",
+        medication_id=medication.id,
+        details={"total_quantity": stock.total_quantity, "threshold": threshold},
+        time=now,
+    )
+
+
+class AlertEngine:
+    """Scans inventory for expiring batches and low stock and stores the alerts.
+
+    After the first full scan, each run only recomputes rows touched since the
+    previous run, plus batches whose expiry window was crossed in the meantime
+    (found through the expiration_date index).
+
+    The previous run's time is the database clock at its start, kept in shared
+    state so whichever worker scans next continues from it. Each run reaches
+    ALERT_SCAN_OVERLAP_SECONDS further back; alerts are recomputed by
+    delete-then-insert, so rescanning a row is harmless.
+    """
+
+    LAST_RUN_KEY = "alerts:last-scan"
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+
+    async def last_run(self) -> Optional[datetime]:
+        """Database time (naive UTC) at the start of the previous scan, from any worker"""
+        value = await shared_state.get(self.LAST_RUN_KEY)
+        return datetime.fromisoformat(value) if value else None
+
+    async def run(self, db: AsyncSession, full: bool = False) -> int:
+        """Recompute alerts and commit. Returns the number of alerts written."""
+        async with self._lock:
+            # Same clock (and transaction start) as the created_at / updated_at defaults
+            now = (await db.execute(select(func.now()))).scalar()
+            now = now.astimezone(timezone.utc).replace(tzinfo=None)
+            since = None
+            if not full:
+                last_run = await self.last_run()
+                if last_run is not None:
+                    since = last_run - timedelta(seconds=settings.ALERT_SCAN_OVERLAP_SECONDS)
+            written = await self._recompute_expiry(db, now, since)
+            written += await self._recompute_low_stock(db, now, since)
+            await db.commit()
+            await shared_state.set(self.LAST_RUN_KEY, now.isoformat())
+            return written
+
+    async def _recompute_expiry(self, db: AsyncSession, now: datetime, since: Optional[datetime]) -> int:
+        query = select(InventoryItem, Medication).join(
+            Medication, InventoryItem.fhir_medication_id == Medication.id
+        )
+
+        if since is None:
+            await db.execute(delete(InventoryAlert).where(InventoryAlert.type == "expiry"))
+        else:
+            since_aware = since.replace(tzinfo=timezone.utc)
+            # Range of per-medication thresholds, to bound the expiry window scan
+            bounds = await db.execute(
+                select(
+                    func.min(func.coalesce(Medication.expiry_alert_days, settings.EXPIRY_ALERT_DAYS)),
+                    func.max(func.coalesce(Medication.expiry_alert_days, settings.EXPIRY_ALERT_DAYS)),
+                )
+            )
+            min_days, max_days = bounds.one()
+            min_days = min_days if min_days is not None else settings.EXPIRY_ALERT_DAYS
+            max_days = max_days if max_days is not None else settings.EXPIRY_ALERT_DAYS
+
+            query = query.filter(or_(
+                # Rows touched since the last run
+                InventoryItem.created_at > since_aware,
+                InventoryItem.updated_at > since_aware,
+                Medication.updated_at > since,
+                # Batches that expired since the last run
+                and_(InventoryItem.expiration_date > since, InventoryItem.expiration_date <= now),
+                # Batches that entered their alert window since the last run
+                and_(
+                    InventoryItem.expiration_date > since + timedelta(days=min_days),
+                    InventoryItem.expiration_date <= now + timedelta(days=max_days),
+                ),
+            ))
+
+        result = await db.execute(query)
+        rows = result.all()
+        if since is not None and rows:
+            await db.execute(
+                delete(InventoryAlert).where(
+                    InventoryAlert.type == "expiry",
+                    InventoryAlert.inventory_item_id.in_([item.id for item, _ in rows]),
+                )
+            )
+
+        alerts = [alert for alert in (_expiry_alert(item, med, now) for item, med in rows) if alert]
+        db.add_all(alerts)
+        return len(alerts)
+
+    async def _recompute_low_stock(self, db: AsyncSession, now: datetime, since: Optional[datetime]) -> int:
+        query = select(MedicationStock, Medication).join(
+            Medication, MedicationStock.medication_id == Medication.id
+        )
+
+        if since is None:
+            await db.execute(delete(InventoryAlert).where(InventoryAlert.type == "stock"))
+        else:
+            query = query.filter(or_(
+                MedicationStock.updated_at > since,
+                Medication.updated_at > since,
+            ))
+
+        result = await db.execute(query)
+        rows = result.all()
+        if since is not None and rows:
+            await db.execute(
+                delete(InventoryAlert).where(
+                    InventoryAlert.type == "stock",
+                    InventoryAlert.medication_id.in_([stock.medication_id for stock, _ in rows]),
+                )
+            )
+
+        alerts = [alert for alert in (_low_stock_alert(stock, med, now) for stock, med in rows) if alert]
+        db.add_all(alerts)
+        return len(alerts)
+
+    async def run_periodically(self, session_factory, interval: int) -> None:
+        """Background loop started at application startup.
+
+        Every worker runs the loop; a lock held for (almost) one interval makes
+        sure only one of them scans per interval.
+        """
+        while True:
+            try:
+                if not await shared_state.add("lock:alert-scan", WORKER_ID, ttl=max(interval - 1, 1)):
+                    await asyncio.sleep(interval)
+                    continue
+                async with session_factory() as db:
+                    written = await self.run(db)
+                logger.info(f"Alert scan finished, {written} alert(s) written")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Alert scan failed: {e}")
+            await asyncio.sleep(interval)
+
+
+alert_engine = AlertEngine()
@@ -0,0 +1,520 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, JSON, delete, exists, select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.partitions import add_months, month_start
+from app.core.shared_state import WORKER_ID, shared_state
+from app.models.medication_dispenses import DispenseStatus, MedicationDispense
+from app.models.prescription import Prescription, PrescriptionStatus
+from app.models.sale import Sale, SaleItem
+
+logger = logging.getLogger(__name__)
+
+# Archived table -> (model, date column, condition for a closed record).
+# Dispenses come before prescriptions: a prescription is only archived once
+# none of its dispenses are left in the hot table.
+ARCHIVED_TABLES = {
+    "sales": (Sale, Sale.created_at, lambda: Sale.status.in_(["completed", "cancelled"])),
+    "medication_dispenses": (MedicationDispense, MedicationDispense.created_at, lambda: MedicationDispense.status.in_([
+        DispenseStatus.COMPLETED, DispenseStatus.CANCELLED, DispenseStatus.ENTERED_IN_ERROR,
+        DispenseStatus.STOPPED, DispenseStatus.DECLINED,
+    ])),
+    "prescriptions": (Prescription, Prescription.created_at, lambda: Prescription.prescription_status.in_([
+        PrescriptionStatus.DISPENSED, PrescriptionStatus.CANCELLED, PrescriptionStatus.EXPIRED,
+    ]) & ~exists().where(MedicationDispense.prescription_id == Prescription.id)),
+}
+
+# Sales are archived with their lines nested in a "sale_items" column
+NESTED = {"sales": ("sale_items", SaleItem)}
+
+# Columns summed per archive file in the manifest, so totals need no file reads
+SUMMED = {"sales": ["total_amount"]}
+
+# The archival lock is held for a whole run, renewed every third of its TTL.
+# Each run also keeps a marker alive, so other workers leave its .tmp files alone.
+LOCK_KEY = "lock:archival"
+LOCK_TTL_SECONDS = 60
+
+_manifest_cache: Tuple[float, dict] = (0.0, {})
+
+
+def _archive_dir() -> Path:
+    return Path(settings.ARCHIVE_DIR)
+
+
+def _manifest_path() -> Path:
+    return _archive_dir() / "manifest.json"
+
+
+def _manifest() -> dict:
+    """Table -> {"archived_before", "rows", "files": {path: {"rows", sums}}}, re-read when the file changes"""
+    global _manifest_cache
+    try:
+        mtime = os.path.getmtime(_manifest_path())
+    except OSError:
+        return {}
+    if mtime != _manifest_cache[0]:
+        _manifest_cache = (mtime, json.loads(_manifest_path().read_text()))
+    return _manifest_cache[1]
+
+
+def _write_manifest(manifest: dict) -> None:
+    _archive_dir().mkdir(parents=True, exist_ok=True)
+    tmp = _manifest_path().with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, _manifest_path())
+
+
+def _update_manifest(table: str, cutoff: datetime, rows: int) -> None:
+    manifest = dict(_manifest())
+    entry = dict(manifest.get(table, {}))
+    previous = entry.get("archived_before")
+    entry["archived_before"] = max(previous, cutoff.isoformat()) if previous else cutoff.isoformat()
+    entry["rows"] = entry.get("rows", 0) + rows
+    manifest[table] = entry
+    _write_manifest(manifest)
+
+
+def _set_file_stats(table: str, name: str, stats: Optional[dict]) -> None:
+    """Record (or with stats=None, forget) the row count and sums of one archive file"""
+    manifest = dict(_manifest())
+    entry = dict(manifest.get(table, {}))
+    files = dict(entry.get("files", {}))
+    if stats is None:
+        files.pop(name, None)
+    else:
+        files[name] = stats
+    entry["files"] = files
+    manifest[table] = entry
+    _write_manifest(manifest)
+
+
+def archive_horizon(table: str) -> Optional[datetime]:
+    """Closed records of `table` created before this are in the archive (None when nothing is archived)"""
+    archived_before = _manifest().get(table, {}).get("archived_before")
+    return datetime.fromisoformat(archived_before) if archived_before else None
+
+
+# --- Rows <-> Parquet ---
+
+def _arrow_type(column):
+    import pyarrow as pa
+
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+    if isinstance(column.type, Date):
+        return pa.date32()
+    # Strings, enums (stored by value) and JSON (stored as text)
+    return pa.string()
+
+
+def _schema(table: str):
+    import pyarrow as pa
+
+    model = ARCHIVED_TABLES[table][0]
+    fields = [pa.field(column.name, _arrow_type(column)) for column in model.__table__.columns]
+    if table in NESTED:
+        name, child = NESTED[table]
+        item = pa.struct([pa.field(column.name, _arrow_type(column)) for column in child.__table__.columns])
+        fields.append(pa.field(name, pa.list_(item)))
+    return pa.schema(fields)
+
+
+def _to_row(obj) -> dict:
+    row = {}
+    for column in obj.__table__.columns:
+        value = getattr(obj, column.key)
+        if isinstance(value, Enum):
+            value = value.value
+        elif isinstance(column.type, JSON) and value is not None:
+            value = json.dumps(value, default=str)
+        row[column.name] = value
+    return row
+
+
+def _from_row(model, row: dict):
+    values = {}
+    for column in model.__table__.columns:
+        if column.name not in row:
+            continue
+        value = row[column.name]
+        if isinstance(column.type, JSON) and value is not None:
+            value = json.loads(value)
+        values[column.key] = value
+    return model(**values)
+
+
+def _write_pending(table: str, rows: List[dict], date_column: str) -> List[Path]:
+    """Write rows as one Parquet file per month, under a .tmp name until the hot rows are deleted
+
+    File names carry WORKER_ID, so recovery can tell whose run a .tmp file belongs to.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    by_month: Dict[str, List[dict]] = {}
+    for row in rows:
+        by_month.setdefault(f"{row[date_column]:%Y-%m}", []).append(row)
+
+    schema = _schema(table)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+    paths = []
+    for month, month_rows in by_month.items():
+        directory = _archive_dir() / table / f"month={month}"
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"part-{stamp}-{uuid.uuid4().hex[:8]}.{WORKER_ID}.parquet.tmp"
+        pq.write_table(pa.Table.from_pylist(month_rows, schema=schema), path, compression=settings.ARCHIVE_COMPRESSION)
+        paths.append(path)
+    return paths
+
+
+def _relative(table: str, path: Path) -> str:
+    """Manifest key of a (published) archive file: month=YYYY-MM/part-....parquet"""
+    published = path.with_suffix("") if path.suffix == ".tmp" else path
+    return str(published.relative_to(_archive_dir() / table))
+
+
+def _file_stats(table: str, path: Path) -> dict:
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    stats = {"rows": pq.ParquetFile(path).metadata.num_rows}
+    for column in SUMMED.get(table, []):
+        stats[column] = pc.sum(pq.read_table(path, columns=[column]).column(column)).as_py() or 0
+    return stats
+
+
+def _publish(table: str, paths: List[Path]) -> None:
+    # Stats first: a crash before the rename leaves a .tmp that recovery settles either way
+    for path in paths:
+        _set_file_stats(table, _relative(table, path), _file_stats(table, path))
+        os.replace(path, path.with_suffix(""))
+
+
+def _discard(table: str, paths: List[Path]) -> None:
+    for path in paths:
+        _set_file_stats(table, _relative(table, path), None)
+        path.unlink(missing_ok=True)
+
+
+def _run_key(worker_id: str) -> str:
+    return f"archival:run:{worker_id}"
+
+
+def _owner(path: Path) -> Optional[str]:
+    """WORKER_ID of the run that wrote a .tmp file (None for files named before owners were recorded)"""
+    stem = path.name[:-len(".parquet.tmp")]
+    return stem.split(".", 1)[1] if "." in stem else None
+
+
+async def _recover_pending(session_factory, table: str) -> None:
+    """Settle .tmp files left by an interrupted run.
+
+    Files of a run that is still alive are skipped. Otherwise a file whose
+    rows are all gone from the hot table was committed and is published; one
+    whose rows are still there is dropped (they get archived again).
+    """
+    import pyarrow.parquet as pq
+
+    model = ARCHIVED_TABLES[table][0]
+    for path in sorted((_archive_dir() / table).glob("month=*/*.parquet.tmp")):
+        owner = _owner(path)
+        if owner is not None and owner != WORKER_ID and await shared_state.get(_run_key(owner)) is not None:
+            continue
+        ids = pq.read_table(path, columns=["id"]).column("id").to_pylist()
+        async with session_factory() as db:
+            result = await db.execute(select(model.id).where(model.id.in_(ids)).limit(1))
+            committed = result.first() is None
+        await asyncio.to_thread(_publish if committed else _discard, table, [path])
+        logger.info(f"{'Published' if committed else 'Dropped'} interrupted archive file {path}")
+
+
+# --- Archival job ---
+
+async def archive_table(session_factory, table: str, cutoff: datetime) -> int:
+    """Move the closed records of `table` created before `cutoff` to Parquet, in batches.
+
+    Each batch is written to .tmp files, deleted from the hot table and
+    committed, and only then are the files published to readers.
+    """
+    model, date_column, closed = ARCHIVED_TABLES[table]
+    if date_column.type.timezone:
+        cutoff = cutoff.replace(tzinfo=timezone.utc)
+    await _recover_pending(session_factory, table)
+
+    archived = 0
+    while True:
+        async with session_factory() as db:
+            query = (
+                select(model)
+                .where(date_column < cutoff, closed())
+                .order_by(date_column)
+                .limit(settings.ARCHIVE_BATCH_SIZE)
+                .with_for_update(skip_locked=True, of=model)
+            )
+            if table in NESTED:
+                query = query.options(selectinload(getattr(model, NESTED[table][0])))
+            records = (await db.execute(query)).scalars().all()
+            if not records:
+                break
+
+            rows = [_to_row(record) for record in records]
+            if table in NESTED:
+                name = NESTED[table][0]
+                for row, record in zip(rows, records):
+                    row[name] = [_to_row(child) for child in getattr(record, name)]
+            paths = await asyncio.to_thread(_write_pending, table, rows, date_column.name)
+
+            try:
+                ids = [record.id for record in records]
+                if table == "sales":
+                    await db.execute(
+                        delete(SaleItem).where(SaleItem.sale_id.in_(ids), SaleItem.sale_created_at < cutoff)
+                        .execution_options(synchronize_session=False)
+                    )
+                await db.execute(
+                    delete(model).where(model.id.in_(ids), date_column < cutoff)
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            except BaseException:
+                await asyncio.to_thread(_discard, table, paths)
+                raise
+        await asyncio.to_thread(_publish, table, paths)
+        archived += len(records)
+        logger.info(f"Archived {archived} {table} row(s) so far")
+
+    await asyncio.to_thread(_update_manifest, table, cutoff.replace(tzinfo=None), archived)
+    return archived
+
+
+async def archive_closed_records(session_factory, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Archive every table's closed records older than ARCHIVE_AFTER_MONTHS whole months"""
+    cutoff = add_months(month_start(now or datetime.utcnow()), -settings.ARCHIVE_AFTER_MONTHS)
+    cutoff = datetime.combine(cutoff, datetime.min.time())
+    return {table: await archive_table(session_factory, table, cutoff) for table in ARCHIVED_TABLES}
+
+
+async def _keep_alive() -> None:
+    """Renew the archival lock and this worker's run marker until cancelled"""
+    while True:
+        await asyncio.sleep(LOCK_TTL_SECONDS / 3)
+        await shared_state.set(_run_key(WORKER_ID), True, ttl=LOCK_TTL_SECONDS)
+        if await shared_state.get(LOCK_KEY) == WORKER_ID:
+            await shared_state.set(LOCK_KEY, WORKER_ID, ttl=LOCK_TTL_SECONDS)
+        else:
+            logger.warning("Archival lock lost during a run")
+
+
+async def _archive_with_lock(session_factory) -> Optional[Dict[str, int]]:
+    """Run archival if no other worker is; the lock is held until the run ends"""
+    if not await shared_state.add(LOCK_KEY, WORKER_ID, ttl=LOCK_TTL_SECONDS):
+        return None
+    await shared_state.set(_run_key(WORKER_ID), True, ttl=LOCK_TTL_SECONDS)
+    keep_alive = asyncio.create_task(_keep_alive())
+    try:
+        return await archive_closed_records(session_factory)
+    finally:
+        keep_alive.cancel()
+        await shared_state.delete(_run_key(WORKER_ID))
+        if await shared_state.get(LOCK_KEY) == WORKER_ID:
+            await shared_state.delete(LOCK_KEY)
+
+
+async def run_archival_periodically(session_factory, interval: int) -> None:
+    """Background loop started at application startup; one worker archives at a time."""
+    while True:
+        try:
+            if settings.ARCHIVE_AFTER_MONTHS > 0:
+                counts = await _archive_with_lock(session_factory)
+                if counts is not None:
+                    logger.info(f"Archival finished: {counts}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Archival failed: {e}")
+        await asyncio.sleep(interval)
+
+
+# --- Read path ---
+
+def _months(table: str, date_from: Optional[datetime], date_to: Optional[datetime]) -> List[Tuple[datetime, Path]]:
+    """Archived month directories overlapping [date_from, date_to), newest first"""
+    months = []
+    for directory in (_archive_dir() / table).glob("month=*"):
+        month = datetime.strptime(directory.name[len("month="):], "%Y-%m")
+        if date_from is not None and add_months(month.date(), 1) <= month_start(date_from):
+            continue
+        if date_to is not None and month >= date_to.replace(tzinfo=None):
+            continue
+        months.append((month, directory))
+    return sorted(months, key=lambda entry: entry[0], reverse=True)
+
+
+def _condition(table: str, date_from: Optional[datetime], date_to: Optional[datetime],
+               before: Optional[tuple], equals: dict):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    date_column = ARCHIVED_TABLES[table][1].name
+    date_type = _schema(table).field(date_column).type
+
+    def bound(value: datetime):
+        if date_type.tz and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        elif not date_type.tz and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return pa.scalar(value, type=date_type)
+
+    terms = [ds.field(name) == (value.value if isinstance(value, Enum) else value) for name, value in equals.items()]
+    if date_from is not None:
+        terms.append(ds.field(date_column) >= bound(date_from))
+    if date_to is not None:
+        terms.append(ds.field(date_column) < bound(date_to))
+    if before is not None:
+        # Keyset position: strictly older than (date, id)
+        at, row_id = before
+        terms.append((ds.field(date_column) < bound(at)) | (
+            (ds.field(date_column) == bound(at)) & (ds.field("id") < row_id)
+        ))
+    condition = None
+    for term in terms:
+        condition = term if condition is None else condition & term
+    return condition
+
+
+def _read(table: str, date_from: Optional[datetime], date_to: Optional[datetime], before: Optional[tuple],
+          columns: Optional[List[str]], equals: dict, limit: Optional[int]) -> List[dict]:
+    """Matching rows newest first; with a limit, months are read only until it is reached"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    date_column = ARCHIVED_TABLES[table][1].name
+    if columns is not None:
+        # The per-month sort needs both keys, whatever the caller projects
+        columns = list(dict.fromkeys([*columns, date_column, "id"]))
+    schema = _schema(table)
+    condition = _condition(table, date_from, date_to, before, equals)
+
+    # Months don't overlap, so newest-first month order plus a sort within each month is a global order
+    tables = []
+    collected = 0
+    for _, directory in _months(table, date_from, date_to):
+        files = [str(path) for path in sorted(directory.glob("*.parquet"))]
+        if not files:
+            continue
+        month = ds.dataset(files, schema=schema, format="parquet").to_table(columns=columns, filter=condition)
+        if not month.num_rows:
+            continue
+        month = month.sort_by([(date_column, "descending"), ("id", "descending")])
+        if limit is not None:
+            month = month.slice(0, limit - collected)
+        tables.append(month)
+        collected += month.num_rows
+        if limit is not None and collected >= limit:
+            break
+    if not tables:
+        return []
+    return pa.concat_tables(tables).to_pylist()
+
+
+def _totals(table: str, date_from: Optional[datetime], date_to: Optional[datetime], equals: dict) -> dict:
+    """Row count and SUMMED column sums of the matching archived rows.
+
+    Whole months without filters come from the per-file stats in the
+    manifest; only partially covered months or filtered queries read the
+    files, and then just the summed columns.
+    """
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    summed = SUMMED.get(table, [])
+    totals = {"rows": 0, **{column: 0 for column in summed}}
+    files_stats = _manifest().get(table, {}).get("files", {})
+    condition = _condition(table, date_from, date_to, None, equals)
+    for month, directory in _months(table, date_from, date_to):
+        whole = (
+            not equals
+            and (date_from is None or date_from.replace(tzinfo=None) <= month)
+            and (date_to is None or date_to.replace(tzinfo=None) >= datetime.combine(add_months(month.date(), 1), datetime.min.time()))
+        )
+        paths = sorted(directory.glob("*.parquet"))
+        if whole and all(_relative(table, path) in files_stats for path in paths):
+            for path in paths:
+                stats = files_stats[_relative(table, path)]
+                for key in totals:
+                    totals[key] += stats.get(key, 0) or 0
+            continue
+        if not paths:
+            continue
+        rows = ds.dataset([str(path) for path in paths], schema=_schema(table), format="parquet").to_table(
+            columns=summed or ["id"], filter=condition
+        )
+        totals["rows"] += rows.num_rows
+        for column in summed:
+            totals[column] += pc.sum(rows.column(column)).as_py() or 0
+    return totals
+
+
+def _in_window(table: str, date_from: Optional[datetime]) -> bool:
+    horizon = archive_horizon(table)
+    return horizon is not None and (date_from is None or date_from.replace(tzinfo=None) < horizon)
+
+
+async def read_archived(
+    table: str,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    columns: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    before: Optional[tuple] = None,
+    **equals,
+) -> list:
+    """Archived records of `table` as detached model instances, newest first, for unioning with hot-table results.
+
+    Filters: creation date in [date_from, date_to), strictly older than the
+    keyset position `before` = (date, id), and column == value for each
+    keyword that is not None. With `limit`, only the newest months are read,
+    until that many records are found. Returns [] without touching the disk
+    when nothing from the window has been archived.
+    """
+    if not _in_window(table, date_from):
+        return []
+    equals = {name: value for name, value in equals.items() if value is not None}
+    rows = await asyncio.to_thread(_read, table, date_from, date_to, before, columns, equals, limit)
+
+    model = ARCHIVED_TABLES[table][0]
+    records = []
+    for row in rows:
+        record = _from_row(model, row)
+        if table in NESTED and NESTED[table][0] in row:
+            name, child = NESTED[table]
+            setattr(record, name, [_from_row(child, item) for item in row[name] or []])
+        records.append(record)
+    return records
+
+
+async def archived_totals(
+    table: str, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None, **equals
+) -> dict:
+    """{"rows": count, <summed column>: sum} over the archived records matching the filters"""
+    if not _in_window(table, date_from):
+        return {"rows": 0, **{column: 0 for column in SUMMED.get(table, [])}}
+    equals = {name: value for name, value in equals.items() if value is not None}
+    return await asyncio.to_thread(_totals, table, date_from, date_to, equals)
@@ -6,6 +6,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 from jose import JWTError, jwt
+import jwt as pyjwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, Request
 from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin
@@ -16,11 +17,21 @@ from fastapi_users.authentication import (
     CookieTransport,
 )
 from fastapi_users.authentication.strategy.db import DatabaseStrategy
+from fastapi_users import exceptions, models
+from fastapi_users.jwt import decode_jwt, generate_jwt
 from fastapi_users.db import SQLAlchemyUserDatabase
-from passlib.context import CryptContext
+from fastapi.security import OAuth2PasswordRequestForm
 from dotenv import load_dotenv
 
 from app.core.config import settings
+from app.core.security import (
+    pwd_context,
+    get_password_hash,
+    verify_password,
+    get_password_hash_async,
+    verify_and_update_password_async,
+)
+from app.core.user_cache import cache_user, get_cached_user, invalidate_cached_user, token_version
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.user import HumanName, ContactPoint, Address
@@ -33,15 +44,6 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 RESET_PASSWORD_TOKEN_EXPIRE_MINUTES = 60
 
-# --- Password hashing ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
 def send_verification_email(email: str, token: str):
     msg = MIMEMultipart()
     msg['From'] = settings.EMAIL_USER
@@ -103,6 +105,22 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, str]):
         self, user: User, request: Optional[Request] = None
     ):
         print(f"User {user.id} has been verified")
+        invalidate_cached_user(user.id)
+
+    async def on_after_update(
+        self, user: User, update_dict: dict, request: Optional[Request] = None
+    ):
+        invalidate_cached_user(user.id)
+
+    async def on_after_reset_password(
+        self, user: User, request: Optional[Request] = None
+    ):
+        invalidate_cached_user(user.id)
+
+    async def on_before_delete(
+        self, user: User, request: Optional[Request] = None
+    ):
+        invalidate_cached_user(user.id)
 
     async def create(self, user_create, safe: bool = False, request: Optional[Request] = None):
         # Validate password first
@@ -118,12 +136,12 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, str]):
         email = user_dict.get('email', None)
 
         # Build FHIR fields
-        user_dict['name'] = [HumanName(family=second_name, given=[first_name]).dict()]
+        user_dict['name'] = [HumanName(family=second_name, given=[first_name]).model_dump()]
         user_dict['telecom'] = [
-            ContactPoint(system="email", value=email).dict(),
-            ContactPoint(system="phone", value=phone_number).dict()
+            ContactPoint(system="email", value=email).model_dump(),
+            ContactPoint(system="phone", value=phone_number).model_dump()
         ]
-        user_dict['address'] = [Address(text=address_str).dict()]
+        user_dict['address'] = [Address(text=address_str).model_dump()]
         user_dict['gender'] = gender
         user_dict['birth_date'] = birthdate
         user_dict['identifier'] = [{
@@ -133,7 +151,7 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, str]):
         user_dict['username'] = email  # Set username to email
 
         # Set required fields
-        user_dict['hashed_password'] = get_password_hash(user_create.password)
+        user_dict['hashed_password'] = await get_password_hash_async(user_create.password)
         user_dict['is_active'] = True
         user_dict['is_superuser'] = False
         user_dict['is_verified'] = False
@@ -144,6 +162,27 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, str]):
         created_user = await self.user_db.create(user_dict)
         return created_user
 
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        # Same flow as BaseUserManager.authenticate, but bcrypt runs on the
+        # password worker pool instead of blocking the event loop.
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Run the hasher anyway to mitigate timing attacks
+            await get_password_hash_async(credentials.password)
+            return None
+
+        verified, updated_password_hash = await verify_and_update_password_async(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        # Update password hash if the configured cost has changed
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+
+        return user
+
 # --- Async user manager dependency ---
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
     yield UserManager(user_db)
@@ -152,8 +191,58 @@ async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 cookie_transport = CookieTransport(cookie_name="refresh_token", cookie_max_age=60 * 60 * 24 * 7)  # 7 days
 
+class CachedJWTStrategy(JWTStrategy):
+    """JWT strategy that resolves the user from the in-process user cache.
+
+    Tokens carry a `ver` claim (see token_version); a cached user is only
+    reused while the version in the token matches the one it was cached for,
+    and users are only cached by tokens carrying their current version.
+    """
+
+    async def read_token(
+        self, token: Optional[str], user_manager: BaseUserManager
+    ) -> Optional[User]:
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(
+                token, self.decode_key, self.token_audience, algorithms=[self.algorithm]
+            )
+            user_id = data.get("sub")
+            if user_id is None:
+                return None
+        except pyjwt.PyJWTError:
+            return None
+
+        try:
+            parsed_id = user_manager.parse_id(user_id)
+        except exceptions.InvalidID:
+            return None
+
+        version = data.get("ver", 0)
+        user = get_cached_user(parsed_id, version)
+        if user is not None:
+            return user
+
+        try:
+            user = await user_manager.get(parsed_id)
+        except exceptions.UserNotExists:
+            return None
+        # Only cache under the row's real version; a token issued before the
+        # last change still authenticates, but always from the database
+        if token_version(user) == version:
+            cache_user(user, version)
+        return user
+
+    async def write_token(self, user: models.UP) -> str:
+        data = {"sub": str(user.id), "aud": self.token_audience, "ver": token_version(user)}
+        return generate_jwt(
+            data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm
+        )
+
 def get_jwt_strategy():
-    return JWTStrategy(secret=settings.SECRET_KEY, lifetime_seconds=3600)  # 1 hour
+    return CachedJWTStrategy(secret=settings.SECRET_KEY, lifetime_seconds=3600)  # 1 hour
 
 def get_refresh_token_strategy():
     return DatabaseStrategy(
@@ -0,0 +1,157 @@
+import json
+import logging
+import zlib
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.bundle import bulk_insert, describe_validation_error, patient_row, medication_row
+from app.core.config import settings
+from app.core.response_cache import invalidate_model
+from app.models.medication import Medication
+from app.models.patient import Patient
+from app.schemas.medication import MedicationCreate
+from app.schemas.patient import PatientCreate
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_patient(data: dict) -> dict:
+    """Accept Patient lines as produced by $export (insurance as an identifier)."""
+    if "insurance_number" not in data:
+        for identifier in data.get("identifier") or []:
+            if (identifier.get("type") or {}).get("text") == "insurance":
+                data["insurance_number"] = identifier.get("value")
+                data["insurance_company"] = (identifier.get("assigner") or {}).get("display")
+                break
+    return data
+
+
+def _normalize_medication(data: dict) -> dict:
+    """Accept Medication lines as produced by $export (code.coding)."""
+    code = data.get("code")
+    if isinstance(code, dict) and code.get("coding") and "value" not in code:
+        coding = code["coding"][0]
+        data["code"] = {
+            "system": coding.get("system"),
+            "value": coding.get("code"),
+            "display": coding.get("display"),
+        }
+    data.pop("resourceType", None)
+    return data
+
+
+# Resource type -> (table, create schema, normalizer, row builder)
+IMPORT_RESOURCES: Dict[str, tuple] = {
+    "Patient": (Patient, PatientCreate, _normalize_patient, lambda v, now: patient_row(v)),
+    "Medication": (Medication, MedicationCreate, _normalize_medication, medication_row),
+}
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], gzipped: bool = False) -> AsyncIterator[bytes]:
+    """Split a (optionally gzip-compressed) byte stream into lines as it arrives."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    buffer = b""
+    async for chunk in chunks:
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        buffer += chunk
+        if b"\n" not in chunk:
+            continue
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if decompressor is not None:
+        buffer += decompressor.flush()
+    for line in buffer.split(b"\n"):
+        yield line
+
+
+class NDJSONImporter:
+    """Validates NDJSON lines in batches and bulk-inserts the valid ones.
+
+    Each batch commits on its own, so a bad line only costs that line and a
+    database error only costs its batch. Errors are reported by line number.
+    """
+
+    def __init__(self, resource_type: str, batch_size: Optional[int] = None):
+        self.resource_type = resource_type
+        self.model, self.schema, self.normalize, self.to_row = IMPORT_RESOURCES[resource_type]
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        self._batch: List[Tuple[int, bytes]] = []
+
+    def _error(self, line_number: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_number, "error": message})
+
+    async def run(self, db: AsyncSession, lines: AsyncIterator[bytes]) -> dict:
+        line_number = 0
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            self._batch.append((line_number, line))
+            if len(self._batch) >= self.batch_size:
+                await self._flush(db)
+        await self._flush(db)
+        logger.info(f"Imported {self.imported} {self.resource_type} resource(s), {self.failed} failed")
+        return self.report()
+
+    def _validate(self, line_number: int, line: bytes):
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            self._error(line_number, f"Invalid JSON: {e}")
+            return None
+        if not isinstance(data, dict):
+            self._error(line_number, "Line is not a JSON object")
+            return None
+        resource_type = data.get("resourceType", self.resource_type)
+        if resource_type != self.resource_type:
+            self._error(line_number, f"Expected {self.resource_type}, got {resource_type}")
+            return None
+        try:
+            return self.schema.model_validate(self.normalize(data))
+        except ValidationError as e:
+            self._error(line_number, describe_validation_error(e))
+            return None
+
+    async def _flush(self, db: AsyncSession) -> None:
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+
+        now = datetime.utcnow()
+        valid = []
+        for line_number, line in batch:
+            validated = self._validate(line_number, line)
+            if validated is not None:
+                valid.append((line_number, self.to_row(validated, now)))
+        if not valid:
+            return
+
+        try:
+            await bulk_insert(db, self.model, [row for _, row in valid], returning=False)
+            await db.commit()
+            invalidate_model(self.model)
+            self.imported += len(valid)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Import batch starting at line {valid[0][0]} failed: {e}")
+            for line_number, _ in valid:
+                self._error(line_number, f"Database error: {e}")
+
+    def report(self) -> dict:
+        return {
+            "resourceType": self.resource_type,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
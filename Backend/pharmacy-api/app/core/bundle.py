@@ -0,0 +1,361 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.medication import Medication
+from app.models.patient import Patient
+from app.models.prescription import Prescription, PrescriptionSource, PrescriptionStatus
+from app.models.user import User
+from app.schemas.bundle import Bundle, BundleResponse, BundleResponseEntry, BundleEntryResponse
+from app.schemas.medication import MedicationCreate
+from app.schemas.patient import PatientCreate
+from app.schemas.prescription import PrescriptionCreate
+
+logger = logging.getLogger(__name__)
+
+# asyncpg caps a statement at 32767 bind parameters
+MAX_BIND_PARAMS = 32000
+
+# Bundle resource type -> (table, create schema). Listed in insert order so
+# referenced resources get their ids before the entries that point at them.
+RESOURCE_TYPES: Dict[str, Tuple[type, type]] = {
+    "Patient": (Patient, PatientCreate),
+    "Medication": (Medication, MedicationCreate),
+    "MedicationRequest": (Prescription, PrescriptionCreate),
+}
+
+# Resources a reference may point at that already live in the database
+REFERENCE_TARGETS: Dict[str, type] = {
+    "Patient": Patient,
+    "Medication": Medication,
+    "Practitioner": User,
+}
+
+# MedicationRequest id field -> (target type, where its FHIR reference lives)
+PRESCRIPTION_REFERENCES = {
+    "patient_id": ("Patient", ("subject",)),
+    "medication_id": ("Medication", ("medicationReference", "medication")),
+    "prescriber_id": ("Practitioner", ("requester",)),
+}
+
+
+def operation_outcome(issues: List[Tuple[str, Optional[str]]]) -> dict:
+    """Build an OperationOutcome from (message, FHIRPath expression) pairs."""
+    return {
+        "resourceType": "OperationOutcome",
+        "issue": [
+            {
+                "severity": "error",
+                "code": "invalid",
+                "diagnostics": message,
+                **({"expression": [expression]} if expression else {}),
+            }
+            for message, expression in issues
+        ],
+    }
+
+
+@dataclass
+class _Entry:
+    index: int
+    resource_type: Optional[str] = None
+    resource: Dict[str, Any] = field(default_factory=dict)
+    # id field -> existing database id, or index of the bundle entry that creates it
+    references: Dict[str, Union[int, "_Entry"]] = field(default_factory=dict)
+    validated: Optional[BaseModel] = None
+    error: Optional[Tuple[str, str]] = None  # (HTTP status line, message)
+    created_id: Optional[int] = None
+
+    @property
+    def expression(self) -> str:
+        return f"Bundle.entry[{self.index}]"
+
+    def fail(self, status: str, message: str) -> None:
+        if self.error is None:
+            self.error = (status, message)
+
+
+def describe_validation_error(error: ValidationError) -> str:
+    """One-line summary of a pydantic ValidationError: "loc: msg; loc: msg"."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}"
+        for e in error.errors()
+    )
+
+
+def _reference_of(resource: dict, keys: Tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        value = resource.get(key)
+        if isinstance(value, dict) and value.get("reference"):
+            return value["reference"]
+    return None
+
+
+def patient_row(patient: PatientCreate) -> dict:
+    return {
+        "name": [n.model_dump() for n in patient.name],
+        "telecom": [t.model_dump() for t in patient.telecom],
+        "address": [a.model_dump() for a in patient.address],
+        "birth_date": patient.birthDate,
+        "insurance_company": patient.insurance_company,
+        "insurance_number": patient.insurance_number,
+    }
+
+
+def medication_row(medication: MedicationCreate, now: datetime) -> dict:
+    return {
+        "resource_type": medication.resource_type,
+        "identifier": medication.identifier,
+        "status": medication.status,
+        "code_system": medication.code.system,
+        "code_value": medication.code.value,
+        "code_display": medication.code.display,
+        "manufacturer": medication.manufacturer,
+        "form": medication.form,
+        "amount": medication.amount,
+        "ingredient": medication.ingredient,
+        "batch": medication.batch,
+        "note": medication.note,
+        "low_stock_threshold": medication.low_stock_threshold,
+        "expiry_alert_days": medication.expiry_alert_days,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def _prescription_row(entry: _Entry) -> dict:
+    prescription: PrescriptionCreate = entry.validated
+    ids = {}
+    for id_field, target in entry.references.items():
+        ids[id_field] = target.created_id if isinstance(target, _Entry) else target
+
+    subject = dict(prescription.subject)
+    if isinstance(entry.references.get("patient_id"), _Entry):
+        # Rewrite the urn:uuid: reference to the id the patient was stored under
+        subject["reference"] = f"Patient/{ids['patient_id']}"
+
+    return {
+        "identifier": prescription.identifier,
+        "status": prescription.status,
+        "intent": prescription.intent,
+        "category": prescription.category,
+        "priority": prescription.priority,
+        "subject": subject,
+        "encounter": prescription.encounter,
+        "authored_on": prescription.authored_on.replace(tzinfo=None),
+        "requester": prescription.requester,
+        "reason_code": prescription.reason_code,
+        "dosage_instruction": [d.model_dump() for d in prescription.dosage_instruction],
+        "dispense_request": prescription.dispense_request,
+        "substitution": prescription.substitution,
+        "prescription_source": PrescriptionSource(prescription.prescription_source.value),
+        "scanned_image_url": prescription.scanned_image_url,
+        "ocr_text": prescription.ocr_text,
+        "ocr_confidence": prescription.ocr_confidence,
+        "prescription_status": PrescriptionStatus.PENDING,
+        **ids,
+    }
+
+
+async def bulk_insert(db: AsyncSession, model: type, rows: List[dict], returning: bool = True) -> List[int]:
+    """Insert rows with multi-row INSERT ... RETURNING id, chunked to the bind parameter limit.
+
+    Ids come back in the order of `rows`: a multi-row INSERT does not promise
+    that by itself, so RETURNING is sorted by parameter order. Every row must
+    have the same keys. With returning=False nothing is read back and an
+    empty list is returned.
+    """
+    if not rows:
+        return []
+    chunk_size = max(MAX_BIND_PARAMS // max(len(rows[0]), 1), 1)
+    ids: List[int] = []
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        if returning:
+            result = await db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), chunk)
+            ids.extend(result.scalars().all())
+        else:
+            await db.execute(insert(model), chunk)
+    return ids
+
+
+class BundleProcessor:
+    """Creates the resources of a transaction or batch Bundle in bulk.
+
+    Entries are checked up front: supported type, resolvable references
+    (intra-bundle `urn:uuid:` fullUrls for transactions, existing `Type/id`
+    ids via one IN query per type) and schema validation. Each resource type
+    is then written with a single multi-row INSERT, in dependency order.
+    A transaction fails as a whole with a 400 OperationOutcome; a batch
+    reports failures per entry and stores the rest.
+    """
+
+    def __init__(self, bundle: Bundle):
+        self.bundle = bundle
+        self.transaction = bundle.type == "transaction"
+        self.entries = [_Entry(index=i) for i in range(len(bundle.entry))]
+        self.inserted: Dict[type, List[int]] = {}  # model -> new ids, filled by process()
+
+    async def process(self, db: AsyncSession) -> BundleResponse:
+        """Validate and insert every entry. Does not commit."""
+        self._check_requests()
+        self._resolve_references()
+        await self._check_existing_references(db)
+        self._validate()
+        self._propagate_failures()
+
+        if self.transaction:
+            failed = [e for e in self.entries if e.error]
+            if failed:
+                raise HTTPException(
+                    status_code=400,
+                    detail=operation_outcome([(e.error[1], e.expression) for e in failed]),
+                )
+
+        await self._insert(db)
+        return self._response()
+
+    def _check_requests(self) -> None:
+        seen_urls: Set[str] = set()
+        for entry, bundle_entry in zip(self.entries, self.bundle.entry):
+            entry.resource = dict(bundle_entry.resource)
+            resource_type = bundle_entry.request.url.strip("/").split("/")[0].split("?")[0]
+
+            if bundle_entry.request.method != "POST":
+                entry.fail("405 Method Not Allowed", f"Only POST entries are supported, got {bundle_entry.request.method}")
+            elif resource_type not in RESOURCE_TYPES:
+                entry.fail("400 Bad Request", f"Unsupported resource type '{resource_type}'")
+            elif entry.resource.get("resourceType", resource_type) != resource_type:
+                entry.fail("400 Bad Request", f"resourceType '{entry.resource['resourceType']}' does not match request.url '{resource_type}'")
+            entry.resource_type = resource_type
+
+            if bundle_entry.fullUrl:
+                if bundle_entry.fullUrl in seen_urls:
+                    entry.fail("400 Bad Request", f"Duplicate fullUrl '{bundle_entry.fullUrl}'")
+                seen_urls.add(bundle_entry.fullUrl)
+
+    def _resolve_references(self) -> None:
+        by_url = {
+            bundle_entry.fullUrl: entry
+            for entry, bundle_entry in zip(self.entries, self.bundle.entry)
+            if bundle_entry.fullUrl
+        }
+
+        for entry in self.entries:
+            if entry.error or entry.resource_type != "MedicationRequest":
+                continue
+            for id_field, (target_type, keys) in PRESCRIPTION_REFERENCES.items():
+                if isinstance(entry.resource.get(id_field), int):
+                    entry.references[id_field] = entry.resource[id_field]
+                    continue
+
+                reference = _reference_of(entry.resource, keys)
+                if reference is None:
+                    entry.fail("400 Bad Request", f"Missing {id_field} or {keys[0]}.reference")
+                    break
+
+                if reference in by_url:
+                    target = by_url[reference]
+                    if not self.transaction:
+                        entry.fail("400 Bad Request", f"Intra-bundle reference '{reference}' is only resolved in transaction bundles")
+                    elif target.resource_type != target_type:
+                        entry.fail("400 Bad Request", f"'{reference}' is a {target.resource_type}, expected {target_type}")
+                    else:
+                        entry.references[id_field] = target
+                        # Placeholder so the schema validates; replaced once the target is inserted
+                        entry.resource[id_field] = 0
+                    continue
+
+                ref_type, _, ref_id = reference.partition("/")
+                if ref_type != target_type or not ref_id.isdigit():
+                    entry.fail("400 Bad Request", f"Cannot resolve reference '{reference}', expected {target_type}/<id> or a bundle fullUrl")
+                    break
+                entry.references[id_field] = int(ref_id)
+                entry.resource[id_field] = int(ref_id)
+
+    async def _check_existing_references(self, db: AsyncSession) -> None:
+        wanted: Dict[str, Set[int]] = {}
+        for entry in self.entries:
+            for id_field, target in entry.references.items():
+                if isinstance(target, int):
+                    wanted.setdefault(PRESCRIPTION_REFERENCES[id_field][0], set()).add(target)
+
+        found: Dict[str, Set[int]] = {}
+        for target_type, ids in wanted.items():
+            model = REFERENCE_TARGETS[target_type]
+            result = await db.execute(select(model.id).where(model.id.in_(ids)))
+            found[target_type] = set(result.scalars().all())
+
+        for entry in self.entries:
+            for id_field, target in entry.references.items():
+                target_type = PRESCRIPTION_REFERENCES[id_field][0]
+                if isinstance(target, int) and target not in found[target_type]:
+                    entry.fail("404 Not Found", f"{target_type}/{target} not found")
+
+    def _validate(self) -> None:
+        for entry in self.entries:
+            if entry.error:
+                continue
+            _, schema = RESOURCE_TYPES[entry.resource_type]
+            try:
+                entry.validated = schema.model_validate(entry.resource)
+            except ValidationError as e:
+                entry.fail("400 Bad Request", f"Invalid {entry.resource_type}: {describe_validation_error(e)}")
+
+    def _propagate_failures(self) -> None:
+        # Entries are only created after the resources they reference, so a
+        # single forward pass in insert order is enough.
+        for resource_type in RESOURCE_TYPES:
+            for entry in self.entries:
+                if entry.error or entry.resource_type != resource_type:
+                    continue
+                for target in entry.references.values():
+                    if isinstance(target, _Entry) and target.error:
+                        entry.fail("424 Failed Dependency", f"Referenced entry Bundle.entry[{target.index}] failed")
+                        break
+
+    async def _insert(self, db: AsyncSession) -> None:
+        now = datetime.utcnow()
+        for resource_type, (model, _) in RESOURCE_TYPES.items():
+            entries = [e for e in self.entries if e.resource_type == resource_type and not e.error]
+            if not entries:
+                continue
+            if resource_type == "Patient":
+                rows = [patient_row(e.validated) for e in entries]
+            elif resource_type == "Medication":
+                rows = [medication_row(e.validated, now) for e in entries]
+            else:
+                rows = [_prescription_row(e) for e in entries]
+
+            ids = await bulk_insert(db, model, rows)
+            self.inserted[model] = ids
+            for entry, created_id in zip(entries, ids):
+                entry.created_id = created_id
+            logger.info(f"Bundle inserted {len(ids)} {resource_type} resource(s)")
+
+    def _response(self) -> BundleResponse:
+        response_entries = []
+        for entry, bundle_entry in zip(self.entries, self.bundle.entry):
+            if entry.error:
+                status, message = entry.error
+                response = BundleEntryResponse(
+                    status=status,
+                    outcome=operation_outcome([(message, entry.expression)]),
+                )
+            else:
+                response = BundleEntryResponse(
+                    status="201 Created",
+                    location=f"{entry.resource_type}/{entry.created_id}",
+                )
+            response_entries.append(BundleResponseEntry(fullUrl=bundle_entry.fullUrl, response=response))
+
+        return BundleResponse(
+            type="transaction-response" if self.transaction else "batch-response",
+            entry=response_entries,
+        )
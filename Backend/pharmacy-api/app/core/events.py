@@ -0,0 +1,168 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models.inventory import InventoryItem
+from app.models.medication_dispenses import MedicationDispense
+from app.models.purchase import Purchase
+from app.models.sale import Sale
+from app.models.stock import MedicationStock
+from app.core.shared_state import WORKER_ID, publish_nowait, shared_state
+
+logger = logging.getLogger(__name__)
+
+# Per-subscriber buffer; a client that falls this far behind gets a resync event
+SUBSCRIBER_QUEUE_SIZE = 500
+
+# Shared-state channel used to fan events out to the other workers
+RELAY_CHANNEL = "change-events"
+
+
+class EventBus:
+    """In-process pub/sub for change notifications.
+
+    With a shared state backend, published events are also relayed to the
+    other workers, so a client subscribed on any worker sees every change.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[asyncio.Queue, Optional[Set[str]]] = {}
+
+    def subscribe(self, topics: Optional[Iterable[str]] = None) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers[queue] = set(topics) if topics else None
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.pop(queue, None)
+
+    def publish(self, topic: str, message: dict) -> None:
+        self.deliver(topic, message)
+        publish_nowait(RELAY_CHANNEL, {"origin": WORKER_ID, "topic": topic, "message": message})
+
+    def deliver(self, topic: str, message: dict) -> None:
+        """Hand an event to this worker's subscribers only."""
+        for queue, topics in list(self._subscribers.items()):
+            if topics is not None and topic not in topics:
+                continue
+            try:
+                queue.put_nowait((topic, message))
+            except asyncio.QueueFull:
+                # Drop the backlog; the client must re-fetch instead of applying deltas
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("resync", {"reason": "subscriber too slow"}))
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    async def relay_from_other_workers(self) -> None:
+        """Background task: deliver events published by other workers to local subscribers."""
+        if not shared_state.shared:
+            return
+        while True:
+            try:
+                async for payload in shared_state.listen(RELAY_CHANNEL):
+                    if payload.get("origin") != WORKER_ID:
+                        self.deliver(payload["topic"], payload["message"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event relay failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+
+
+event_bus = EventBus()
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+# Model -> (topic, payload builder). Payloads carry just enough for clients
+# to patch their local lists.
+TRACKED_MODELS: Dict[type, tuple] = {
+    InventoryItem: ("inventory", lambda o: {
+        "id": o.id,
+        "fhir_medication_id": o.fhir_medication_id,
+        "batch_number": o.batch_number,
+        "status": o.status,
+        "stock_quantity": o.stock_quantity,
+        "expiration_date": _iso(o.expiration_date),
+    }),
+    MedicationStock: ("stock", lambda o: {
+        "medication_id": o.medication_id,
+        "total_quantity": o.total_quantity,
+        "earliest_expiry": _iso(o.earliest_expiry),
+    }),
+    Sale: ("sale", lambda o: {
+        "id": o.id,
+        "invoice_number": o.invoice_number,
+        "total_amount": o.total_amount,
+        "payment_status": o.payment_status,
+        "status": o.status,
+        "created_at": _iso(o.created_at),
+    }),
+    Purchase: ("purchase", lambda o: {
+        "id": o.id,
+        "status": o.status,
+        "supplier_id": o.supplier_id,
+        "total_amount": o.total_amount,
+        "payment_status": o.payment_status,
+    }),
+    MedicationDispense: ("dispense", lambda o: {
+        "id": o.id,
+        "status": o.status.value if o.status is not None and hasattr(o.status, "value") else o.status,
+        "medication_id": o.medication_id,
+        "patient_id": o.patient_id,
+        "quantity": o.quantity,
+    }),
+}
+
+TOPICS = sorted({topic for topic, _ in TRACKED_MODELS.values()})
+
+_PENDING_KEY = "pending_change_events"
+
+
+def _collect(session: Session, objects, op: str) -> None:
+    pending: List[tuple] = session.info.setdefault(_PENDING_KEY, [])
+    for obj in objects:
+        tracked = TRACKED_MODELS.get(type(obj))
+        if tracked is None:
+            continue
+        topic, build = tracked
+        try:
+            pending.append((topic, {"op": op, "data": build(obj)}))
+        except Exception as e:
+            logger.warning(f"Could not build {topic} change event: {e}")
+
+
+def record_change(session: Session, obj, op: str = "updated") -> None:
+    """Queue an event for a change made with a Core statement, which bypasses the flush hook."""
+    _collect(session, [obj], op)
+
+
+@event.listens_for(Session, "after_flush")
+def _record_changes(session: Session, flush_context) -> None:
+    _collect(session, session.new, "created")
+    _collect(session, [o for o in session.dirty if session.is_modified(o)], "updated")
+    _collect(session, session.deleted, "deleted")
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending or not (event_bus.subscriber_count or shared_state.shared):
+        return
+    for topic, message in pending:
+        event_bus.publish(topic, message)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,376 @@
+import asyncio
+import gzip
+import json
+import logging
+import shutil
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.shared_state import shared_state
+from app.models.inventory import InventoryItem
+from app.models.medication import Medication
+from app.models.medication_dispenses import MedicationDispense
+from app.models.patient import Patient
+from app.models.prescription import Prescription
+from app.models.purchase import Purchase
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _enum_value(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def _meta(obj) -> dict:
+    last_updated = getattr(obj, "updated_at", None) or getattr(obj, "created_at", None)
+    return {"lastUpdated": _iso(last_updated)} if last_updated else {}
+
+
+def _patient_resource(patient: Patient) -> dict:
+    resource = {
+        "resourceType": "Patient",
+        "id": str(patient.id),
+        "meta": _meta(patient),
+        "name": patient.name,
+        "telecom": patient.telecom,
+        "address": patient.address,
+        "birthDate": _iso(patient.birth_date),
+    }
+    if patient.insurance_number:
+        resource["identifier"] = [{
+            "type": {"text": "insurance"},
+            "value": patient.insurance_number,
+            "assigner": {"display": patient.insurance_company},
+        }]
+    return resource
+
+
+def _medication_resource(medication: Medication) -> dict:
+    return {
+        "resourceType": "Medication",
+        "id": str(medication.id),
+        "meta": _meta(medication),
+        "identifier": medication.identifier,
+        "status": medication.status,
+        "code": {"coding": [{
+            "system": medication.code_system,
+            "code": medication.code_value,
+            "display": medication.code_display,
+        }]},
+        "manufacturer": medication.manufacturer,
+        "form": medication.form,
+        "amount": medication.amount,
+        "ingredient": medication.ingredient,
+        "batch": medication.batch,
+    }
+
+
+def _medication_request_resource(prescription: Prescription) -> dict:
+    return {
+        "resourceType": "MedicationRequest",
+        "id": str(prescription.id),
+        "meta": _meta(prescription),
+        "identifier": prescription.identifier,
+        "status": prescription.status,
+        "intent": prescription.intent,
+        "category": prescription.category,
+        "priority": prescription.priority,
+        "medicationReference": {"reference": f"Medication/{prescription.medication_id}"},
+        "subject": {**(prescription.subject or {}), "reference": f"Patient/{prescription.patient_id}"},
+        "encounter": prescription.encounter,
+        "authoredOn": _iso(prescription.authored_on),
+        "requester": {**(prescription.requester or {}), "reference": f"Practitioner/{prescription.prescriber_id}"},
+        "reasonCode": prescription.reason_code,
+        "dosageInstruction": prescription.dosage_instruction,
+        "dispenseRequest": prescription.dispense_request,
+        "substitution": prescription.substitution,
+    }
+
+
+def _medication_dispense_resource(dispense: MedicationDispense) -> dict:
+    resource = {
+        "resourceType": "MedicationDispense",
+        "id": str(dispense.id),
+        "meta": _meta(dispense),
+        "status": _enum_value(dispense.status),
+        "medicationReference": {"reference": f"Medication/{dispense.medication_id}"},
+        "subject": {"reference": f"Patient/{dispense.patient_id}"},
+        "authorizingPrescription": [{"reference": f"MedicationRequest/{dispense.prescription_id}"}],
+        "quantity": {"value": dispense.quantity},
+        "daysSupply": {"value": dispense.days_supply} if dispense.days_supply is not None else None,
+        "whenPrepared": _iso(dispense.when_prepared),
+        "whenHandedOver": _iso(dispense.when_handed_over),
+        "dosageInstruction": dispense.dosage_instruction,
+        "note": [{"text": dispense.note}] if dispense.note else None,
+        "substitution": {
+            "wasSubstituted": bool(dispense.was_substituted),
+            "type": {"text": dispense.substitution_type} if dispense.substitution_type else None,
+            "reason": [{"text": dispense.substitution_reason}] if dispense.substitution_reason else None,
+        },
+    }
+    if dispense.dispenser_id:
+        resource["performer"] = [{"actor": {"reference": f"Practitioner/{dispense.dispenser_id}"}}]
+    return resource
+
+
+def _inventory_item_resource(item: InventoryItem) -> dict:
+    return {
+        "resourceType": "InventoryItem",
+        "id": str(item.id),
+        "meta": _meta(item),
+        "identifier": item.identifier,
+        "status": item.status,
+        "code": [item.code] if item.code else None,
+        # stock_quantity is the live count; the stored quantity carries the unit
+        "netContent": {**(item.quantity or {}), "value": item.stock_quantity},
+        "characteristic": item.characteristic,
+        "instance": {
+            "lotNumber": item.batch_number,
+            "expiry": _iso(item.expiration_date),
+        },
+        "productReference": {"reference": f"Medication/{item.fhir_medication_id}"},
+        "association": item.instance,
+    }
+
+
+def _supply_request_resource(purchase: Purchase) -> dict:
+    return {
+        "resourceType": "SupplyRequest",
+        "id": str(purchase.id),
+        "meta": _meta(purchase),
+        "status": purchase.status,
+        "category": purchase.category,
+        "priority": purchase.priority,
+        "item": purchase.item,
+        "quantity": purchase.quantity,
+        "parameter": purchase.parameter,
+        "supplier": [{"reference": f"Organization/{purchase.supplier_id}"}] if purchase.supplier_id else None,
+        "authoredOn": _iso(purchase.order_date),
+        "occurrenceDateTime": _iso(purchase.expected_delivery_date),
+    }
+
+
+def _changed_since(model, aware: bool, fallback_created: bool):
+    """Filter builder for `_since`, against naive or timezone-aware columns."""
+    def build(since: datetime):
+        value = since.replace(tzinfo=timezone.utc) if aware else since
+        if fallback_created:
+            # updated_at is only set on the first update; new rows only have created_at
+            return or_(model.updated_at > value, model.created_at > value)
+        return model.updated_at > value
+    return build
+
+
+# FHIR resource type -> (model, FHIR mapper, _since filter builder)
+EXPORT_RESOURCES: Dict[str, tuple] = {
+    "Patient": (Patient, _patient_resource, _changed_since(Patient, False, False)),
+    "Medication": (Medication, _medication_resource, _changed_since(Medication, False, False)),
+    "MedicationRequest": (Prescription, _medication_request_resource, _changed_since(Prescription, True, True)),
+    "MedicationDispense": (MedicationDispense, _medication_dispense_resource, _changed_since(MedicationDispense, False, False)),
+    "InventoryItem": (InventoryItem, _inventory_item_resource, _changed_since(InventoryItem, True, True)),
+    "SupplyRequest": (Purchase, _supply_request_resource, _changed_since(Purchase, False, False)),
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _ndjson_lines(resources: List[dict]) -> bytes:
+    return "".join(
+        json.dumps(
+            {key: value for key, value in resource.items() if value is not None},
+            default=_json_default,
+            separators=(",", ":"),
+        ) + "\n"
+        for resource in resources
+    ).encode()
+
+
+class ExportJob:
+    """State of one $export request."""
+
+    def __init__(self, resource_types: List[str], since: Optional[datetime], request_url: str):
+        self.id = uuid.uuid4().hex
+        self.resource_types = resource_types
+        self.since = since  # naive UTC
+        self.request_url = request_url
+        self.transaction_time = datetime.utcnow()
+        self.status = "in-progress"  # in-progress | completed | failed
+        self.progress = "queued"
+        self.output: List[dict] = []  # {"type", "file", "count"}
+        self.error: Optional[str] = None
+        self.finished_at: Optional[datetime] = None
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def directory(self) -> Path:
+        return Path(settings.EXPORT_DIR) / self.id
+
+    def snapshot(self) -> dict:
+        return {
+            "id": self.id,
+            "resource_types": self.resource_types,
+            "since": _iso(self.since),
+            "request_url": self.request_url,
+            "transaction_time": _iso(self.transaction_time),
+            "status": self.status,
+            "progress": self.progress,
+            "output": self.output,
+            "error": self.error,
+            "finished_at": _iso(self.finished_at),
+        }
+
+    @classmethod
+    def from_snapshot(cls, data: dict) -> "ExportJob":
+        """Status view of a job running (or finished) on another worker."""
+        job = cls.__new__(cls)
+        job.id = data["id"]
+        job.resource_types = data["resource_types"]
+        job.since = datetime.fromisoformat(data["since"]) if data["since"] else None
+        job.request_url = data["request_url"]
+        job.transaction_time = datetime.fromisoformat(data["transaction_time"])
+        job.status = data["status"]
+        job.progress = data["progress"]
+        job.output = data["output"]
+        job.error = data["error"]
+        job.finished_at = datetime.fromisoformat(data["finished_at"]) if data["finished_at"] else None
+        job.task = None
+        return job
+
+
+class ExportManager:
+    """Runs bulk exports in the background and keeps their files until they expire.
+
+    All resource types are read in one REPEATABLE READ transaction, so the
+    files form a consistent snapshot. Rows are streamed with a server-side
+    cursor and written batch by batch to gzip NDJSON files, with compression
+    and file I/O kept off the event loop.
+
+    Job status is mirrored to the shared state backend so that any worker can
+    answer status, download and delete requests (EXPORT_DIR must then be a
+    volume shared by the workers).
+    """
+
+    def __init__(self):
+        self.jobs: Dict[str, ExportJob] = {}
+
+    @staticmethod
+    def _key(job_id: str) -> str:
+        return f"export:job:{job_id}"
+
+    async def _save(self, job: ExportJob) -> None:
+        await shared_state.set(self._key(job.id), job.snapshot(), ttl=settings.EXPORT_RETENTION_HOURS * 3600)
+
+    async def start(self, session_factory: Callable[[], AsyncSession], resource_types: List[str],
+                    since: Optional[datetime], request_url: str) -> ExportJob:
+        await self.purge_expired()
+        job = ExportJob(resource_types, since, request_url)
+        self.jobs[job.id] = job
+        await self._save(job)
+        job.task = asyncio.create_task(self._run(job, session_factory))
+        return job
+
+    async def get(self, job_id: str) -> Optional[ExportJob]:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        data = await shared_state.get(self._key(job_id))
+        return ExportJob.from_snapshot(data) if data else None
+
+    async def delete(self, job_id: str) -> bool:
+        """Cancel a running export or delete a finished one, with its files.
+
+        A job running on another worker notices the deleted snapshot before
+        its next resource type and stops there.
+        """
+        job = self.jobs.pop(job_id, None)
+        if job is None:
+            data = await shared_state.get(self._key(job_id))
+            if not data:
+                return False
+            job = ExportJob.from_snapshot(data)
+        if job.task and not job.task.done():
+            job.task.cancel()
+        await shared_state.delete(self._key(job_id))
+        await asyncio.to_thread(shutil.rmtree, job.directory, ignore_errors=True)
+        return True
+
+    async def purge_expired(self) -> None:
+        cutoff = datetime.utcnow() - timedelta(hours=settings.EXPORT_RETENTION_HOURS)
+        for job_id, job in list(self.jobs.items()):
+            if job.finished_at and job.finished_at < cutoff:
+                await self.delete(job_id)
+
+    def shutdown(self) -> None:
+        for job in self.jobs.values():
+            if job.task and not job.task.done():
+                job.task.cancel()
+
+    async def _run(self, job: ExportJob, session_factory: Callable[[], AsyncSession]) -> None:
+        try:
+            await asyncio.to_thread(job.directory.mkdir, parents=True, exist_ok=True)
+            async with session_factory() as db:
+                await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+                for resource_type in job.resource_types:
+                    if await shared_state.get(self._key(job.id)) is None:
+                        logger.info(f"Export {job.id} was deleted, stopping")
+                        self.jobs.pop(job.id, None)
+                        return
+                    job.progress = f"exporting {resource_type}"
+                    await self._save(job)
+                    count = await self._export_type(db, job, resource_type)
+                    job.output.append({"type": resource_type, "file": f"{resource_type}.ndjson.gz", "count": count})
+            job.status = "completed"
+            job.progress = "completed"
+            logger.info(f"Export {job.id} finished: {sum(o['count'] for o in job.output)} resource(s)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"Export {job.id} failed: {e}")
+        finally:
+            job.finished_at = datetime.utcnow()
+        if job.id in self.jobs:
+            await self._save(job)
+
+    async def _export_type(self, db: AsyncSession, job: ExportJob, resource_type: str) -> int:
+        model, to_fhir, changed_since = EXPORT_RESOURCES[resource_type]
+        query = select(model).order_by(model.id)
+        if job.since is not None:
+            query = query.filter(changed_since(job.since))
+
+        path = job.directory / f"{resource_type}.ndjson.gz"
+        handle = await asyncio.to_thread(gzip.open, path, "wb")
+        count = 0
+        try:
+            result = await db.stream(query.execution_options(yield_per=settings.EXPORT_BATCH_SIZE))
+            async for batch in result.scalars().partitions():
+                data = _ndjson_lines([to_fhir(obj) for obj in batch])
+                await asyncio.to_thread(handle.write, data)
+                count += len(batch)
+                # Nothing is modified, so let the identity map drop the batch
+                db.expunge_all()
+                job.progress = f"exporting {resource_type} ({count} written)"
+        finally:
+            await asyncio.to_thread(handle.close)
+        return count
+
+
+export_manager = ExportManager()
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import os
+import shutil
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.database import AsyncSessionLocal, async_engine
+from app.db.session import engine as auth_engine
+
+logger = logging.getLogger(__name__)
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+class CheckFailed(Exception):
+    pass
+
+
+class CheckDisabled(Exception):
+    """The dependency is not configured in this deployment (not an error)."""
+
+
+@lru_cache(maxsize=1)
+def migration_heads() -> frozenset:
+    """Head revision(s) of the migration scripts shipped with this build."""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(API_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(API_DIR, "alembic"))
+    return frozenset(ScriptDirectory.from_config(config).get_heads())
+
+
+async def check_database() -> str:
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT 1"))
+    pool = async_engine.sync_engine.pool
+    return pool.status() if hasattr(pool, "status") else "ok"
+
+
+async def check_migrations() -> str:
+    async with AsyncSessionLocal() as db:
+        current = set((await db.execute(text("SELECT version_num FROM alembic_version"))).scalars().all())
+    heads = set(await asyncio.to_thread(migration_heads))
+    if current != heads:
+        raise CheckFailed(f"database at {sorted(current) or 'no revision'}, code expects {sorted(heads)}")
+    return ", ".join(sorted(current))
+
+
+async def check_ocr() -> str:
+    path = shutil.which(settings.TESSERACT_CMD)
+    if path is None:
+        raise CheckFailed(f"OCR binary '{settings.TESSERACT_CMD}' not found")
+    return path
+
+
+async def check_terminology() -> str:
+    if not os.getenv("SNOMED_DATA_PATH"):
+        raise CheckDisabled("SNOMED_DATA_PATH not set")
+    from app.fhir.snomed.terminology import get_terminology
+
+    terminology = await asyncio.to_thread(get_terminology)
+    return f"{len(terminology.concepts)} concepts loaded"
+
+
+CHECKS: Dict[str, Callable[[], Awaitable[str]]] = {
+    "database": check_database,
+    "migrations": check_migrations,
+    "ocr": check_ocr,
+    "terminology": check_terminology,
+}
+
+
+async def _run_check(name: str, check: Callable[[], Awaitable[str]]) -> dict:
+    start = time.perf_counter()
+    try:
+        detail = await asyncio.wait_for(check(), timeout=settings.HEALTH_CHECK_TIMEOUT_SECONDS)
+        status = "ok"
+    except CheckDisabled as e:
+        status, detail = "disabled", str(e)
+    except asyncio.TimeoutError:
+        status, detail = "error", f"timed out after {settings.HEALTH_CHECK_TIMEOUT_SECONDS}s"
+    except Exception as e:
+        status, detail = "error", str(e) or type(e).__name__
+    return {
+        "name": name,
+        "status": status,
+        "detail": detail,
+        "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+async def readiness(warmed_up: bool) -> dict:
+    """Run every check concurrently; ready when the required ones pass and warmup has finished."""
+    required = {name.strip() for name in settings.READINESS_REQUIRED_CHECKS.split(",") if name.strip()}
+    results = await asyncio.gather(*(_run_check(name, check) for name, check in CHECKS.items()))
+    checks = {}
+    for result in results:
+        name = result.pop("name")
+        result["required"] = name in required
+        checks[name] = result
+    ready = warmed_up and all(c["status"] == "ok" for c in checks.values() if c["required"])
+    return {"status": "ready" if ready else "not ready", "warmed_up": warmed_up, "checks": checks}
+
+
+# --- Startup warmup ---
+
+async def _warm_pool(engine, connections: int) -> None:
+    """Open `connections` pooled connections at once so the first requests don't pay for connecting."""
+    async def touch():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    await asyncio.gather(*(touch() for _ in range(connections)))
+
+
+async def _asgi_get(app, path: str) -> int:
+    """Issue an in-process GET through the full middleware stack (fills the response cache)."""
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0), "server": ("warmup", 80),
+    }
+    status: List[int] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+    return status[0] if status else 500
+
+
+async def warm_up(app) -> Dict[str, Optional[str]]:
+    """Warm the connection pools, the SNOMED index and the catalog response caches.
+
+    Failures are logged and reported, never raised: readiness will keep
+    failing on its own if a dependency is really down.
+    """
+    steps: Dict[str, Callable[[], Awaitable]] = {
+        "database_pool": lambda: _warm_pool(async_engine, settings.WARMUP_POOL_CONNECTIONS),
+        "auth_pool": lambda: _warm_pool(auth_engine, min(settings.WARMUP_POOL_CONNECTIONS, 2)),
+        "terminology": check_terminology,
+    }
+    for path in filter(None, (p.strip() for p in settings.WARMUP_PATHS.split(","))):
+        steps[f"GET {path}"] = lambda path=path: _asgi_get(app, path)
+
+    results: Dict[str, Optional[str]] = {}
+    start = time.perf_counter()
+    for name, step in steps.items():
+        try:
+            outcome = await step()
+            if isinstance(outcome, int) and outcome >= 400:
+                raise CheckFailed(f"status {outcome}")
+            results[name] = None
+        except CheckDisabled:
+            results[name] = None
+        except Exception as e:
+            results[name] = str(e) or type(e).__name__
+            logger.warning(f"Warmup step {name} failed: {results[name]}")
+    logger.info(f"Warmup finished in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return results
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DateTime, func, insert, literal, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.shared_state import WORKER_ID, shared_state
+from app.models.stock_ledger import StockMovement, StockSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+def record_movement(
+    db: AsyncSession,
+    movement_type: str,
+    medication_id: int,
+    quantity: int,
+    inventory_item_id: Optional[int] = None,
+    balance_after: Optional[int] = None,
+    reference_type: Optional[str] = None,
+    reference_id=None,
+) -> None:
+    """Append a movement to the ledger in the caller's transaction (no-op for a zero change)."""
+    if not quantity:
+        return
+    db.add(StockMovement(
+        movement_type=movement_type,
+        medication_id=medication_id,
+        inventory_item_id=inventory_item_id,
+        quantity=quantity,
+        balance_after=balance_after,
+        reference_type=reference_type,
+        reference_id=str(reference_id) if reference_id is not None else None,
+    ))
+
+
+async def latest_snapshot_time(db: AsyncSession, at: datetime) -> Optional[datetime]:
+    result = await db.execute(select(func.max(StockSnapshot.taken_at)).where(StockSnapshot.taken_at <= at))
+    return result.scalar()
+
+
+def _balances(at: datetime, snapshot_at: Optional[datetime], *filters):
+    """(medication_id, inventory_item_id, quantity) rows: the snapshot at snapshot_at plus the movements after it up to `at`."""
+    movements = select(StockMovement.medication_id, StockMovement.inventory_item_id, StockMovement.quantity).where(
+        StockMovement.occurred_at <= at,
+        *(f(StockMovement) for f in filters),
+    )
+    if snapshot_at is None:
+        combined = movements.subquery()
+    else:
+        snapshot = select(StockSnapshot.medication_id, StockSnapshot.inventory_item_id, StockSnapshot.quantity).where(
+            StockSnapshot.taken_at == snapshot_at,
+            *(f(StockSnapshot) for f in filters),
+        )
+        combined = union_all(movements.where(StockMovement.occurred_at > snapshot_at), snapshot).subquery()
+
+    total = func.sum(combined.c.quantity)
+    return (
+        select(combined.c.medication_id, combined.c.inventory_item_id, total.label("quantity"))
+        .group_by(combined.c.medication_id, combined.c.inventory_item_id)
+        .having(total != 0)
+    )
+
+
+async def snapshot_cutoff(db: AsyncSession) -> datetime:
+    """Latest time (database clock, naive UTC) up to which every movement has committed.
+
+    Movements take occurred_at from the database clock inside their
+    transaction, so one still open can only add movements after its start:
+    the cutoff is now minus STOCK_SNAPSHOT_LAG_SECONDS, and never later than
+    the start of the oldest other open transaction.
+    """
+    result = await db.execute(
+        text("""
+            SELECT least(
+                clock_timestamp() - make_interval(secs => :lag),
+                (SELECT min(xact_start) - interval '1 microsecond' FROM pg_stat_activity
+                 WHERE datname = current_database() AND pid <> pg_backend_pid())
+            ) AT TIME ZONE 'utc'
+        """),
+        {"lag": settings.STOCK_SNAPSHOT_LAG_SECONDS},
+    )
+    return result.scalar()
+
+
+async def take_snapshot(db: AsyncSession, cutoff: Optional[datetime] = None) -> int:
+    """Write every batch's balance as of `cutoff`, from the previous snapshot plus the movements since.
+
+    The default cutoff is snapshot_cutoff(), so no movement committed later
+    can carry an occurred_at at or before it. Returns the number of rows
+    written. Does not commit.
+    """
+    if cutoff is None:
+        cutoff = await snapshot_cutoff(db)
+    previous = await latest_snapshot_time(db, cutoff)
+    if previous == cutoff:
+        return 0
+
+    balances = _balances(cutoff, previous).subquery()
+    result = await db.execute(
+        insert(StockSnapshot).from_select(
+            ["taken_at", "medication_id", "inventory_item_id", "quantity"],
+            select(literal(cutoff, DateTime), balances.c.medication_id, balances.c.inventory_item_id, balances.c.quantity),
+        )
+    )
+    return result.rowcount
+
+
+async def stock_as_of(
+    db: AsyncSession,
+    at: datetime,
+    medication_id: Optional[int] = None,
+    inventory_item_id: Optional[int] = None,
+) -> dict:
+    """Per-batch stock at a point in time: one snapshot read plus the movements since that snapshot."""
+    filters = []
+    if medication_id is not None:
+        filters.append(lambda model: model.medication_id == medication_id)
+    if inventory_item_id is not None:
+        filters.append(lambda model: model.inventory_item_id == inventory_item_id)
+
+    snapshot_at = await latest_snapshot_time(db, at)
+    result = await db.execute(
+        _balances(at, snapshot_at, *filters).order_by("medication_id", "inventory_item_id")
+    )
+    balances = [dict(row) for row in result.mappings()]
+    return {
+        "as_of": at,
+        "snapshot_at": snapshot_at,
+        "total_quantity": sum(b["quantity"] for b in balances),
+        "balances": balances,
+    }
+
+
+async def movement_history(
+    db: AsyncSession,
+    inventory_item_id: Optional[int] = None,
+    medication_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = 100,
+) -> List[StockMovement]:
+    query = select(StockMovement)
+    if inventory_item_id is not None:
+        query = query.filter(StockMovement.inventory_item_id == inventory_item_id)
+    if medication_id is not None:
+        query = query.filter(StockMovement.medication_id == medication_id)
+    if since is not None:
+        query = query.filter(StockMovement.occurred_at >= since)
+    if until is not None:
+        query = query.filter(StockMovement.occurred_at <= until)
+    result = await db.execute(query.order_by(StockMovement.occurred_at.desc(), StockMovement.id.desc()).limit(limit))
+    return result.scalars().all()
+
+
+async def run_snapshots_periodically(session_factory, interval: int) -> None:
+    """Background loop started at application startup; one worker snapshots per interval."""
+    while True:
+        try:
+            if await shared_state.add("lock:stock-snapshot", WORKER_ID, ttl=max(interval - 1, 1)):
+                async with session_factory() as db:
+                    written = await take_snapshot(db)
+                    await db.commit()
+                logger.info(f"Stock snapshot finished, {written} balance(s) written")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Stock snapshot failed: {e}")
+        await asyncio.sleep(interval)
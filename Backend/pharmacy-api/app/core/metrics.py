@@ -0,0 +1,167 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bucket upper bounds (seconds / queries / bytes); +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label tuple (Prometheus semantics)."""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            counts, total = series
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(labels, list(counts), total[0]) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(series):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f'{self.name}_bucket{{{base}{sep}le="{_format(bound)}"}} {cumulative}'
+            cumulative += counts[-1]
+            yield f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {cumulative}'
+            yield f"{self.name}_sum{{{base}}} {_format(total)}"
+            yield f"{self.name}_count{{{base}}} {cumulative}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestStats:
+    """Database work done on behalf of the current request."""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+# Set by MetricsMiddleware for the duration of a request; queries made outside
+# a request (alert engine, export jobs) are simply not attributed.
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_start_time
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency by route",
+            ("method", "route", "status"), LATENCY_BUCKETS,
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Time spent in database queries per request",
+            ("method", "route"), LATENCY_BUCKETS,
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries", "Database queries issued per request",
+            ("method", "route"), QUERY_COUNT_BUCKETS,
+        )
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size",
+            ("method", "route"), SIZE_BUCKETS,
+        )
+
+    def record(self, method: str, route: str, status: int, duration: float,
+               stats: RequestStats, size: int) -> None:
+        self.request_duration.observe((method, route, str(status)), duration)
+        self.request_db_time.observe((method, route), stats.db_time)
+        self.request_queries.observe((method, route), stats.queries)
+        self.response_size.observe((method, route), size)
+
+    def expose(self) -> str:
+        lines: List[str] = []
+        for histogram in (self.request_duration, self.request_db_time, self.request_queries, self.response_size):
+            lines.extend(histogram.expose())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, DB time, query count and response size per route.
+
+    Requests are labelled with the route template (/fhir/Patient/{patient_id}),
+    not the raw path, so label cardinality stays bounded.
+    """
+
+    def __init__(self, app, exclude_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = set(exclude_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+        size = 0
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            metrics.record(scope["method"], route, status, time.perf_counter() - start, stats, size)
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.shared_state import WORKER_ID, shared_state
+
+logger = logging.getLogger(__name__)
+
+# Monthly range-partitioned tables -> partition key column. Ordered parents
+# first: sale_items has a foreign key to sales, so its partitions are created
+# after the sales ones and detached before them.
+PARTITIONED_TABLES: Dict[str, str] = {
+    "sales": "created_at",
+    "sale_items": "sale_created_at",
+    "stock_audit_logs": "timestamp",
+}
+
+# Foreign keys to another partitioned table, dropped from a partition once it
+# is detached (otherwise the referenced month could not be detached)
+CROSS_PARTITION_FKS: Dict[str, str] = {
+    "sale_items": "sale_items_sale_fkey",
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$")
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+async def ensure_partitions(conn, start, end) -> List[str]:
+    """Create the monthly partitions covering [start, end] that don't exist yet.
+
+    `conn` is an AsyncConnection or AsyncSession; runs in its transaction and
+    does not commit. Returns the names of the partitions created.
+    """
+    existing = set((await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid"
+    ))).scalars().all())
+    # Creating a partition briefly locks the parent; give up rather than queue behind long queries
+    await conn.execute(text(f"SET LOCAL lock_timeout = '{settings.PARTITION_LOCK_TIMEOUT_MS}ms'"))
+
+    created = []
+    first, last = month_start(start), month_start(end)
+    for table in PARTITIONED_TABLES:
+        month = first
+        while month <= last:
+            name = partition_name(table, month)
+            if name not in existing:
+                await conn.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                    f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+                ))
+                created.append(name)
+            month = add_months(month, 1)
+    return created
+
+
+async def attached_partitions(conn, table: str) -> Dict[date, str]:
+    """Month -> partition name for the partitions currently attached to `table`."""
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table})
+    partitions = {}
+    for name in result.scalars():
+        match = _PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            partitions[date(int(match["year"]), int(match["month"]), 1)] = name
+    return partitions
+
+
+async def detach_partitions_before(engine, cutoff) -> List[str]:
+    """Detach every monthly partition for a month before `cutoff`'s month.
+
+    Uses DETACH ... CONCURRENTLY (PostgreSQL 14+), which does not block reads
+    or writes on the hot partitions; it can't run in a transaction, so this
+    opens its own autocommit connection. Detached months stay as plain tables
+    (moved to PARTITION_ARCHIVE_TABLESPACE when set) and are no longer scanned
+    by queries on the parent.
+    """
+    cutoff = month_start(cutoff)
+    detached = []
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        concurrently = int((await conn.execute(text("SHOW server_version_num"))).scalar()) >= 140000
+        # Children first: their foreign keys point into the parents' months
+        for table in reversed(list(PARTITIONED_TABLES)):
+            for month, name in sorted((await attached_partitions(conn, table)).items()):
+                if month >= cutoff:
+                    break
+                await conn.execute(text(
+                    f"ALTER TABLE {table} DETACH PARTITION {name}{' CONCURRENTLY' if concurrently else ''}"
+                ))
+                if table in CROSS_PARTITION_FKS:
+                    await conn.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT IF EXISTS {CROSS_PARTITION_FKS[table]}"))
+                if settings.PARTITION_ARCHIVE_TABLESPACE:
+                    await conn.execute(text(f"ALTER TABLE {name} SET TABLESPACE {settings.PARTITION_ARCHIVE_TABLESPACE}"))
+                detached.append(name)
+                logger.info(f"Detached partition {name}")
+    return detached
+
+
+async def maintain_partitions(engine, now: Optional[datetime] = None) -> dict:
+    """Create the next PARTITION_PREMAKE_MONTHS months and detach months past PARTITION_RETENTION_MONTHS."""
+    this_month = month_start(now or datetime.utcnow())
+    async with engine.begin() as conn:
+        created = await ensure_partitions(conn, this_month, add_months(this_month, settings.PARTITION_PREMAKE_MONTHS))
+    detached = []
+    if settings.PARTITION_RETENTION_MONTHS > 0:
+        detached = await detach_partitions_before(engine, add_months(this_month, -settings.PARTITION_RETENTION_MONTHS))
+    return {"created": created, "detached": detached}
+
+
+async def run_maintenance_periodically(engine, interval: int) -> None:
+    """Background loop started at application startup; one worker runs it per interval."""
+    while True:
+        try:
+            if await shared_state.add("lock:partition-maintenance", WORKER_ID, ttl=max(interval - 1, 1)):
+                result = await maintain_partitions(engine)
+                logger.info(
+                    f"Partition maintenance finished: {len(result['created'])} created, "
+                    f"{len(result['detached'])} detached"
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Partition maintenance failed: {e}")
+        await asyncio.sleep(interval)
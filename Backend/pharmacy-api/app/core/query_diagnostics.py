@@ -0,0 +1,119 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<![:\w]):\w+|\?")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+MAX_LOGGED_PARAMETERS = 500
+
+
+def normalize_statement(statement: str) -> str:
+    """Strip literals and bind placeholders so repeats of one query compare equal."""
+    statement = _STRING.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER.sub("?", statement)
+    statement = _IN_LIST.sub("IN (...)", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class QueryTracker:
+    """Counts the statements executed inside one request (or one `track_queries` block)."""
+
+    def __init__(self):
+        self.total = 0
+        self.counts: Counter = Counter()
+
+    def record(self, statement: str) -> None:
+        self.total += 1
+        self.counts[normalize_statement(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(statement, count) for statement, count in self.counts.most_common() if count > threshold]
+
+
+current_tracker: ContextVar[Optional[QueryTracker]] = ContextVar("current_query_tracker", default=None)
+
+
+class QueryDiagnostics:
+    """Slow-query log and N+1 detector. Opt-in: listeners return early unless enabled."""
+
+    def __init__(self, enabled: bool, slow_query_ms: float, repeat_threshold: int):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.repeat_threshold = repeat_threshold
+        # Called with ("GET /route/{id}", tracker) after each request; used by the pytest plugin
+        self.observers: List[Callable[[str, QueryTracker], None]] = []
+
+    def finish_request(self, endpoint: str, tracker: QueryTracker) -> None:
+        repeated = tracker.repeated(self.repeat_threshold)
+        if repeated:
+            details = "; ".join(f"{count}x {statement[:200]}" for statement, count in repeated)
+            logger.warning(f"Possible N+1 in {endpoint} ({tracker.total} queries): {details}")
+        for observer in self.observers:
+            observer(endpoint, tracker)
+
+
+diagnostics = QueryDiagnostics(settings.QUERY_DIAGNOSTICS, settings.SLOW_QUERY_MS, settings.N_PLUS_ONE_THRESHOLD)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryTracker]:
+    """Count the statements run inside the block (same task / context only)."""
+    tracker = QueryTracker()
+    token = current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        current_tracker.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_diagnostics_timer(conn, cursor, statement, parameters, context, executemany):
+    if diagnostics.enabled:
+        context._diagnostics_start_time = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _check_query(conn, cursor, statement, parameters, context, executemany):
+    if not diagnostics.enabled:
+        return
+    elapsed = time.perf_counter() - getattr(context, "_diagnostics_start_time", time.perf_counter())
+    if elapsed >= diagnostics.slow_query_seconds:
+        params = repr(parameters)
+        if len(params) > MAX_LOGGED_PARAMETERS:
+            params = params[:MAX_LOGGED_PARAMETERS] + "..."
+        logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {_WHITESPACE.sub(' ', statement)} | parameters: {params}")
+    tracker = current_tracker.get()
+    if tracker is not None:
+        tracker.record(statement)
+
+
+class QueryDiagnosticsMiddleware:
+    """Tracks the statements of each request and reports repeated ones (N+1 suspects)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not diagnostics.enabled:
+            await self.app(scope, receive, send)
+            return
+        with track_queries() as tracker:
+            await self.app(scope, receive, send)
+        route = getattr(scope.get("route"), "path", None) or scope["path"]
+        diagnostics.finish_request(f"{scope['method']} {route}", tracker)
@@ -0,0 +1,235 @@
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.medication import Medication
+from app.models.medicine_database import MedicineDatabase
+from app.models.organization import Organization
+from app.utils.etag import etag_matches, not_modified
+
+logger = logging.getLogger(__name__)
+
+# (body, etag, media_type, tag versions at the time the body was built)
+CacheEntry = Tuple[bytes, str, str, Tuple[int, ...]]
+
+
+class LocalCacheBackend:
+    """In-process LRU. Each worker has its own copy."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._entries.set(key, entry)
+
+    async def versions(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def bump_nowait(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        self.bump_nowait(tags)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Shared cache in Redis, so every worker sees the same entries and invalidations."""
+
+    def __init__(self, url: str, ttl: float, prefix: str = "response-cache:"):
+        import redis.asyncio as redis  # Imported lazily, only needed with RESPONSE_CACHE_URL
+
+        self._redis = redis.from_url(url)
+        self._ttl = int(ttl)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[CacheEntry]:
+        raw = await self._redis.get(self._prefix + key)
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["body"].encode(), data["etag"], data["media_type"], tuple(data["versions"])
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        body, etag, media_type, versions = entry
+        payload = json.dumps({"body": body.decode(), "etag": etag, "media_type": media_type, "versions": versions})
+        await self._redis.set(self._prefix + key, payload, ex=self._ttl)
+
+    async def versions(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        values = await self._redis.mget([f"{self._prefix}tag:{tag}" for tag in tags])
+        return tuple(int(value or 0) for value in values)
+
+    def bump_nowait(self, tags: Iterable[str]) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self.bump(tags))
+        except RuntimeError:
+            logger.warning("No running event loop, response cache invalidation skipped")
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(f"{self._prefix}tag:{tag}")
+            await pipe.execute()
+
+    def __len__(self) -> int:
+        return 0  # Not tracked for the shared backend
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    """Caches GET response bodies keyed on path and query string.
+
+    Entries are tagged (e.g. "medications" for the list, "medications:12" for
+    one row). Invalidating a tag bumps its version, which makes every entry
+    built under the old version a miss, so a write only evicts the responses
+    it can have changed. Tags are invalidated automatically when a session
+    that changed a cached model commits.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    async def lookup(self, request: Request, tags: Sequence[str]) -> Optional[Response]:
+        """Return the cached response (or a 304) for this request, if still valid."""
+        current = await self.backend.versions(tags)
+        # Remembered for store(): the body about to be built reflects at least
+        # these versions, so a write racing with the request leaves the entry stale
+        request.state.cache_versions = current
+        entry = await self.backend.get(self.key_for(request))
+        if entry is not None:
+            body, etag, media_type, versions = entry
+            if versions == current:
+                self.hits += 1
+                if etag_matches(request.headers.get("if-none-match"), etag):
+                    self.not_modified += 1
+                    return not_modified(etag)
+                return Response(content=body, media_type=media_type, headers={"ETag": etag})
+        self.misses += 1
+        return None
+
+    async def store(self, request: Request, response: Response, tags: Sequence[str],
+                    etag: Optional[str] = None) -> Response:
+        """Cache a freshly built 200 response and tag it with an ETag.
+
+        Without an explicit (version-based) `etag`, one is derived from the body.
+        """
+        if response.status_code != 200:
+            return response
+        versions = getattr(request.state, "cache_versions", None)
+        if versions is None:
+            versions = await self.backend.versions(tags)
+        body = bytes(response.body)
+        etag = etag or make_etag(body)
+        await self.backend.set(self.key_for(request), (body, etag, response.media_type, versions))
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+        return response
+
+    def invalidate_nowait(self, tags: Iterable[str]) -> None:
+        tags = list(tags)
+        if tags:
+            self.invalidations += 1
+            self.backend.bump_nowait(tags)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _make_backend():
+    # With several workers a per-process cache would miss the other workers' invalidations
+    url = settings.RESPONSE_CACHE_URL or settings.SHARED_STATE_URL
+    if url:
+        try:
+            return RedisCacheBackend(url, settings.RESPONSE_CACHE_TTL_SECONDS)
+        except ImportError as e:
+            raise RuntimeError(
+                "RESPONSE_CACHE_URL or SHARED_STATE_URL is set but redis is not installed (pip install redis)"
+            ) from e
+    return LocalCacheBackend(settings.RESPONSE_CACHE_MAX_ENTRIES, settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+response_cache = ResponseCache(_make_backend())
+
+
+# --- Invalidation on commit ---
+
+# Model -> tag prefix of the cached responses built from it
+CACHED_MODELS: Dict[type, str] = {
+    Medication: "medications",
+    Organization: "organizations",
+    MedicineDatabase: "medicine_database",
+}
+
+_PENDING_KEY = "pending_cache_invalidations"
+
+
+def tags_for(prefix: str, ids: Iterable = ()) -> List[str]:
+    """List tag plus one tag per row id."""
+    return [prefix] + [f"{prefix}:{row_id}" for row_id in ids]
+
+
+def invalidate_model(model: type, ids: Iterable = ()) -> None:
+    """Invalidate after Core bulk writes, which bypass the session events below."""
+    prefix = CACHED_MODELS.get(model)
+    if prefix is not None:
+        response_cache.invalidate_nowait(tags_for(prefix, ids))
+
+
+@event.listens_for(Session, "after_flush")
+def _record_cache_tags(session: Session, flush_context) -> None:
+    pending: Set[str] = session.info.setdefault(_PENDING_KEY, set())
+    for obj in [*session.new, *session.dirty, *session.deleted]:
+        prefix = CACHED_MODELS.get(type(obj))
+        if prefix is not None:
+            pending.update(tags_for(prefix, [obj.id]))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_cache_tags(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        response_cache.invalidate_nowait(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_cache_tags(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process in cross-worker messages (so a worker ignores its own)
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class LocalStateBackend:
+    """In-process stand-in, optionally persisted to a JSON file. Correct for one worker only."""
+
+    shared = False
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._data: Dict[str, list] = {}  # key -> [value, expires_at (epoch) or None]
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                self._data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load shared state from {self.path}: {e}")
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump(self._data, f)
+        except OSError as e:
+            logger.warning(f"Could not save shared state to {self.path}: {e}")
+
+    def _live(self, key: str) -> Optional[list]:
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] < time.time():
+            del self._data[key]
+            return None
+        return entry
+
+    async def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = [value, time.time() + ttl if ttl else None]
+            self._save()
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set only if absent (or expired); True when this call set it."""
+        with self._lock:
+            if self._live(key) is not None:
+                return False
+            self._data[key] = [value, time.time() + ttl if ttl else None]
+            self._save()
+            return True
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            if self._data.pop(key, None) is not None:
+                self._save()
+
+    async def publish(self, channel: str, message: dict) -> None:
+        pass  # Single process: local subscribers are notified directly
+
+    async def listen(self, channel: str) -> AsyncIterator[dict]:
+        return
+        yield
+
+
+class RedisStateBackend:
+    """Shared across workers and hosts. Values are stored as JSON."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "pharmacy:"):
+        import redis.asyncio as redis  # Imported lazily, only needed with SHARED_STATE_URL
+
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Any:
+        raw = await self._redis.get(self._prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await self._redis.set(self._prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    async def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        return bool(await self._redis.set(self._prefix + key, json.dumps(value), ex=int(ttl) if ttl else None, nx=True))
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(self._prefix + key)
+
+    async def publish(self, channel: str, message: dict) -> None:
+        await self._redis.publish(self._prefix + channel, json.dumps(message))
+
+    async def listen(self, channel: str) -> AsyncIterator[dict]:
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(self._prefix + channel)
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    yield json.loads(item["data"])
+        finally:
+            await pubsub.unsubscribe(self._prefix + channel)
+            await pubsub.close()
+
+
+def _make_backend():
+    if settings.SHARED_STATE_URL:
+        try:
+            return RedisStateBackend(settings.SHARED_STATE_URL)
+        except ImportError as e:
+            # A silent fallback would give each worker its own codes, jobs and locks
+            raise RuntimeError("SHARED_STATE_URL is set but redis is not installed (pip install redis)") from e
+    return LocalStateBackend(settings.SHARED_STATE_FILE or None)
+
+
+# Verification codes, pending registrations, export job status, leader locks
+# and cross-worker event relay all go through this backend.
+shared_state = _make_backend()
+
+
+def publish_nowait(channel: str, message: dict) -> None:
+    """Fire-and-forget publish from sync code (e.g. session event hooks)."""
+    if not shared_state.shared:
+        return
+    try:
+        asyncio.get_running_loop().create_task(shared_state.publish(channel, message))
+    except RuntimeError:
+        logger.warning(f"No running event loop, message on {channel} not relayed")
@@ -0,0 +1,201 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select, delete, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.events import record_change
+from app.core.ledger import record_movement
+from app.models.inventory import InventoryItem
+from app.models.stock import MedicationStock
+from app.models.stock_ledger import StockMovement
+
+
+class StockConflict(HTTPException):
+    """The batch changed after it was read. Re-read it and retry."""
+
+    def __init__(self, detail: str = "Inventory item was modified concurrently; reload it and retry"):
+        super().__init__(status_code=409, detail=detail, headers={"Retry-After": "0"})
+
+
+def _earliest_expiry(batches: list) -> Optional[datetime]:
+    expiries = [
+        datetime.fromisoformat(b["expiration_date"])
+        for b in batches
+        if b.get("quantity", 0) > 0 and b.get("expiration_date")
+    ]
+    return min(expiries) if expiries else None
+
+
+def _batch_entry(item: InventoryItem, quantity: int) -> dict:
+    return {
+        "inventory_item_id": item.id,
+        "batch_number": item.batch_number,
+        "supplier_id": item.supplier_id,
+        "quantity": quantity,
+        "expiration_date": item.expiration_date.isoformat() if item.expiration_date else None,
+    }
+
+
+async def adjust_batch_quantity(db: AsyncSession, inventory_item: InventoryItem, delta: int) -> int:
+    """Add `delta` to a batch's stock_quantity atomically and return the new quantity.
+
+    Runs `stock_quantity = stock_quantity + :delta` in the database instead of
+    a read-modify-write, so concurrent sales and receipts of the same batch
+    can't overwrite each other. The version is bumped too, so an edit based on
+    an earlier read of the batch fails with StockConflict instead of
+    overwriting this change. The loaded `inventory_item` is updated in place.
+    """
+    result = await db.execute(
+        update(InventoryItem)
+        .where(InventoryItem.id == inventory_item.id)
+        .values(stock_quantity=InventoryItem.stock_quantity + delta, version=InventoryItem.version + 1)
+        .returning(InventoryItem.stock_quantity, InventoryItem.version)
+        .execution_options(synchronize_session=False)
+    )
+    stock_quantity, version = result.one()
+    set_committed_value(inventory_item, "stock_quantity", stock_quantity)
+    set_committed_value(inventory_item, "version", version)
+    record_change(db.sync_session, inventory_item)
+    return stock_quantity
+
+
+async def _get_stock_for_update(db: AsyncSession, medication_id: int) -> MedicationStock:
+    """Load (and row-lock) the projection row, creating it if needed.
+
+    The row is created with INSERT ... ON CONFLICT DO NOTHING, so two
+    concurrent first movements for a medication don't both insert it; the
+    loser then waits on the row lock like any other movement.
+    """
+    stock = await db.get(MedicationStock, medication_id, with_for_update=True)
+    if stock is None:
+        await db.execute(
+            pg_insert(MedicationStock)
+            .values(medication_id=medication_id, total_quantity=0, batches=[], unbatched_quantity=0)
+            .on_conflict_do_nothing(index_elements=[MedicationStock.medication_id])
+        )
+        stock = await db.get(MedicationStock, medication_id, with_for_update=True, populate_existing=True)
+    return stock
+
+
+async def apply_stock_movement(
+    db: AsyncSession,
+    medication_id: int,
+    delta: int,
+    inventory_item: Optional[InventoryItem] = None,
+    purchase_price: Optional[float] = None,
+    movement_type: str = "adjustment",
+    reference_type: Optional[str] = None,
+    reference_id=None,
+) -> MedicationStock:
+    """Apply a stock change to the per-medication projection and the stock ledger.
+
+    Runs in the caller's transaction, so the projection and the ledger entry
+    commit (or roll back) together with the inventory change that caused it.
+    When the movement is tied to a batch, `inventory_item` must already have
+    an id and its stock_quantity must already include `delta`.
+    """
+    record_movement(
+        db, movement_type, medication_id, delta,
+        inventory_item_id=inventory_item.id if inventory_item is not None else None,
+        balance_after=inventory_item.stock_quantity if inventory_item is not None else None,
+        reference_type=reference_type, reference_id=reference_id,
+    )
+    stock = await _get_stock_for_update(db, medication_id)
+    stock.total_quantity = (stock.total_quantity or 0) + delta
+
+    if inventory_item is not None:
+        # Reassign rather than mutate so the JSON column is flagged dirty
+        batches = [dict(b) for b in (stock.batches or [])]
+        entry = _batch_entry(inventory_item, inventory_item.stock_quantity or 0)
+        for index, batch in enumerate(batches):
+            if batch["inventory_item_id"] == inventory_item.id:
+                batches[index] = entry
+                break
+        else:
+            batches.append(entry)
+        stock.batches = batches
+        stock.earliest_expiry = _earliest_expiry(batches)
+    else:
+        stock.unbatched_quantity = (stock.unbatched_quantity or 0) + delta
+
+    if purchase_price is not None:
+        stock.last_purchase_price = purchase_price
+    stock.updated_at = datetime.utcnow()
+    return stock
+
+
+async def remove_stock_batch(
+    db: AsyncSession, medication_id: int, inventory_item_id: int, movement_type: str = "removal"
+) -> None:
+    """Drop a batch from the projection, e.g. when its inventory item is deleted.
+
+    Whatever the batch still held is written off in the ledger.
+    """
+    stock = await _get_stock_for_update(db, medication_id)
+    remaining = []
+    for batch in stock.batches or []:
+        if batch["inventory_item_id"] == inventory_item_id:
+            stock.total_quantity = (stock.total_quantity or 0) - batch["quantity"]
+            record_movement(
+                db, movement_type, medication_id, -batch["quantity"], inventory_item_id=inventory_item_id,
+                balance_after=0, reference_type="inventory_item", reference_id=inventory_item_id,
+            )
+        else:
+            remaining.append(batch)
+    stock.batches = remaining
+    stock.earliest_expiry = _earliest_expiry(remaining)
+    stock.updated_at = datetime.utcnow()
+
+
+async def rebuild_stock_on_hand(db: AsyncSession, medication_id: Optional[int] = None) -> int:
+    """Recompute the projection from inventory_items and the ledger (backfill / repair).
+
+    Batch quantities come from inventory_items; the unbatched quantity is the
+    sum of the ledger movements that are not tied to a batch.
+    Returns the number of medications rebuilt. Does not commit.
+    """
+    query = select(InventoryItem).order_by(InventoryItem.fhir_medication_id, InventoryItem.purchase_date)
+    unbatched_query = (
+        select(StockMovement.medication_id, func.sum(StockMovement.quantity))
+        .where(StockMovement.inventory_item_id.is_(None))
+        .group_by(StockMovement.medication_id)
+    )
+    if medication_id is not None:
+        query = query.filter(InventoryItem.fhir_medication_id == medication_id)
+        unbatched_query = unbatched_query.filter(StockMovement.medication_id == medication_id)
+        await db.execute(delete(MedicationStock).where(MedicationStock.medication_id == medication_id))
+    else:
+        await db.execute(delete(MedicationStock))
+
+    projections = {}
+
+    def projection(stock_medication_id: int) -> MedicationStock:
+        stock = projections.get(stock_medication_id)
+        if stock is None:
+            stock = projections[stock_medication_id] = MedicationStock(
+                medication_id=stock_medication_id, total_quantity=0, batches=[], unbatched_quantity=0
+            )
+        return stock
+
+    for stock_medication_id, quantity in (await db.execute(unbatched_query)).all():
+        if quantity:
+            stock = projection(stock_medication_id)
+            stock.unbatched_quantity = stock.total_quantity = int(quantity)
+
+    result = await db.stream_scalars(query)
+    async for item in result:
+        stock = projection(item.fhir_medication_id)
+        stock.total_quantity += item.stock_quantity or 0
+        stock.batches.append(_batch_entry(item, item.stock_quantity or 0))
+        # Ordered by purchase_date, so the last one seen is the latest price
+        stock.last_purchase_price = item.purchase_price
+
+    for stock in projections.values():
+        stock.earliest_expiry = _earliest_expiry(stock.batches)
+        stock.updated_at = datetime.utcnow()
+    db.add_all(projections.values())
+    return len(projections)
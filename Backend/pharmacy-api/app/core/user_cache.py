@@ -0,0 +1,47 @@
+import copy
+from typing import Optional
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+# Short-lived cache of authenticated practitioners, so routes depending on
+# current_active_user don't reload the practitioners row on every request.
+# Entries are keyed by user id and store the token version they were loaded for.
+user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# From the table, not the mapper: inspecting the mapper here would configure
+# every model before the rest of app.models has been imported.
+_USER_COLUMNS = [column.key for column in User.__table__.columns]
+
+
+def token_version(user: User) -> int:
+    """Version stamped into access tokens; changes whenever the user row changes."""
+    updated_at = user.updated_at or user.created_at
+    return int(updated_at.timestamp() * 1000) if updated_at else 0
+
+
+def cache_user(user: User, version: int) -> None:
+    snapshot = {key: getattr(user, key) for key in _USER_COLUMNS}
+    user_cache.set(user.id, (version, snapshot))
+
+
+def get_cached_user(user_id: int, version: int) -> Optional[User]:
+    """Return a detached copy of the cached user, or None on a miss."""
+    entry = user_cache.get(user_id)
+    if entry is None or entry[0] != version:
+        return None
+    # Each request gets its own instance so mutations never leak between
+    # requests; it can be re-attached with session.add() without a SELECT.
+    user = User(**copy.deepcopy(entry[1]))
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    user_cache.delete(user_id)
@@ -1,54 +1,27 @@
 import random
 import string
-import json
-import os
 from datetime import datetime, timedelta, date
-from typing import Dict, Tuple
-
-# File to store verification data
-VERIFICATION_FILE = "verification_data.json"
-
-def load_verification_data() -> Tuple[Dict[str, Tuple[str, datetime]], Dict[str, Tuple[dict, datetime]]]:
-    """Load verification data from file."""
-    if not os.path.exists(VERIFICATION_FILE):
-        return {}, {}
-    
-    try:
-        with open(VERIFICATION_FILE, 'r') as f:
-            data = json.load(f)
-            # Convert string timestamps back to datetime objects
-            verification_codes = {
-                email: (code, datetime.fromisoformat(exp))
-                for email, (code, exp) in data.get('verification_codes', {}).items()
-            }
-            pending_registrations = {
-                email: (user_data, datetime.fromisoformat(exp))
-                for email, (user_data, exp) in data.get('pending_registrations', {}).items()
-            }
-            return verification_codes, pending_registrations
-    except Exception as e:
-        print(f"Error loading verification data: {e}")
-        return {}, {}
-
-def save_verification_data(verification_codes: Dict[str, Tuple[str, datetime]], 
-                         pending_registrations: Dict[str, Tuple[dict, datetime]]) -> None:
-    """Save verification data to file."""
-    try:
-        # Convert datetime objects to ISO format strings and handle date objects
-        data = {
-            'verification_codes': {
-                email: (code, exp.isoformat())
-                for email, (code, exp) in verification_codes.items()
-            },
-            'pending_registrations': {
-                email: (convert_dates_to_strings(user_data), exp.isoformat())
-                for email, (user_data, exp) in pending_registrations.items()
-            }
-        }
-        with open(VERIFICATION_FILE, 'w') as f:
-            json.dump(data, f)
-    except Exception as e:
-        print(f"Error saving verification data: {e}")
+from typing import Optional, Tuple
+
+from app.core.shared_state import shared_state
+
+# Codes and pending registrations live in the shared state backend so that
+# every worker sees them (register on one worker, verify on another).
+VERIFICATION_TTL = timedelta(hours=24)
+# Entries outlive their expiration briefly so verify can still report "expired"
+EXPIRED_GRACE_SECONDS = 3600
+
+
+def _code_key(email: str) -> str:
+    return f"verification:code:{email}"
+
+
+def _pending_key(email: str) -> str:
+    return f"verification:pending:{email}"
+
+
+def _ttl() -> float:
+    return VERIFICATION_TTL.total_seconds() + EXPIRED_GRACE_SECONDS
 
 def convert_dates_to_strings(obj):
     """Convert date objects to ISO format strings in a dictionary."""
@@ -64,37 +37,56 @@ def generate_verification_code(length: int = 6) -> str:
     """Generate a random verification code."""
     return ''.join(random.choices(string.digits, k=length))
 
-def store_verification_code(email: str, code: str, user_data: dict = None) -> None:
-    """Store a verification code and optional user data."""
-    from app.api.v1.endpoints.auth import verification_codes, pending_registrations
-    
-    expiration = datetime.utcnow() + timedelta(hours=24)
-    verification_codes[email] = (code, expiration)
-    
-    if user_data:
-        pending_registrations[email] = (user_data, expiration)
-    
-    save_verification_data(verification_codes, pending_registrations)
-
-def verify_code(email: str, code: str) -> bool:
+async def store_verification_code(email: str, code: str) -> None:
+    """Store (or replace) the verification code for an email."""
+    expiration = datetime.utcnow() + VERIFICATION_TTL
+    await shared_state.set(_code_key(email), [code, expiration.isoformat()], ttl=_ttl())
+
+
+async def store_pending_registration(email: str, code: str, user_data: dict) -> bool:
+    """Store a pending registration and its code; False if one is already pending for the email."""
+    expiration = datetime.utcnow() + VERIFICATION_TTL
+    added = await shared_state.add(
+        _pending_key(email), [convert_dates_to_strings(user_data), expiration.isoformat()], ttl=_ttl()
+    )
+    if added:
+        await shared_state.set(_code_key(email), [code, expiration.isoformat()], ttl=_ttl())
+    return added
+
+
+async def get_verification_code(email: str) -> Optional[Tuple[str, datetime]]:
+    """Return (code, expiration) for an email, or None."""
+    entry = await shared_state.get(_code_key(email))
+    if entry is None:
+        return None
+    code, expiration = entry
+    return code, datetime.fromisoformat(expiration)
+
+
+async def get_pending_registration(email: str) -> Optional[dict]:
+    """Return the user data of a pending registration, or None."""
+    entry = await shared_state.get(_pending_key(email))
+    return entry[0] if entry is not None else None
+
+
+async def clear_verification(email: str) -> None:
+    """Remove the code and pending registration for an email."""
+    await shared_state.delete(_code_key(email))
+    await shared_state.delete(_pending_key(email))
+
+
+async def verify_code(email: str, code: str) -> bool:
     """Verify a code for a given email."""
-    from app.api.v1.endpoints.auth import verification_codes, pending_registrations
-    
-    if email not in verification_codes:
+    stored = await get_verification_code(email)
+    if stored is None:
         return False
-    
-    stored_code, expiration = verification_codes[email]
-    
+
+    stored_code, expiration = stored
+
     # Check if code has expired
     if datetime.utcnow() > expiration:
-        del verification_codes[email]
-        if email in pending_registrations:
-            del pending_registrations[email]
-        save_verification_data(verification_codes, pending_registrations)
+        await clear_verification(email)
         return False
-    
+
     # Check if code matches
-    if code != stored_code:
-        return False
-    
-    return True 
\ No newline at end of file
+    return code == stored_code
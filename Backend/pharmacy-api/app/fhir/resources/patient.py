@@ -16,11 +16,11 @@ class PatientResource(BaseModel):
     def create_patient(
         # Basic Information
         identifier: List[Dict[str, str]],
-        active: bool = True,
         
         # Name Information
         family_name: str,
         given_names: List[str],
+        active: bool = True,
         prefix: Optional[List[str]] = None,
         suffix: Optional[List[str]] = None,
         
@@ -1,4 +1,5 @@
 import json, os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, List, Dict
 
@@ -32,3 +33,11 @@ class SNOMEDCTTerminology:
             concept for concept in self.concepts.values()
             if term.lower() in concept.get("display", "").lower()
         ]
+
+
+@lru_cache(maxsize=1)
+def get_terminology() -> SNOMEDCTTerminology:
+    """Process-wide SNOMED CT index, loaded on first use (or by the startup warmup)."""
+    terminology = SNOMEDCTTerminology()
+    terminology.load_concepts()
+    return terminology
@@ -0,0 +1,27 @@
+from typing import Optional
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Index
+from sqlalchemy.orm import Mapped
+from datetime import datetime
+from ..database import Base
+
+class InventoryAlert(Base):
+    """Precomputed expiry / low-stock alert, maintained by the alert engine"""
+    __tablename__ = "inventory_alerts"
+
+    id: Mapped[int] = Column(Integer, primary_key=True, index=True)
+    type: Mapped[str] = Column(String(length=20), nullable=False)  # expiry | stock
+    priority: Mapped[str] = Column(String(length=20), nullable=False)  # low | medium | high | critical
+    title: Mapped[str] = Column(String(length=255), nullable=False)
+    description: Mapped[str] = Column(String(length=500), nullable=False)
+    medication_id: Mapped[int] = Column(Integer, ForeignKey("medications.id", ondelete="CASCADE"), nullable=False)
+    # Set for expiry alerts (one per batch), empty for low-stock alerts (one per medication)
+    inventory_item_id: Mapped[Optional[int]] = Column(
+        Integer, ForeignKey("inventory_items.id", ondelete="CASCADE"), nullable=True
+    )
+    details: Mapped[Optional[dict]] = Column(JSON, nullable=True)
+    time: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_inventory_alerts_type_medication", "type", "medication_id"),
+        Index("ix_inventory_alerts_inventory_item_id", "inventory_item_id"),
+    )
@@ -18,19 +18,22 @@ class InventoryItem(Base):
     characteristic: Mapped[List[dict]] = Column(JSON, nullable=True)  # Additional characteristics
     instance: Mapped[List[dict]] = Column(JSON, nullable=True)  # Specific instances
     stock_quantity: Mapped[int] = Column(Integer, nullable=False, default=0)
-
+    # Bumped on every write; ORM updates only apply if it still matches (optimistic locking)
+    version: Mapped[int] = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Pharmacy-specific fields
     fhir_medication_id: Mapped[int] = Column(Integer, ForeignKey("medications.id"), nullable=False)
     batch_number: Mapped[str] = Column(String(length=50), nullable=False)
-    expiration_date: Mapped[datetime] = Column(DateTime, nullable=False)
+    expiration_date: Mapped[datetime] = Column(DateTime, nullable=False, index=True)
     purchase_date: Mapped[datetime] = Column(DateTime, nullable=False)
     purchase_price: Mapped[float] = Column(Float, nullable=False)
     supplier_id: Mapped[int] = Column(Integer, ForeignKey("organizations.id"), nullable=False)
-    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[Optional[datetime]] = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at: Mapped[Optional[datetime]] = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     medication = relationship("Medication", back_populates="inventory_items")
     supplier = relationship("Organization", back_populates="inventory_items")
     sale_items = relationship("SaleItem", back_populates="inventory_items")
+
+    __mapper_args__ = {"version_id_col": version}
@@ -20,8 +20,12 @@ class Medication(Base):
     batch = Column(JSON, nullable=True)
     note = Column(String, nullable=True)
 
+    # Alert thresholds (fall back to LOW_STOCK_THRESHOLD / EXPIRY_ALERT_DAYS when empty)
+    low_stock_threshold = Column(Integer, nullable=True)
+    expiry_alert_days = Column(Integer, nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     sale_items = relationship("SaleItem", back_populates="medication")
     prescriptions = relationship("Prescription", back_populates="medication")
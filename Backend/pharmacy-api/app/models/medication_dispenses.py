@@ -43,7 +43,7 @@ class MedicationDispense(Base):
     
     # Tracking
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     medication = relationship("Medication", back_populates="dispenses")
@@ -1,7 +1,8 @@
-from sqlalchemy import Column, Integer, String, JSON, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, JSON, ForeignKey, Date, DateTime
 from sqlalchemy.orm import relationship
 from ..database import Base
 from enum import Enum
+from datetime import datetime
 
 class Gender(str, Enum):
         male = "male"
@@ -28,6 +29,8 @@ class Patient(Base):
     insurance_company = Column(String, nullable=True)
     insurance_number = Column(String, nullable=True)
 
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
     # Relationships
     medication_requests = relationship("MedicationRequest", back_populates="patient")
     prescriptions = relationship("Prescription", back_populates="patient")
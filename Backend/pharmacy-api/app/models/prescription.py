@@ -46,8 +46,8 @@ class Prescription(Base):
     verification_notes: Mapped[Optional[str]] = Column(String(length=500), nullable=True)
     verified_by: Mapped[Optional[int]] = Column(Integer, ForeignKey("practitioners.id"), nullable=True)
     verified_at: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)
-    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at: Mapped[Optional[datetime]] = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at: Mapped[Optional[datetime]] = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     patient_id: Mapped[int] = Column(Integer, ForeignKey("patients.id"), nullable=False)
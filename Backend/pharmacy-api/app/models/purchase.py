@@ -1,6 +1,7 @@
 from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Float
 from sqlalchemy.orm import relationship
 from ..database import Base
+from datetime import datetime
 
 class Purchase(Base):
     __tablename__ = "purchases"
@@ -24,6 +25,7 @@ class Purchase(Base):
     payment_status = Column(String)  # paid | pending | cancelled
     payment_method = Column(String)
     supplier_id = Column(Integer, ForeignKey("organizations.id"))
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     supplier = relationship("Organization", back_populates="purchases")
@@ -1,15 +1,21 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, JSON, DateTime, ForeignKey, ForeignKeyConstraint, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
 
 class Sale(Base):
+    """Range-partitioned by month on created_at (see app.core.partitions).
+
+    The table's primary key is (id, created_at), as Postgres requires the
+    partition key in it; the ORM still identifies a sale by id alone.
+    """
     __tablename__ = "sales"
 
-    id = Column(Integer, primary_key=True, index=True)
-    invoice_number = Column(String, unique=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    # Globally unique through SaleInvoiceNumber (a unique index here can only cover (invoice_number, created_at))
+    invoice_number = Column(String)
     date = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, primary_key=True, default=datetime.utcnow)
 
     # Foreign key to Organization
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True)
@@ -28,16 +34,42 @@ class Sale(Base):
     patient = relationship("Patient", back_populates="sales")
     sale_items = relationship("SaleItem", back_populates="sale")
 
+    __table_args__ = (
+        # Keyset pagination and date-range filters on GET /sales
+        Index("ix_sales_created_at_id", "created_at", "id"),
+        Index("ix_sales_patient_id_created_at", "patient_id", "created_at"),
+        Index("ix_sales_payment_status_created_at", "payment_status", "created_at"),
+        Index("ix_sales_payment_method_created_at", "payment_method", "created_at"),
+        Index("ix_sales_invoice_number", "invoice_number", "created_at", unique=True),
+    )
+    __mapper_args__ = {"primary_key": [id]}
+
+
+class SaleInvoiceNumber(Base):
+    """Invoice numbers in use, one row per sale, filled by a trigger on sales.
+
+    Unpartitioned, so its primary key enforces invoice-number uniqueness across
+    every month of sales. Rows stay when a sale is archived or its month
+    detached, so numbers are never reused.
+    """
+    __tablename__ = "sale_invoice_numbers"
+
+    invoice_number = Column(String, primary_key=True)
+    sale_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
 
 class SaleItem(Base):
+    """Range-partitioned by month on its sale's created_at, copied into sale_created_at"""
     __tablename__ = "sale_items"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     sequence = Column(Integer)
     charge_item = Column(JSON)  # Billing-related details
     price_component = Column(JSON)  # Discounts, taxes, etc.
 
-    sale_id = Column(Integer, ForeignKey("sales.id"))
+    sale_id = Column(Integer, index=True)
+    sale_created_at = Column(DateTime, primary_key=True)
     medication_id = Column(Integer, ForeignKey("medications.id"))
     inventory_item_id = Column(Integer, ForeignKey("inventory_items.id"), nullable=True)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True)
@@ -51,3 +83,10 @@ class SaleItem(Base):
     medication = relationship("Medication", back_populates="sale_items")
     organization = relationship("Organization")  # Optional, if each item can have different org
     inventory_items = relationship("InventoryItem", back_populates="sale_items")
+
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["sale_id", "sale_created_at"], ["sales.id", "sales.created_at"], name="sale_items_sale_fkey"
+        ),
+    )
+    __mapper_args__ = {"primary_key": [id]}
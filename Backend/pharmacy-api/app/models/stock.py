@@ -0,0 +1,26 @@
+from typing import Optional, List
+from sqlalchemy import Column, Integer, JSON, DateTime, ForeignKey, Float
+from sqlalchemy.orm import Mapped, relationship
+from datetime import datetime
+from ..database import Base
+
+class MedicationStock(Base):
+    """Per-medication stock-on-hand projection, maintained incrementally.
+
+    One row per medication, so "how many do we have?" is a primary-key read
+    instead of a sum over every InventoryItem batch.
+    """
+    __tablename__ = "medication_stock"
+
+    medication_id: Mapped[int] = Column(Integer, ForeignKey("medications.id"), primary_key=True)
+    total_quantity: Mapped[int] = Column(Integer, nullable=False, default=0)
+    # [{"inventory_item_id", "batch_number", "supplier_id", "quantity", "expiration_date"}]
+    batches: Mapped[List[dict]] = Column(JSON, nullable=False, default=list)
+    # Movements not tied to a batch (sale lines and dispenses by medication only);
+    # total_quantity = sum of batch quantities + unbatched_quantity
+    unbatched_quantity: Mapped[int] = Column(Integer, nullable=False, default=0, server_default="0")
+    earliest_expiry: Mapped[Optional[datetime]] = Column(DateTime, nullable=True)  # Of batches still in stock
+    last_purchase_price: Mapped[Optional[float]] = Column(Float, nullable=True)
+    updated_at: Mapped[datetime] = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    medication = relationship("Medication")
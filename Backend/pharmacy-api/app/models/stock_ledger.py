@@ -0,0 +1,54 @@
+from typing import Optional
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Identity, Index, func
+from sqlalchemy.orm import Mapped
+from datetime import datetime
+from ..database import Base
+
+class StockMovement(Base):
+    """One stock change, appended by every purchase, sale, dispense and adjustment.
+
+    Rows are never updated or deleted (a trigger rejects it); corrections are
+    new movements. The primary key includes occurred_at so the table can be
+    range-partitioned by month.
+    """
+    __tablename__ = "stock_movements"
+
+    id: Mapped[int] = Column(BigInteger, Identity(), primary_key=True)
+    # Database clock (UTC) at insert, so movements and snapshot cutoffs share one clock
+    occurred_at: Mapped[datetime] = Column(
+        DateTime, primary_key=True, default=func.timezone("utc", func.clock_timestamp())
+    )
+    # opening | receipt | receipt_reversal | sale | dispense | dispense_reversal | adjustment | removal
+    movement_type: Mapped[str] = Column(String(length=30), nullable=False)
+    medication_id: Mapped[int] = Column(Integer, nullable=False)
+    # Empty for movements not tied to a batch (e.g. a sale line without inventory_item_id)
+    inventory_item_id: Mapped[Optional[int]] = Column(Integer, nullable=True)
+    quantity: Mapped[int] = Column(Integer, nullable=False)  # Signed: + into stock, - out of stock
+    balance_after: Mapped[Optional[int]] = Column(Integer, nullable=True)  # Batch balance, when tied to a batch
+    reference_type: Mapped[Optional[str]] = Column(String(length=30), nullable=True)  # sale | purchase | dispense | inventory_item
+    reference_id: Mapped[Optional[str]] = Column(String(length=64), nullable=True)
+
+    __table_args__ = (
+        Index("ix_stock_movements_occurred_at", "occurred_at"),
+        Index("ix_stock_movements_inventory_item_occurred_at", "inventory_item_id", "occurred_at"),
+        Index("ix_stock_movements_medication_occurred_at", "medication_id", "occurred_at"),
+        Index("ix_stock_movements_reference", "reference_type", "reference_id"),
+    )
+
+class StockSnapshot(Base):
+    """Per-batch balance at taken_at, derived from the ledger.
+
+    Snapshots are taken for all batches at once, so stock as of any time is
+    the latest snapshot before it plus the movements since.
+    """
+    __tablename__ = "stock_snapshots"
+
+    id: Mapped[int] = Column(BigInteger, primary_key=True)
+    taken_at: Mapped[datetime] = Column(DateTime, nullable=False)
+    medication_id: Mapped[int] = Column(Integer, nullable=False)
+    inventory_item_id: Mapped[Optional[int]] = Column(Integer, nullable=True)  # Empty: the medication's unbatched balance
+    quantity: Mapped[int] = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_snapshots_taken_at_medication", "taken_at", "medication_id"),
+    )
@@ -43,6 +43,9 @@ class User(SQLAlchemyBaseUserTable[int], Base):
 
 
     def verify_password(self, plain_password: str) -> bool:
-        from passlib.context import CryptContext
-        pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-        return pwd_context.verify(plain_password, self.hashed_password)
+        from app.core.security import verify_password
+        return verify_password(plain_password, self.hashed_password)
+
+    async def verify_password_async(self, plain_password: str) -> bool:
+        from app.core.security import verify_password_async
+        return await verify_password_async(plain_password, self.hashed_password)
@@ -1,20 +1,38 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.models.audit_log import StockAuditLog
 from app.schemas.audit_log import AuditLogCreate, AuditLogResponse
-from typing import List
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 router = APIRouter(prefix="/audit-logs", tags=["Audit Logs"])
 
 @router.post("/", response_model=AuditLogResponse)
-def create_log(log: AuditLogCreate, db: Session = Depends(get_db)):
-    db_log = StockAuditLog(**log.dict())
+async def create_log(log: AuditLogCreate, db: AsyncSession = Depends(get_db)):
+    db_log = StockAuditLog(**log.model_dump())
     db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
+    await db.commit()
+    await db.refresh(db_log)
     return db_log
 
 @router.get("/", response_model=List[AuditLogResponse])
-def get_logs(db: Session = Depends(get_db)):
-    return db.query(StockAuditLog).order_by(StockAuditLog.timestamp.desc()).all()
+async def get_logs(
+    date_from: Optional[datetime] = Query(None, description="Defaults to 30 days ago"),
+    date_to: Optional[datetime] = None,
+    inventory_item_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Audit entries newest first, within a time range (only the partitions for that range are scanned)"""
+    date_from = date_from.replace(tzinfo=None) if date_from else datetime.utcnow() - timedelta(days=30)
+    query = select(StockAuditLog).filter(StockAuditLog.timestamp >= date_from)
+    if date_to:
+        query = query.filter(StockAuditLog.timestamp < date_to.replace(tzinfo=None))
+    if inventory_item_id:
+        query = query.filter(StockAuditLog.inventory_item_id == inventory_item_id)
+
+    result = await db.execute(query.order_by(StockAuditLog.timestamp.desc()).offset(skip).limit(limit))
+    return result.scalars().all()
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal
+
+from ..database import get_db
+from ..models.user import User
+from ..core.auth import current_active_user
+from ..core.bulk_import import NDJSONImporter, iter_ndjson_lines
+
+router = APIRouter(prefix="/fhir", tags=["Bulk Data"])
+
+@router.post("/{resource_type}/$import")
+async def import_ndjson(
+    resource_type: Literal["Patient", "Medication"],
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_active_user)
+):
+    """Bulk-load Patient or Medication resources from an NDJSON request body
+
+    One resource per line, in the PatientCreate / MedicationCreate shape or as
+    written by $export. Send `Content-Encoding: gzip` for compressed files. The
+    body is parsed as it streams in, validated and inserted in batches, and
+    invalid lines are skipped and listed by line number in the report.
+    """
+    gzipped = request.headers.get("content-encoding", "").lower() == "gzip"
+    importer = NDJSONImporter(resource_type)
+    return await importer.run(db, iter_ndjson_lines(request.stream(), gzipped=gzipped))
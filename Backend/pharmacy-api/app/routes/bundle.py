@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db
+from ..models.user import User
+from ..schemas.bundle import Bundle, BundleResponse
+from ..core.auth import current_active_user
+from ..core.bundle import BundleProcessor
+from ..core.config import settings
+from ..core.response_cache import invalidate_model
+from ..utils.serialization import ORMSerializer
+
+router = APIRouter(prefix="/fhir", tags=["Bundle"])
+
+bundle_response_serializer = ORMSerializer(BundleResponse)
+
+@router.post("/", response_model=BundleResponse)
+async def process_bundle(
+    bundle: Bundle,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(current_active_user)
+):
+    """Create Patient, Medication and MedicationRequest resources from a transaction or batch Bundle
+
+    Entries reference each other through their fullUrl, e.g. a MedicationRequest with
+    {"subject": {"reference": "urn:uuid:<patient fullUrl>"}}; existing resources are
+    referenced as Patient/<id>, Medication/<id> and Practitioner/<id>. Each resource
+    type is stored with one bulk insert and the whole bundle commits at once.
+    """
+    if len(bundle.entry) > settings.BUNDLE_MAX_ENTRIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Bundle has {len(bundle.entry)} entries, the limit is {settings.BUNDLE_MAX_ENTRIES}"
+        )
+
+    processor = BundleProcessor(bundle)
+    try:
+        response = await processor.process(db)
+        await db.commit()
+    except HTTPException:
+        await db.rollback()
+        raise
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    for model, ids in processor.inserted.items():
+        invalidate_model(model, ids)
+
+    return bundle_response_serializer.response(response)
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import json
+
+from ..core.events import event_bus, TOPICS
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+# Seconds between keep-alive comments so proxies don't drop idle streams
+HEARTBEAT_INTERVAL = 15
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    topics: Optional[str] = Query(None, description=f"Comma-separated topics to receive: {', '.join(TOPICS)}")
+):
+    """Server-sent events stream of inventory, stock, sale, purchase and dispense changes.
+
+    Each event is named after its topic and carries {"op": created|updated|deleted, "data": {...}}.
+    A `resync` event means deltas were dropped and the client should re-fetch.
+    """
+    selected = None
+    if topics:
+        selected = {topic.strip() for topic in topics.split(",") if topic.strip()}
+        unknown = selected - set(TOPICS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown topics: {', '.join(sorted(unknown))}")
+
+    queue = event_bus.subscribe(selected)
+
+    async def event_source():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    topic, message = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {topic}\ndata: {json.dumps(message)}\n\n"
+        finally:
+            event_bus.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
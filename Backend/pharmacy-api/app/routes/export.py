@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
+from typing import Optional
+from datetime import datetime, timezone
+
+from ..database import AsyncSessionLocal
+from ..models.user import User
+from ..core.auth import current_active_user
+from ..core.bundle import operation_outcome
+from ..core.export import export_manager, EXPORT_RESOURCES
+
+router = APIRouter(prefix="/fhir", tags=["Bulk Data"])
+
+NDJSON_FORMATS = {"application/fhir+ndjson", "application/ndjson", "ndjson"}
+
+@router.get("/$export", status_code=202)
+async def kick_off_export(
+    request: Request,
+    _type: Optional[str] = Query(None, description=f"Comma-separated resource types: {', '.join(EXPORT_RESOURCES)}"),
+    _since: Optional[datetime] = Query(None, description="Only resources changed after this instant"),
+    _outputFormat: Optional[str] = Query(None, description="application/fhir+ndjson (the only format)"),
+    current_user: User = Depends(current_active_user)
+):
+    """Start an asynchronous FHIR Bulk Data export.
+
+    Poll the Content-Location URL until it returns 200 with the manifest of
+    gzip NDJSON files, one per resource type.
+    """
+    if _outputFormat and _outputFormat not in NDJSON_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported _outputFormat '{_outputFormat}'")
+
+    resource_types = list(EXPORT_RESOURCES)
+    if _type:
+        resource_types = [t.strip() for t in _type.split(",") if t.strip()]
+        unknown = set(resource_types) - set(EXPORT_RESOURCES)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unsupported _type: {', '.join(sorted(unknown))}")
+
+    since = _since
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+    job = await export_manager.start(AsyncSessionLocal, resource_types, since, str(request.url))
+    status_url = request.url_for("get_export_status", job_id=job.id)
+    return Response(status_code=202, headers={"Content-Location": str(status_url)})
+
+@router.get("/$export-status/{job_id}")
+async def get_export_status(
+    job_id: str,
+    request: Request,
+    current_user: User = Depends(current_active_user)
+):
+    """202 while running, 200 with the manifest when complete"""
+    job = await export_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+
+    if job.status == "in-progress":
+        return Response(status_code=202, headers={"X-Progress": job.progress, "Retry-After": "5"})
+
+    if job.status == "failed":
+        return JSONResponse(
+            status_code=500,
+            content=operation_outcome([(f"Export failed: {job.error}", None)]),
+        )
+
+    return {
+        "transactionTime": job.transaction_time.replace(tzinfo=timezone.utc).isoformat(),
+        "request": job.request_url,
+        "requiresAccessToken": True,
+        "output": [
+            {
+                "type": output["type"],
+                "url": str(request.url_for("get_export_file", job_id=job.id, file_name=output["file"])),
+                "count": output["count"],
+            }
+            for output in job.output
+        ],
+        "error": [],
+    }
+
+@router.delete("/$export-status/{job_id}", status_code=202)
+async def delete_export(job_id: str, current_user: User = Depends(current_active_user)):
+    """Cancel a running export, or delete a finished export's files"""
+    if not await export_manager.delete(job_id):
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return Response(status_code=202)
+
+@router.get("/$export-file/{job_id}/{file_name}")
+async def get_export_file(
+    job_id: str,
+    file_name: str,
+    current_user: User = Depends(current_active_user)
+):
+    """Download one gzip-compressed NDJSON output file"""
+    job = await export_manager.get(job_id)
+    if not job or job.status != "completed":
+        raise HTTPException(status_code=404, detail="Export job not found")
+    if file_name not in {output["file"] for output in job.output}:
+        raise HTTPException(status_code=404, detail="Export file not found")
+
+    return FileResponse(
+        job.directory / file_name,
+        media_type="application/fhir+ndjson",
+        headers={"Content-Encoding": "gzip"},
+    )
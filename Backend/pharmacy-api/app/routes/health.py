@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from ..core.health import readiness
+
+router = APIRouter(prefix="/api/health", tags=["System"])
+
+
+@router.get("/live", summary="Liveness probe")
+def liveness():
+    """The process is up and serving; touches no dependency"""
+    return {"status": "alive", "timestamp": datetime.utcnow().isoformat()}
+
+
+@router.get("/ready", summary="Readiness probe")
+async def readiness_probe(request: Request):
+    """503 until startup warmup has finished and the required dependencies are healthy"""
+    report = await readiness(getattr(request.app.state, "warmed_up", False))
+    return JSONResponse(report, status_code=200 if report["status"] == "ready" else 503)
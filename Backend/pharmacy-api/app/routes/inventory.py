@@ -1,166 +1,328 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy.orm.exc import StaleDataError
+from typing import List, Optional, Literal, Union
+from datetime import datetime, timezone
 
 from ..database import get_db
 from ..models.inventory import InventoryItem
 from ..models.medication import Medication
-from ..schemas.inventory import InventoryItemCreate, InventoryItemOut
-from ..schemas.medication import CodeableConcept
+from ..models.stock import MedicationStock
+from ..models.alert import InventoryAlert
+from ..schemas.inventory import InventoryItemCreate, InventoryItemUpdate, InventoryItemOut, InventoryItemSummary
+from ..schemas.stock import MedicationStockOut, StockAsOfOut, StockMovementOut
+from ..schemas.alert import InventoryAlertOut
+from ..core.stock import StockConflict, apply_stock_movement, remove_stock_batch, rebuild_stock_on_hand
+from ..core.alerts import alert_engine
+from ..core.ledger import movement_history, stock_as_of, take_snapshot
+from ..utils.serialization import ORMSerializer
 
 router = APIRouter(
     prefix="/inventory",
     tags=["inventory"]
 )
 
-def transform_medication_to_codeable_concept(medication: Medication) -> CodeableConcept:
-    """Transform a Medication model into a CodeableConcept"""
-    return CodeableConcept(
-        system=medication.code_system,
-        value=medication.code_value,
-        display=medication.code_display or "Medication"
+inventory_serializer = ORMSerializer(InventoryItemOut)
+inventory_summary_serializer = ORMSerializer(InventoryItemSummary)
+
+# Columns selected for the full InventoryItemOut view
+INVENTORY_COLUMNS = (
+    InventoryItem.id,
+    InventoryItem.identifier,
+    InventoryItem.status,
+    InventoryItem.code,
+    InventoryItem.quantity,
+    InventoryItem.characteristic,
+    InventoryItem.instance,
+    InventoryItem.stock_quantity,
+    InventoryItem.version,
+    InventoryItem.fhir_medication_id,
+    InventoryItem.batch_number,
+    InventoryItem.expiration_date,
+    InventoryItem.purchase_date,
+    InventoryItem.purchase_price,
+    InventoryItem.supplier_id,
+)
+
+# Columns selected for the stock grid summary view
+SUMMARY_COLUMNS = (
+    InventoryItem.id,
+    InventoryItem.status,
+    InventoryItem.fhir_medication_id,
+    Medication.code_display.label("medication_display"),
+    InventoryItem.batch_number,
+    InventoryItem.expiration_date,
+    InventoryItem.stock_quantity,
+    InventoryItem.supplier_id,
+)
+
+def inventory_select(*columns):
+    """Projected inventory query joined to the medication code fields"""
+    return (
+        select(*columns)
+        .join(Medication, InventoryItem.fhir_medication_id == Medication.id)
+    )
+
+def full_inventory_select():
+    return inventory_select(
+        *INVENTORY_COLUMNS,
+        Medication.code_system,
+        Medication.code_value,
+        Medication.code_display,
+    )
+
+def medication_codeable_concept(code_system: str, code_value: str, code_display: Optional[str]) -> dict:
+    """Build the CodeableConcept for a medication's code fields"""
+    return {
+        "system": code_system,
+        "value": code_value,
+        "display": code_display or "Medication"
+    }
+
+def inventory_row_to_dict(row) -> dict:
+    """Map a full_inventory_select() row to the InventoryItemOut shape"""
+    data = dict(row._mapping)
+    data["medication"] = medication_codeable_concept(
+        data.pop("code_system"), data.pop("code_value"), data.pop("code_display")
     )
+    return data
+
+def inventory_item_to_dict(item: InventoryItem, medication: Medication) -> dict:
+    """Map an in-session InventoryItem to the InventoryItemOut shape without reloading it"""
+    data = {column.key: getattr(item, column.key) for column in INVENTORY_COLUMNS}
+    data["medication"] = medication_codeable_concept(
+        medication.code_system, medication.code_value, medication.code_display
+    )
+    return data
 
 @router.post("/", response_model=InventoryItemOut)
 async def create_inventory_item(item: InventoryItemCreate, db: AsyncSession = Depends(get_db)):
     """Create a new inventory item"""
     # Get the medication
-    result = await db.execute(select(Medication).filter(Medication.id == item.fhir_medication_id))
-    medication = result.scalar_one_or_none()
+    medication = await db.get(Medication, item.fhir_medication_id)
     if not medication:
         raise HTTPException(status_code=404, detail=f"Medication with ID {item.fhir_medication_id} not found")
 
     # Create inventory item without relationships
     item_data = item.model_dump(exclude={'medication'})
-    
+
     # Convert timezone-aware datetimes to naive
     if item_data.get('expiration_date'):
         item_data['expiration_date'] = item_data['expiration_date'].replace(tzinfo=None)
     if item_data.get('purchase_date'):
         item_data['purchase_date'] = item_data['purchase_date'].replace(tzinfo=None)
-    
+
     db_item = InventoryItem(**item_data)
-    
+
     # Set the medication relationship
     db_item.medication = medication
-    
+
     db.add(db_item)
-    await db.commit()
-    await db.refresh(db_item)
-    
-    # Reload the item with the relationship
-    result = await db.execute(
-        select(InventoryItem)
-        .options(selectinload(InventoryItem.medication))
-        .filter(InventoryItem.id == db_item.id)
+    await db.flush()
+    await apply_stock_movement(
+        db, medication.id, db_item.stock_quantity or 0,
+        inventory_item=db_item, purchase_price=db_item.purchase_price,
+        movement_type="receipt", reference_type="inventory_item", reference_id=db_item.id
     )
-    db_item = result.scalar_one()
-    
-    # Transform the response
-    response_data = db_item.__dict__.copy()
-    response_data['medication'] = transform_medication_to_codeable_concept(db_item.medication)
-    return response_data
-
-@router.get("/", response_model=List[InventoryItemOut])
+    await db.commit()
+
+    # Sessions don't expire on commit, so the item and medication are still loaded
+    return inventory_serializer.response(inventory_item_to_dict(db_item, medication))
+
+@router.get("/", response_model=List[Union[InventoryItemOut, InventoryItemSummary]])
 async def list_inventory_items(
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
     medication_id: Optional[int] = None,
     supplier_id: Optional[int] = None,
+    view: Literal["full", "summary"] = Query("full", description="full | summary (stock grid columns only)"),
     db: AsyncSession = Depends(get_db)
 ):
     """List all inventory items with optional filters"""
-    query = select(InventoryItem).options(selectinload(InventoryItem.medication))
-    
+    if view == "summary":
+        query = inventory_select(*SUMMARY_COLUMNS)
+    else:
+        query = full_inventory_select()
+
     if status:
         query = query.filter(InventoryItem.status == status)
     if medication_id:
         query = query.filter(InventoryItem.fhir_medication_id == medication_id)
     if supplier_id:
         query = query.filter(InventoryItem.supplier_id == supplier_id)
-    
-    result = await db.execute(query.offset(skip).limit(limit))
-    items = result.scalars().all()
-    
-    # Transform the response
-    return [
-        {**item.__dict__, 'medication': transform_medication_to_codeable_concept(item.medication)}
-        for item in items
-    ]
+
+    result = await db.execute(query.order_by(InventoryItem.id).offset(skip).limit(limit))
+
+    if view == "summary":
+        return inventory_summary_serializer.list_response(result.mappings().all())
+    return inventory_serializer.list_response([inventory_row_to_dict(row) for row in result])
+
+@router.get("/stock", response_model=List[MedicationStockOut])
+async def list_stock_on_hand(
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """Stock-on-hand per medication"""
+    result = await db.execute(
+        select(MedicationStock).order_by(MedicationStock.medication_id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+@router.get("/stock/as-of", response_model=StockAsOfOut)
+async def get_stock_as_of(
+    at: datetime = Query(..., description="Point in time (UTC)"),
+    medication_id: Optional[int] = None,
+    inventory_item_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    """Per-batch stock at a point in time, from the latest snapshot before it plus the ledger since"""
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return await stock_as_of(db, at, medication_id=medication_id, inventory_item_id=inventory_item_id)
+
+@router.post("/stock/snapshots")
+async def create_stock_snapshot(db: AsyncSession = Depends(get_db)):
+    """Snapshot every batch's balance now instead of waiting for the scheduled run"""
+    written = await take_snapshot(db)
+    await db.commit()
+    return {"message": f"{written} balance(s) snapshotted"}
+
+@router.get("/stock/{medication_id}", response_model=MedicationStockOut)
+async def get_stock_on_hand(medication_id: int, db: AsyncSession = Depends(get_db)):
+    """How many units of a medication are on hand (single primary-key read)"""
+    stock = await db.get(MedicationStock, medication_id)
+    if not stock:
+        # Nothing has ever been received for this medication
+        medication = await db.get(Medication, medication_id)
+        if not medication:
+            raise HTTPException(status_code=404, detail=f"Medication with ID {medication_id} not found")
+        return MedicationStockOut(medication_id=medication_id, total_quantity=0)
+    return stock
+
+@router.post("/stock/rebuild")
+async def rebuild_stock(medication_id: Optional[int] = None, db: AsyncSession = Depends(get_db)):
+    """Recompute stock-on-hand from inventory items"""
+    rebuilt = await rebuild_stock_on_hand(db, medication_id)
+    await db.commit()
+    return {"message": f"Rebuilt stock-on-hand for {rebuilt} medication(s)"}
+
+@router.get("/alerts", response_model=List[InventoryAlertOut])
+async def list_inventory_alerts(
+    type: Optional[Literal["expiry", "stock"]] = None,
+    priority: Optional[str] = None,
+    medication_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db)
+):
+    """Precomputed expiry and low-stock alerts"""
+    query = select(InventoryAlert)
+    if type:
+        query = query.filter(InventoryAlert.type == type)
+    if priority:
+        query = query.filter(InventoryAlert.priority == priority)
+    if medication_id:
+        query = query.filter(InventoryAlert.medication_id == medication_id)
+
+    result = await db.execute(query.order_by(InventoryAlert.time.desc()).offset(skip).limit(limit))
+    return result.scalars().all()
+
+@router.post("/alerts/refresh")
+async def refresh_inventory_alerts(full: bool = False, db: AsyncSession = Depends(get_db)):
+    """Run the alert engine now instead of waiting for the next scheduled scan"""
+    written = await alert_engine.run(db, full=full)
+    return {"message": f"{written} alert(s) written"}
 
 @router.get("/{item_id}", response_model=InventoryItemOut)
 async def get_inventory_item(item_id: int, db: AsyncSession = Depends(get_db)):
     """Get a specific inventory item by ID"""
-    result = await db.execute(
-        select(InventoryItem)
-        .options(selectinload(InventoryItem.medication))
-        .filter(InventoryItem.id == item_id)
-    )
-    item = result.scalar_one_or_none()
-    if not item:
+    result = await db.execute(full_inventory_select().filter(InventoryItem.id == item_id))
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    
-    # Transform the response
-    response_data = item.__dict__.copy()
-    response_data['medication'] = transform_medication_to_codeable_concept(item.medication)
-    return response_data
+
+    return inventory_serializer.response(inventory_row_to_dict(row))
+
+@router.get("/{item_id}/movements", response_model=List[StockMovementOut])
+async def list_inventory_item_movements(
+    item_id: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Stock ledger entries of one batch, newest first"""
+    if since is not None and since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    if until is not None and until.tzinfo is not None:
+        until = until.astimezone(timezone.utc).replace(tzinfo=None)
+    return await movement_history(db, inventory_item_id=item_id, since=since, until=until, limit=limit)
 
 @router.put("/{item_id}", response_model=InventoryItemOut)
 async def update_inventory_item(
     item_id: int,
-    item: InventoryItemCreate,
+    item: InventoryItemUpdate,
     db: AsyncSession = Depends(get_db)
 ):
-    """Update an inventory item"""
-    result = await db.execute(
-        select(InventoryItem)
-        .options(selectinload(InventoryItem.medication))
-        .filter(InventoryItem.id == item_id)
-    )
-    db_item = result.scalar_one_or_none()
+    """Update an inventory item
+
+    Compare-and-swap on the item's version: the write only applies if nobody
+    changed the item since it was read (by this request, or by the client
+    when it sends `version`). Otherwise 409, and the client re-reads and retries.
+    """
+    db_item = await db.get(InventoryItem, item_id)
     if not db_item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    
+    if item.version is not None and item.version != db_item.version:
+        raise StockConflict(f"Inventory item is at version {db_item.version}, not {item.version}; reload it and retry")
+
     # Get the medication
-    result = await db.execute(select(Medication).filter(Medication.id == item.fhir_medication_id))
-    medication = result.scalar_one_or_none()
+    medication = await db.get(Medication, item.fhir_medication_id)
     if not medication:
         raise HTTPException(status_code=404, detail=f"Medication with ID {item.fhir_medication_id} not found")
-    
+
+    old_medication_id = db_item.fhir_medication_id
+    old_quantity = db_item.stock_quantity or 0
+
     # Update fields
-    item_data = item.model_dump(exclude={'medication'})
-    
+    item_data = item.model_dump(exclude={'medication', 'version'})
+
     # Convert timezone-aware datetimes to naive
     if item_data.get('expiration_date'):
         item_data['expiration_date'] = item_data['expiration_date'].replace(tzinfo=None)
     if item_data.get('purchase_date'):
         item_data['purchase_date'] = item_data['purchase_date'].replace(tzinfo=None)
-    
+
     for key, value in item_data.items():
         setattr(db_item, key, value)
-    
+
     # Update medication relationship
     db_item.medication = medication
-    
-    await db.commit()
-    await db.refresh(db_item)
-    
-    # Reload the item with the relationship
-    result = await db.execute(
-        select(InventoryItem)
-        .options(selectinload(InventoryItem.medication))
-        .filter(InventoryItem.id == db_item.id)
-    )
-    db_item = result.scalar_one()
-    
-    # Transform the response
-    response_data = db_item.__dict__.copy()
-    response_data['medication'] = transform_medication_to_codeable_concept(db_item.medication)
-    return response_data
+
+    try:
+        # Keep the stock-on-hand projection in step with the manual adjustment
+        if old_medication_id != medication.id:
+            await remove_stock_batch(db, old_medication_id, db_item.id, movement_type="adjustment")
+            await apply_stock_movement(
+                db, medication.id, db_item.stock_quantity or 0, inventory_item=db_item,
+                reference_type="inventory_item", reference_id=db_item.id
+            )
+        else:
+            await apply_stock_movement(
+                db, medication.id, (db_item.stock_quantity or 0) - old_quantity, inventory_item=db_item,
+                reference_type="inventory_item", reference_id=db_item.id
+            )
+        await db.commit()
+    except StaleDataError:
+        # The item's UPDATE (autoflushed above or at commit) matches on the version
+        # loaded by this request; no row matched, so a concurrent write won
+        await db.rollback()
+        raise StockConflict()
+
+    return inventory_serializer.response(inventory_item_to_dict(db_item, medication))
 
 @router.delete("/{item_id}")
 async def delete_inventory_item(item_id: int, db: AsyncSession = Depends(get_db)):
@@ -169,7 +331,8 @@ async def delete_inventory_item(item_id: int, db: AsyncSession = Depends(get_db)
     item = result.scalar_one_or_none()
     if not item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
-    
+
+    await remove_stock_batch(db, item.fhir_medication_id, item.id)
     await db.delete(item)
     await db.commit()
-    return {"message": "Inventory item deleted successfully"} 
\ No newline at end of file
+    return {"message": "Inventory item deleted successfully"}
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from typing import List
@@ -7,12 +7,41 @@ from datetime import datetime
 from ..database import get_db
 from ..models.medication import Medication
 from ..schemas.medication import MedicationCreate, MedicationUpdate, MedicationOut
+from ..core.response_cache import response_cache
+from ..utils.etag import resource_etag, require_if_match, with_etag
+from ..utils.serialization import ORMSerializer
 
 router = APIRouter(
     prefix="/medications",
     tags=["medications"]
 )
 
+medication_serializer = ORMSerializer(MedicationOut)
+
+def medication_to_dict(med: Medication) -> dict:
+    """Map a Medication row to the MedicationOut shape"""
+    return {
+        "id": med.id,
+        "resource_type": med.resource_type,
+        "identifier": med.identifier,
+        "status": med.status,
+        "code": {
+            "system": med.code_system,
+            "value": med.code_value,
+            "display": med.code_display
+        },
+        "manufacturer": med.manufacturer,
+        "form": med.form,
+        "amount": med.amount,
+        "ingredient": med.ingredient,
+        "batch": med.batch,
+        "note": med.note,
+        "low_stock_threshold": med.low_stock_threshold,
+        "expiry_alert_days": med.expiry_alert_days,
+        "created_at": med.created_at,
+        "updated_at": med.updated_at
+    }
+
 @router.post("/", response_model=MedicationOut)
 async def create_medication(medication: MedicationCreate, db: Session = Depends(get_db)):
     try:
@@ -30,6 +59,8 @@ async def create_medication(medication: MedicationCreate, db: Session = Depends(
             ingredient=medication.ingredient,
             batch=medication.batch,
             note=medication.note,
+            low_stock_threshold=medication.low_stock_threshold,
+            expiry_alert_days=medication.expiry_alert_days,
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
@@ -39,59 +70,32 @@ async def create_medication(medication: MedicationCreate, db: Session = Depends(
         await db.refresh(db_medication)
         
         # Convert to response format
-        return MedicationOut(
-            id=db_medication.id,
-            resource_type=db_medication.resource_type,
-            identifier=db_medication.identifier,
-            status=db_medication.status,
-            code={
-                "system": db_medication.code_system,
-                "value": db_medication.code_value,
-                "display": db_medication.code_display
-            },
-            manufacturer=db_medication.manufacturer,
-            form=db_medication.form,
-            amount=db_medication.amount,
-            ingredient=db_medication.ingredient,
-            batch=db_medication.batch,
-            note=db_medication.note,
-            created_at=db_medication.created_at,
-            updated_at=db_medication.updated_at
-        )
+        return with_etag(medication_serializer.response(medication_to_dict(db_medication)), resource_etag(db_medication))
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/", response_model=List[MedicationOut])
-async def list_medications(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    query = select(Medication).offset(skip).limit(limit)
+async def list_medications(request: Request, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    tags = ("medications",)
+    cached = await response_cache.lookup(request, tags)
+    if cached is not None:
+        return cached
+
+    query = select(Medication).order_by(Medication.id).offset(skip).limit(limit)
     result = await db.execute(query)
     medications = result.scalars().all()
-    
-    return [
-        MedicationOut(
-            id=med.id,
-            resource_type=med.resource_type,
-            identifier=med.identifier,
-            status=med.status,
-            code={
-                "system": med.code_system,
-                "value": med.code_value,
-                "display": med.code_display
-            },
-            manufacturer=med.manufacturer,
-            form=med.form,
-            amount=med.amount,
-            ingredient=med.ingredient,
-            batch=med.batch,
-            note=med.note,
-            created_at=med.created_at,
-            updated_at=med.updated_at
-        ) for med in medications
-    ]
+
+    response = medication_serializer.list_response([medication_to_dict(med) for med in medications])
+    return await response_cache.store(request, response, tags)
 
 @router.get("/{medication_id}", response_model=MedicationOut)
-async def get_medication(medication_id: int, db: Session = Depends(get_db)):
+async def get_medication(medication_id: int, request: Request, db: Session = Depends(get_db)):
+    tags = (f"medications:{medication_id}",)
+    cached = await response_cache.lookup(request, tags)
+    if cached is not None:
+        return cached
+
     query = select(Medication).where(Medication.id == medication_id)
     result = await db.execute(query)
     medication = result.scalar_one_or_none()
@@ -99,34 +103,21 @@ async def get_medication(medication_id: int, db: Session = Depends(get_db)):
     if not medication:
         raise HTTPException(status_code=404, detail="Medication not found")
     
-    return MedicationOut(
-        id=medication.id,
-        resource_type=medication.resource_type,
-        identifier=medication.identifier,
-        status=medication.status,
-        code={
-            "system": medication.code_system,
-            "value": medication.code_value,
-            "display": medication.code_display
-        },
-        manufacturer=medication.manufacturer,
-        form=medication.form,
-        amount=medication.amount,
-        ingredient=medication.ingredient,
-        batch=medication.batch,
-        note=medication.note,
-        created_at=medication.created_at,
-        updated_at=medication.updated_at
-    )
+    response = medication_serializer.response(medication_to_dict(medication))
+    # Version-based ETag, so it can be sent back as If-Match on update
+    return await response_cache.store(request, response, tags, etag=resource_etag(medication))
 
 @router.put("/{medication_id}", response_model=MedicationOut)
-async def update_medication(medication_id: int, update: MedicationUpdate, db: Session = Depends(get_db)):
+async def update_medication(medication_id: int, update: MedicationUpdate, request: Request, db: Session = Depends(get_db)):
     query = select(Medication).where(Medication.id == medication_id)
+    if request.headers.get("if-match"):
+        query = query.with_for_update()
     result = await db.execute(query)
     db_med = result.scalar_one_or_none()
     
     if not db_med:
         raise HTTPException(status_code=404, detail="Medication not found")
+    require_if_match(request, resource_etag(db_med))
 
     db_med.resource_type = update.resource_type
     db_med.identifier = update.identifier
@@ -140,30 +131,14 @@ async def update_medication(medication_id: int, update: MedicationUpdate, db: Se
     db_med.ingredient = update.ingredient
     db_med.batch = update.batch
     db_med.note = update.note
+    db_med.low_stock_threshold = update.low_stock_threshold
+    db_med.expiry_alert_days = update.expiry_alert_days
     db_med.updated_at = datetime.utcnow()
 
     await db.commit()
     await db.refresh(db_med)
     
-    return MedicationOut(
-        id=db_med.id,
-        resource_type=db_med.resource_type,
-        identifier=db_med.identifier,
-        status=db_med.status,
-        code={
-            "system": db_med.code_system,
-            "value": db_med.code_value,
-            "display": db_med.code_display
-        },
-        manufacturer=db_med.manufacturer,
-        form=db_med.form,
-        amount=db_med.amount,
-        ingredient=db_med.ingredient,
-        batch=db_med.batch,
-        note=db_med.note,
-        created_at=db_med.created_at,
-        updated_at=db_med.updated_at
-    )
+    return with_etag(medication_serializer.response(medication_to_dict(db_med)), resource_etag(db_med))
 
 @router.delete("/{medication_id}")
 async def delete_medication(medication_id: int, db: Session = Depends(get_db)):
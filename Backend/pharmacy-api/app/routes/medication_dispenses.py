@@ -1,10 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Tuple
 from datetime import datetime
 
 from app.database import get_db
 from app.models.medication_dispenses import MedicationDispense, DispenseStatus
+from app.core.archive import read_archived
+from app.core.stock import apply_stock_movement
 from app.schemas.medication_dispense import (
     MedicationDispenseCreate,
     MedicationDispenseUpdate,
@@ -17,28 +20,63 @@ router = APIRouter(
 )
 
 
+def _dispensed_stock(dispense: MedicationDispense) -> Tuple[Optional[int], int]:
+    """(medication_id, units) a dispense has taken out of stock: only completed (handed over) dispenses count"""
+    medication_id = int(dispense.medication_id) if dispense.medication_id is not None else None
+    quantity = (dispense.quantity or 0) if dispense.status == DispenseStatus.COMPLETED else 0
+    return medication_id, quantity
+
+
+async def record_dispense_stock(
+    db: AsyncSession, dispense: MedicationDispense, previously: Tuple[Optional[int], int] = (None, 0)
+) -> None:
+    """Move stock from what the dispense took before (`previously`, see _dispensed_stock) to what it takes now.
+
+    When the medication changed, the old one gets its units back and the new
+    one is charged in full; otherwise only the difference is booked.
+    """
+    old_medication_id, old_quantity = previously
+    medication_id, quantity = _dispensed_stock(dispense)
+    if old_medication_id == medication_id:
+        movements = [(medication_id, old_quantity - quantity)]
+    else:
+        movements = [(old_medication_id, old_quantity), (medication_id, -quantity)]
+
+    for movement_medication_id, delta in movements:
+        if movement_medication_id is None or not delta:
+            continue
+        await apply_stock_movement(
+            db, movement_medication_id, delta,
+            movement_type="dispense" if delta < 0 else "dispense_reversal",
+            reference_type="dispense", reference_id=dispense.id
+        )
+
+
 @router.post("/", response_model=MedicationDispenseResponse, status_code=201)
-def create_medication_dispense(
+async def create_medication_dispense(
     dispense: MedicationDispenseCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_dispense = MedicationDispense(**dispense.dict())
+    db_dispense = MedicationDispense(**dispense.model_dump())
     db.add(db_dispense)
-    db.commit()
-    db.refresh(db_dispense)
+    await db.flush()
+    await record_dispense_stock(db, db_dispense)
+    await db.commit()
+    await db.refresh(db_dispense)
     return db_dispense
 
 
 @router.get("/", response_model=List[MedicationDispenseResponse])
-def list_medication_dispenses(
+async def list_medication_dispenses(
     skip: int = Query(0),
     limit: int = Query(10),
     status: Optional[DispenseStatus] = Query(None),
     patient_id: Optional[int] = Query(None),
     medication_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    include_archived: bool = Query(False, description="Also return dispenses moved to the cold archive"),
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(MedicationDispense)
+    query = select(MedicationDispense)
 
     if status:
         query = query.filter(MedicationDispense.status == status)
@@ -47,65 +85,84 @@ def list_medication_dispenses(
     if medication_id:
         query = query.filter(MedicationDispense.medication_id == medication_id)
 
-    return query.order_by(MedicationDispense.created_at.desc()).offset(skip).limit(limit).all()
+    archived = []
+    if include_archived:
+        # Only the newest archive months are read, until skip + limit dispenses are found
+        archived = await read_archived(
+            "medication_dispenses", limit=skip + limit,
+            status=status, patient_id=patient_id, medication_id=medication_id
+        )
+    if not archived:
+        result = await db.execute(query.order_by(MedicationDispense.created_at.desc()).offset(skip).limit(limit))
+        return result.scalars().all()
+
+    # Archived dispenses are older than the horizon but open ones may be older still: merge by date
+    result = await db.execute(query.order_by(MedicationDispense.created_at.desc()).limit(skip + limit))
+    merged = sorted(result.scalars().all() + archived, key=lambda d: d.created_at or datetime.min, reverse=True)
+    return merged[skip:skip + limit]
 
 
 @router.get("/{dispense_id}", response_model=MedicationDispenseResponse)
-def get_medication_dispense(
-    dispense_id: int = Path(..., description="ID of the medication dispense"),
-    db: Session = Depends(get_db)
+async def get_medication_dispense(
+    dispense_id: str = Path(..., description="ID of the medication dispense"),
+    db: AsyncSession = Depends(get_db)
 ):
-    dispense = db.query(MedicationDispense).filter(MedicationDispense.id == dispense_id).first()
+    dispense = await db.get(MedicationDispense, dispense_id)
     if not dispense:
         raise HTTPException(status_code=404, detail="Medication dispense not found")
     return dispense
 
 
 @router.put("/{dispense_id}", response_model=MedicationDispenseResponse)
-def update_medication_dispense(
-    dispense_id: int,
+async def update_medication_dispense(
+    dispense_id: str,
     dispense_update: MedicationDispenseUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_dispense = db.query(MedicationDispense).filter(MedicationDispense.id == dispense_id).first()
+    db_dispense = await db.get(MedicationDispense, dispense_id)
     if not db_dispense:
         raise HTTPException(status_code=404, detail="Medication dispense not found")
 
-    for key, value in dispense_update.dict(exclude_unset=True).items():
+    previously = _dispensed_stock(db_dispense)
+    for key, value in dispense_update.model_dump(exclude_unset=True).items():
         setattr(db_dispense, key, value)
 
-    db.commit()
-    db.refresh(db_dispense)
+    await record_dispense_stock(db, db_dispense, previously)
+    await db.commit()
+    await db.refresh(db_dispense)
     return db_dispense
 
 
 @router.post("/{dispense_id}/status", response_model=MedicationDispenseResponse)
-def update_dispense_status(
-    dispense_id: int,
+async def update_dispense_status(
+    dispense_id: str,
     status: DispenseStatus = Query(..., description="New status for the dispense"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    db_dispense = db.query(MedicationDispense).filter(MedicationDispense.id == dispense_id).first()
+    db_dispense = await db.get(MedicationDispense, dispense_id)
     if not db_dispense:
         raise HTTPException(status_code=404, detail="Medication dispense not found")
 
+    previously = _dispensed_stock(db_dispense)
     db_dispense.status = status
     if status == DispenseStatus.IN_PROGRESS:
         db_dispense.when_prepared = datetime.utcnow()
     elif status == DispenseStatus.COMPLETED:
         db_dispense.when_handed_over = datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_dispense)
+    # Handing over takes the units out of stock; leaving completed puts them back
+    await record_dispense_stock(db, db_dispense, previously)
+    await db.commit()
+    await db.refresh(db_dispense)
     return db_dispense
 
 
 @router.delete("/{dispense_id}", status_code=204)
-def delete_medication_dispense(
-    dispense_id: int,
-    db: Session = Depends(get_db)
+async def delete_medication_dispense(
+    dispense_id: str,
+    db: AsyncSession = Depends(get_db)
 ):
-    db_dispense = db.query(MedicationDispense).filter(MedicationDispense.id == dispense_id).first()
+    db_dispense = await db.get(MedicationDispense, dispense_id)
     if not db_dispense:
         raise HTTPException(status_code=404, detail="Medication dispense not found")
 
@@ -115,6 +172,6 @@ def delete_medication_dispense(
             detail="Can only delete dispenses in PREPARATION status"
         )
 
-    db.delete(db_dispense)
-    db.commit()
+    await db.delete(db_dispense)
+    await db.commit()
     return
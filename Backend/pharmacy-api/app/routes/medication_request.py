@@ -26,7 +26,7 @@ async def create_medication_request(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(current_active_user)
 ):
-    db_medication_request = MedicationRequest(**medication_request.dict())
+    db_medication_request = MedicationRequest(**medication_request.model_dump())
     db.add(db_medication_request)
     await db.commit()
     await db.refresh(db_medication_request)
@@ -56,7 +56,7 @@ async def update_medication_request(
     if db_medication_request is None:
         raise HTTPException(status_code=404, detail="Medication request not found")
     
-    for key, value in medication_request.dict(exclude_unset=True).items():
+    for key, value in medication_request.model_dump(exclude_unset=True).items():
         setattr(db_medication_request, key, value)
     
     await db.commit()
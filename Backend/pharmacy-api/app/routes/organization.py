@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List, Optional
@@ -6,12 +6,16 @@ from typing import List, Optional
 from ..database import get_db
 from ..models.organization import Organization
 from ..schemas.organization import OrganizationCreate, OrganizationOut
+from ..core.response_cache import response_cache
+from ..utils.serialization import ORMSerializer
 
 router = APIRouter(
     prefix="/organizations",
     tags=["organizations"]
 )
 
+organization_serializer = ORMSerializer(OrganizationOut)
+
 @router.post("/", response_model=OrganizationOut)
 async def create_organization(organization: OrganizationCreate, db: AsyncSession = Depends(get_db)):
     """Create a new organization"""
@@ -23,6 +27,7 @@ async def create_organization(organization: OrganizationCreate, db: AsyncSession
 
 @router.get("/", response_model=List[OrganizationOut])
 async def list_organizations(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     active: Optional[bool] = None,
@@ -30,6 +35,11 @@ async def list_organizations(
     db: AsyncSession = Depends(get_db)
 ):
     """List all organizations with optional filters"""
+    tags = ("organizations",)
+    cached = await response_cache.lookup(request, tags)
+    if cached is not None:
+        return cached
+
     query = select(Organization)
     
     if active is not None:
@@ -37,19 +47,26 @@ async def list_organizations(
     if organization_type:
         query = query.where(Organization.organization_type == organization_type)
     
-    query = query.offset(skip).limit(limit)
+    query = query.order_by(Organization.id).offset(skip).limit(limit)
     result = await db.execute(query)
-    return result.scalars().all()
+    response = organization_serializer.list_response(result.scalars().all())
+    return await response_cache.store(request, response, tags)
 
 @router.get("/{org_id}", response_model=OrganizationOut)
-async def get_organization(org_id: int, db: AsyncSession = Depends(get_db)):
+async def get_organization(org_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Get a specific organization by ID"""
+    tags = (f"organizations:{org_id}",)
+    cached = await response_cache.lookup(request, tags)
+    if cached is not None:
+        return cached
+
     query = select(Organization).where(Organization.id == org_id)
     result = await db.execute(query)
     org = result.scalar_one_or_none()
     if not org:
         raise HTTPException(status_code=404, detail="Organization not found")
-    return org
+    response = organization_serializer.response(org)
+    return await response_cache.store(request, response, tags)
 
 @router.put("/{org_id}", response_model=OrganizationOut)
 async def update_organization(
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
@@ -8,18 +8,22 @@ from sqlalchemy.dialects.postgresql import JSONB
 from ..database import get_db
 from ..models.patient import Patient
 from ..schemas.patient import PatientCreate, PatientResponse, HumanName, ContactPoint, Address
+from ..utils.etag import resource_etag, probe_etag, if_none_match, require_if_match, with_etag
+from ..utils.serialization import ORMSerializer
 
 router = APIRouter(prefix="/fhir/Patient", tags=["Patient"])
 
+patient_serializer = ORMSerializer(PatientResponse)
+
 @router.post("/", response_model=PatientResponse)
 async def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
     """Create a new patient record"""
     try:
         # Create database record
         db_patient = Patient(
-            name=[n.dict() for n in patient.name],  # Store all name entries as a list
-            telecom=[t.dict() for t in patient.telecom],
-            address=[a.dict() for a in patient.address],  # Store all address entries as a list
+            name=[n.model_dump() for n in patient.name],  # Store all name entries as a list
+            telecom=[t.model_dump() for t in patient.telecom],
+            address=[a.model_dump() for a in patient.address],  # Store all address entries as a list
             birth_date=patient.birthDate,
             insurance_company=patient.insurance_company,
             insurance_number=patient.insurance_number
@@ -33,7 +37,9 @@ async def create_patient(patient: PatientCreate, db: Session = Depends(get_db)):
             raise HTTPException(status_code=500, detail="Failed to create patient record")
         
         # Convert to FHIR response format
-        return PatientResponse.from_orm(db_patient)
+        return with_etag(patient_serializer.response(db_patient), resource_etag(db_patient))
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
@@ -67,44 +73,55 @@ async def list_patients(
     result = await db.execute(query)
     patients = result.scalars().all()
     
-    return [PatientResponse.from_orm(patient) for patient in patients]
+    return patient_serializer.list_response(patients)
 
 @router.get("/{patient_id}", response_model=PatientResponse)
-async def get_patient(patient_id: int, db: Session = Depends(get_db)):
-    """Get a specific patient by ID"""
+async def get_patient(patient_id: int, request: Request, db: Session = Depends(get_db)):
+    """Get a specific patient by ID (supports If-None-Match)"""
+    if request.headers.get("if-none-match"):
+        # Answer revalidations from the version column alone
+        cached = if_none_match(request, await probe_etag(db, Patient, patient_id))
+        if cached is not None:
+            return cached
+
     query = select(Patient).where(Patient.id == patient_id)
     result = await db.execute(query)
     patient = result.scalar_one_or_none()
     
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
-    return PatientResponse.from_orm(patient)
+    return with_etag(patient_serializer.response(patient), resource_etag(patient))
 
 @router.put("/{patient_id}", response_model=PatientResponse)
 async def update_patient(
     patient_id: int,
     patient: PatientCreate,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Update a patient record"""
+    """Update a patient record (If-Match guards against lost updates)"""
     query = select(Patient).where(Patient.id == patient_id)
+    if request.headers.get("if-match"):
+        # Hold the row so a concurrent update can't slip in between check and write
+        query = query.with_for_update()
     result = await db.execute(query)
     db_patient = result.scalar_one_or_none()
     
     if not db_patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+    require_if_match(request, resource_etag(db_patient))
     
     # Update all fields
-    db_patient.name = [n.dict() for n in patient.name]  # Store all name entries as a list
-    db_patient.telecom = [t.dict() for t in patient.telecom]
-    db_patient.address = [a.dict() for a in patient.address]  # Store all address entries as a list
+    db_patient.name = [n.model_dump() for n in patient.name]  # Store all name entries as a list
+    db_patient.telecom = [t.model_dump() for t in patient.telecom]
+    db_patient.address = [a.model_dump() for a in patient.address]  # Store all address entries as a list
     db_patient.birth_date = patient.birthDate
     db_patient.insurance_company = patient.insurance_company
     db_patient.insurance_number = patient.insurance_number
     
     await db.commit()
     await db.refresh(db_patient)
-    return PatientResponse.from_orm(db_patient)
+    return with_etag(patient_serializer.response(db_patient), resource_etag(db_patient))
 
 @router.delete("/{patient_id}")
 async def delete_patient(patient_id: int, db: Session = Depends(get_db)):
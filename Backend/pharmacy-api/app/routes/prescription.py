@@ -1,10 +1,8 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from datetime import datetime
-import pytesseract
-from PIL import Image
 import io
 import json
 import logging
@@ -14,11 +12,13 @@ from ..database import get_db
 from ..models.prescription import Prescription, PrescriptionSource, PrescriptionStatus
 from ..models.sale import Sale
 from ..schemas.prescription import PrescriptionCreate, PrescriptionUpdate, PrescriptionOut
+from app.core.archive import read_archived
 from app.core.auth import current_active_user
 from ..models.user import User
 from ..models.patient import Patient
 from ..models.medication import Medication
-from ..utils.ocr_utils import PrescriptionDataExtractor, OCRProcessingError
+from ..utils.etag import resource_etag, probe_etag, if_none_match, require_if_match, with_etag
+from ..utils.serialization import ORMSerializer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -26,8 +26,7 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/prescriptions", tags=["prescriptions"])
 
-# Initialize OCR processor
-ocr_processor = PrescriptionDataExtractor()
+prescription_serializer = ORMSerializer(PrescriptionOut)
 
 @router.post("/", response_model=PrescriptionOut)
 async def create_prescription(
@@ -94,7 +93,7 @@ async def create_prescription(
             authored_on=prescription.authored_on.replace(tzinfo=None),
             requester=prescription.requester,
             reason_code=prescription.reason_code,
-            dosage_instruction=[d.dict() for d in prescription.dosage_instruction],
+            dosage_instruction=[d.model_dump() for d in prescription.dosage_instruction],
             dispense_request=prescription.dispense_request,
             substitution=prescription.substitution,
             
@@ -130,11 +129,21 @@ async def list_prescriptions(
     patient_id: Optional[int] = None,
     prescriber_id: Optional[int] = None,
     source: Optional[PrescriptionSource] = None,
+    include_archived: bool = False,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(current_active_user)
 ):
+    # The archive holds years of prescriptions; reading it needs a bounded window
+    if include_archived and date_from is None:
+        raise HTTPException(status_code=400, detail="date_from is required with include_archived")
     try:
         query = select(Prescription)
+        if date_from:
+            query = query.filter(Prescription.created_at >= date_from)
+        if date_to:
+            query = query.filter(Prescription.created_at < date_to)
         if status:
             query = query.filter(Prescription.status == status)
         if patient_id:
@@ -144,7 +153,15 @@ async def list_prescriptions(
         if source:
             query = query.filter(Prescription.prescription_source == source)
         result = await db.execute(query)
-        return result.scalars().all()
+        prescriptions = result.scalars().all()
+        if include_archived:
+            archived = await read_archived(
+                "prescriptions", date_from, date_to, status=status, patient_id=patient_id,
+                prescriber_id=prescriber_id, prescription_source=source,
+            )
+            if archived:
+                prescriptions = sorted(prescriptions + archived, key=lambda p: p.created_at, reverse=True)
+        return prescription_serializer.list_response(prescriptions)
     except Exception as e:
         logger.error(f"Error listing prescriptions: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to list prescriptions")
@@ -152,14 +169,20 @@ async def list_prescriptions(
 @router.get("/{prescription_id}", response_model=PrescriptionOut)
 async def get_prescription(
     prescription_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(current_active_user)
 ):
     try:
+        if request.headers.get("if-none-match"):
+            cached = if_none_match(request, await probe_etag(db, Prescription, prescription_id))
+            if cached is not None:
+                return cached
+
         prescription = await db.get(Prescription, prescription_id)
         if not prescription:
             raise HTTPException(status_code=404, detail="Prescription not found")
-        return prescription
+        return with_etag(prescription_serializer.response(prescription), resource_etag(prescription))
     except HTTPException:
         raise
     except Exception as e:
@@ -170,13 +193,19 @@ async def get_prescription(
 async def update_prescription(
     prescription_id: int,
     prescription_update: PrescriptionUpdate,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(current_active_user)
 ):
     try:
-        prescription = await db.get(Prescription, prescription_id)
+        if request.headers.get("if-match"):
+            # Lock the row so the version check and the write can't interleave
+            prescription = await db.get(Prescription, prescription_id, with_for_update=True)
+        else:
+            prescription = await db.get(Prescription, prescription_id)
         if not prescription:
             raise HTTPException(status_code=404, detail="Prescription not found")
+        require_if_match(request, resource_etag(prescription))
 
         # Handle relationship updates
         if prescription_update.patient_id is not None:
@@ -203,7 +232,7 @@ async def update_prescription(
             prescription_update.authored_on = prescription_update.authored_on.replace(tzinfo=None)
 
         # Update all other fields
-        update_data = prescription_update.dict(exclude_unset=True, exclude={'patient_id', 'prescriber_id', 'medication_id'})
+        update_data = prescription_update.model_dump(exclude_unset=True, exclude={'patient_id', 'prescriber_id', 'medication_id'})
         
         # Handle enum fields
         if 'prescription_source' in update_data:
@@ -216,7 +245,7 @@ async def update_prescription(
 
         await db.commit()
         await db.refresh(prescription)
-        return prescription
+        return with_etag(prescription_serializer.response(prescription), resource_etag(prescription))
     except HTTPException:
         raise
     except Exception as e:
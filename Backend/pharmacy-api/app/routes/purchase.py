@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
@@ -10,6 +10,8 @@ from ..database import get_db
 from ..models.purchase import Purchase, PurchaseItem
 from ..models.inventory import InventoryItem
 from ..schemas.purchase import PurchaseCreate, PurchaseOut, PurchaseItemCreate
+from ..utils.serialization import ORMSerializer, parse_fields
+from ..core.stock import adjust_batch_quantity, apply_stock_movement
 from ..models.organization import Organization
 from ..models.medication import Medication
 
@@ -18,32 +20,7 @@ router = APIRouter(
     tags=["purchases"]
 )
 
-def transform_organization_to_dict(org: Organization) -> dict:
-    return {
-        "id": org.id,
-        "name": org.name,
-        "identifier": org.identifier,
-        "active": org.active,
-        "type": org.type,
-        "telecom": org.telecom,
-        "address": org.address
-    }
-
-def transform_purchase_item_to_dict(item: PurchaseItem) -> dict:
-    return {
-        "id": item.id,
-        "sequence": item.sequence,
-        "item": item.item,
-        "quantity": item.quantity,
-        "purchase_id": item.purchase_id,
-        "medication_id": item.medication_id,
-        "quantity_ordered": item.quantity_ordered,
-        "quantity_received": item.quantity_received,
-        "unit_price": item.unit_price,
-        "total_price": item.total_price,
-        "batch_number": item.batch_number or "",
-        "expiration_date": item.expiration_date or datetime.utcnow()
-    }
+purchase_serializer = ORMSerializer(PurchaseOut)
 
 @router.post("/", response_model=PurchaseOut)
 async def create_purchase(purchase: PurchaseCreate, db: AsyncSession = Depends(get_db)):
@@ -73,6 +50,7 @@ async def create_purchase(purchase: PurchaseCreate, db: AsyncSession = Depends(g
     await db.refresh(db_purchase)
 
     # Create purchase items and update inventory
+    received_at = datetime.utcnow()
     for item in purchase.purchase_items:
         # Verify medication exists
         result = await db.execute(select(Medication).filter(Medication.id == item.medication_id))
@@ -104,7 +82,12 @@ async def create_purchase(purchase: PurchaseCreate, db: AsyncSession = Depends(g
         inventory_item = result.scalar_one_or_none()
 
         if inventory_item:
-            inventory_item.stock_quantity += item.quantity_received
+            await adjust_batch_quantity(db, inventory_item, item.quantity_received)
+            await apply_stock_movement(
+                db, item.medication_id, item.quantity_received,
+                inventory_item=inventory_item, purchase_price=item.unit_price,
+                movement_type="receipt", reference_type="purchase", reference_id=db_purchase.id
+            )
         else:
             # If no matching inventory item found, create a new one
             new_inventory = InventoryItem(
@@ -114,7 +97,7 @@ async def create_purchase(purchase: PurchaseCreate, db: AsyncSession = Depends(g
                 batch_number=batch_number,
                 stock_quantity=item.quantity_received,
                 purchase_price=item.unit_price,
-                purchase_date=datetime.utcnow(),
+                purchase_date=received_at,
                 expiration_date=expiration_date,
                 code=json.dumps({
                     "system": medication.code_system,
@@ -130,6 +113,12 @@ async def create_purchase(purchase: PurchaseCreate, db: AsyncSession = Depends(g
             )
             new_inventory.medication = medication
             db.add(new_inventory)
+            await db.flush()
+            await apply_stock_movement(
+                db, item.medication_id, item.quantity_received,
+                inventory_item=new_inventory, purchase_price=item.unit_price,
+                movement_type="receipt", reference_type="purchase", reference_id=db_purchase.id
+            )
 
     await db.commit()
     
@@ -144,27 +133,7 @@ async def create_purchase(purchase: PurchaseCreate, db: AsyncSession = Depends(g
     )
     db_purchase = result.scalar_one()
     
-    # Transform the response
-    response_data = {
-        "id": db_purchase.id,
-        "status": db_purchase.status,
-        "category": db_purchase.category,
-        "priority": db_purchase.priority,
-        "item": db_purchase.item,
-        "quantity": db_purchase.quantity,
-        "parameter": db_purchase.parameter,
-        "order_date": db_purchase.order_date,
-        "expected_delivery_date": db_purchase.expected_delivery_date,
-        "actual_delivery_date": db_purchase.actual_delivery_date,
-        "total_amount": db_purchase.total_amount,
-        "payment_status": db_purchase.payment_status,
-        "payment_method": db_purchase.payment_method,
-        "supplier_id": db_purchase.supplier_id,
-        "supplier": transform_organization_to_dict(db_purchase.supplier),
-        "purchase_items": [transform_purchase_item_to_dict(item) for item in db_purchase.purchase_items]
-    }
-    
-    return response_data
+    return purchase_serializer.response(db_purchase)
 
 @router.get("/", response_model=List[PurchaseOut])
 async def list_purchases(
@@ -173,13 +142,17 @@ async def list_purchases(
     status: Optional[str] = None,
     payment_status: Optional[str] = None,
     supplier_id: Optional[int] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
     db: AsyncSession = Depends(get_db)
 ):
     """List all purchases with optional filters"""
-    query = select(Purchase).options(
-        selectinload(Purchase.supplier),
-        selectinload(Purchase.purchase_items)
-    )
+    projection = parse_fields(fields, PurchaseOut)
+    query = select(Purchase)
+    # Only load relationships the projection actually returns
+    if projection is None or 'supplier' in projection:
+        query = query.options(selectinload(Purchase.supplier))
+    if projection is None or 'purchase_items' in projection:
+        query = query.options(selectinload(Purchase.purchase_items))
 
     if status:
         query = query.filter(Purchase.status == status)
@@ -191,29 +164,16 @@ async def list_purchases(
     result = await db.execute(query.offset(skip).limit(limit))
     purchases = result.scalars().all()
     
-    # Transform the response
-    return [{
-        "id": purchase.id,
-        "status": purchase.status,
-        "category": purchase.category,
-        "priority": purchase.priority,
-        "item": purchase.item,
-        "quantity": purchase.quantity,
-        "parameter": purchase.parameter,
-        "order_date": purchase.order_date,
-        "expected_delivery_date": purchase.expected_delivery_date,
-        "actual_delivery_date": purchase.actual_delivery_date,
-        "total_amount": purchase.total_amount,
-        "payment_status": purchase.payment_status,
-        "payment_method": purchase.payment_method,
-        "supplier_id": purchase.supplier_id,
-        "supplier": transform_organization_to_dict(purchase.supplier),
-        "purchase_items": [transform_purchase_item_to_dict(item) for item in purchase.purchase_items]
-    } for purchase in purchases]
+    return purchase_serializer.list_response(purchases, projection)
 
 @router.get("/{purchase_id}", response_model=PurchaseOut)
-async def get_purchase(purchase_id: int, db: AsyncSession = Depends(get_db)):
+async def get_purchase(
+    purchase_id: int,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return"),
+    db: AsyncSession = Depends(get_db)
+):
     """Get a specific purchase by ID"""
+    projection = parse_fields(fields, PurchaseOut)
     result = await db.execute(
         select(Purchase)
         .options(
@@ -226,25 +186,7 @@ async def get_purchase(purchase_id: int, db: AsyncSession = Depends(get_db)):
     if not purchase:
         raise HTTPException(status_code=404, detail="Purchase not found")
     
-    # Transform the response
-    return {
-        "id": purchase.id,
-        "status": purchase.status,
-        "category": purchase.category,
-        "priority": purchase.priority,
-        "item": purchase.item,
-        "quantity": purchase.quantity,
-        "parameter": purchase.parameter,
-        "order_date": purchase.order_date,
-        "expected_delivery_date": purchase.expected_delivery_date,
-        "actual_delivery_date": purchase.actual_delivery_date,
-        "total_amount": purchase.total_amount,
-        "payment_status": purchase.payment_status,
-        "payment_method": purchase.payment_method,
-        "supplier_id": purchase.supplier_id,
-        "supplier": transform_organization_to_dict(purchase.supplier),
-        "purchase_items": [transform_purchase_item_to_dict(item) for item in purchase.purchase_items]
-    }
+    return purchase_serializer.response(purchase, projection)
 
 @router.put("/{purchase_id}", response_model=PurchaseOut)
 async def update_purchase(
@@ -300,7 +242,11 @@ async def update_purchase(
         )
         inventory_item = result.scalar_one_or_none()
         if inventory_item:
-            inventory_item.stock_quantity -= old.quantity_received
+            await adjust_batch_quantity(db, inventory_item, -old.quantity_received)
+            await apply_stock_movement(
+                db, old.medication_id, -old.quantity_received, inventory_item=inventory_item,
+                movement_type="receipt_reversal", reference_type="purchase", reference_id=purchase_id
+            )
 
     # Delete existing purchase items
     await db.execute(
@@ -308,6 +254,7 @@ async def update_purchase(
     )
 
     # Add updated items and update inventory again
+    received_at = datetime.utcnow()
     for item in purchase.purchase_items:
         # Verify medication exists
         result = await db.execute(select(Medication).filter(Medication.id == item.medication_id))
@@ -339,7 +286,12 @@ async def update_purchase(
         inventory_item = result.scalar_one_or_none()
 
         if inventory_item:
-            inventory_item.stock_quantity += item.quantity_received
+            await adjust_batch_quantity(db, inventory_item, item.quantity_received)
+            await apply_stock_movement(
+                db, item.medication_id, item.quantity_received,
+                inventory_item=inventory_item, purchase_price=item.unit_price,
+                movement_type="receipt", reference_type="purchase", reference_id=purchase_id
+            )
         else:
             # If no matching inventory item found, create a new one
             new_inventory = InventoryItem(
@@ -349,7 +301,7 @@ async def update_purchase(
                 batch_number=batch_number,
                 stock_quantity=item.quantity_received,
                 purchase_price=item.unit_price,
-                purchase_date=datetime.utcnow(),
+                purchase_date=received_at,
                 expiration_date=expiration_date,
                 code=json.dumps({
                     "system": medication.code_system,
@@ -365,6 +317,12 @@ async def update_purchase(
             )
             new_inventory.medication = medication
             db.add(new_inventory)
+            await db.flush()
+            await apply_stock_movement(
+                db, item.medication_id, item.quantity_received,
+                inventory_item=new_inventory, purchase_price=item.unit_price,
+                movement_type="receipt", reference_type="purchase", reference_id=purchase_id
+            )
 
     await db.commit()
     
@@ -379,25 +337,7 @@ async def update_purchase(
     )
     db_purchase = result.scalar_one()
     
-    # Transform the response
-    return {
-        "id": db_purchase.id,
-        "status": db_purchase.status,
-        "category": db_purchase.category,
-        "priority": db_purchase.priority,
-        "item": db_purchase.item,
-        "quantity": db_purchase.quantity,
-        "parameter": db_purchase.parameter,
-        "order_date": db_purchase.order_date,
-        "expected_delivery_date": db_purchase.expected_delivery_date,
-        "actual_delivery_date": db_purchase.actual_delivery_date,
-        "total_amount": db_purchase.total_amount,
-        "payment_status": db_purchase.payment_status,
-        "payment_method": db_purchase.payment_method,
-        "supplier_id": db_purchase.supplier_id,
-        "supplier": transform_organization_to_dict(db_purchase.supplier),
-        "purchase_items": [transform_purchase_item_to_dict(item) for item in db_purchase.purchase_items]
-    }
+    return purchase_serializer.response(db_purchase)
 
 @router.delete("/{purchase_id}")
 async def delete_purchase(purchase_id: int, db: AsyncSession = Depends(get_db)):
@@ -421,9 +361,13 @@ async def delete_purchase(purchase_id: int, db: AsyncSession = Depends(get_db)):
         )
         inventory_item = result.scalar_one_or_none()
         if inventory_item:
-            inventory_item.stock_quantity -= item.quantity_received
+            await adjust_batch_quantity(db, inventory_item, -item.quantity_received)
+            await apply_stock_movement(
+                db, item.medication_id, -item.quantity_received, inventory_item=inventory_item,
+                movement_type="receipt_reversal", reference_type="purchase", reference_id=purchase_id
+            )
 
-    await db.execute(select(PurchaseItem).filter(PurchaseItem.purchase_id == purchase_id).delete())
+    await db.execute(delete(PurchaseItem).where(PurchaseItem.purchase_id == purchase_id))
     await db.delete(purchase)
     await db.commit()
     return {"message": "Purchase deleted and inventory rolled back successfully"}
@@ -1,18 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, tuple_
+from sqlalchemy.orm import selectinload
+from typing import Optional
 from app.database import get_db
 from app.models.sale import Sale, SaleItem
 from app.models.patient import Patient
-from app.schemas.sale import SaleCreate, SaleResponse
-from datetime import datetime
-from random import randint
+from app.models.inventory import InventoryItem
+from app.core.archive import archived_totals, read_archived
+from app.core.stock import adjust_batch_quantity, apply_stock_movement
+from app.schemas.sale import SaleCreate, SaleResponse, SalePage
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.serialization import ORMSerializer
+from datetime import datetime, timedelta
+from uuid import uuid4
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 
+sale_page_serializer = ORMSerializer(SalePage)
+
 def generate_invoice_number():
     now = datetime.utcnow()
-    return f"INV-{now.year}-{randint(100,999)}"
+    # Random suffix wide enough that concurrent checkouts don't collide on the unique index
+    return f"INV-{now.year}-{uuid4().hex[:12].upper()}"
 
 @router.post("/", response_model=SaleResponse)
 async def create_sale(sale_data: SaleCreate, db: AsyncSession = Depends(get_db)):
@@ -65,33 +75,148 @@ async def create_sale(sale_data: SaleCreate, db: AsyncSession = Depends(get_db))
 
     sale.total_amount = total
     db.add(sale)
-    await db.flush()  # Flush to get the IDs
+    await db.flush()  # Flush to get the IDs (the ledger references the sale)
+
+    # 4. Take the sold units out of stock
+    for item_data in sale_data.sale_items:
+        if item_data.inventory_item_id:
+            inventory_item = await db.get(InventoryItem, item_data.inventory_item_id)
+            if not inventory_item:
+                raise HTTPException(status_code=404, detail=f"Inventory item {item_data.inventory_item_id} not found")
+            await adjust_batch_quantity(db, inventory_item, -item_data.quantity)
+            await apply_stock_movement(
+                db, inventory_item.fhir_medication_id, -item_data.quantity, inventory_item=inventory_item,
+                movement_type="sale", reference_type="sale", reference_id=sale.id
+            )
+        elif item_data.medication_id:
+            # No batch given: booked to the medication's unbatched quantity
+            await apply_stock_movement(
+                db, item_data.medication_id, -item_data.quantity,
+                movement_type="sale", reference_type="sale", reference_id=sale.id
+            )
+
+    await db.flush()
     await db.refresh(sale)  # Refresh to load all relationships
     await db.commit()
     
-    # 4. Return the created sale with all relationships
+    # 5. Return the created sale with all relationships
     return sale
 
+@router.get("/", response_model=SalePage)
+async def list_sales(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    patient_id: Optional[int] = None,
+    payment_method: Optional[str] = None,
+    payment_status: Optional[str] = None,
+    status: Optional[str] = None,
+    include_archived: bool = Query(False, description="Also return sales moved to the cold archive"),
+    db: AsyncSession = Depends(get_db)
+):
+    """List sales newest first, with keyset pagination.
+
+    The first page (no cursor) also carries the count and sum of all sales
+    matching the filters, computed in the same query as the page. With
+    include_archived, archived sales are merged in: only the newest archive
+    months below the cursor are read, until the page is full.
+    """
+    filters = []
+    if date_from:
+        filters.append(Sale.created_at >= date_from.replace(tzinfo=None))
+    if date_to:
+        filters.append(Sale.created_at < date_to.replace(tzinfo=None))
+    if patient_id:
+        filters.append(Sale.patient_id == patient_id)
+    if payment_method:
+        filters.append(Sale.payment_method == payment_method)
+    if payment_status:
+        filters.append(Sale.payment_status == payment_status)
+    if status:
+        filters.append(Sale.status == status)
+
+    query = (
+        select(Sale)
+        .where(*filters)
+        .options(selectinload(Sale.sale_items))
+        .order_by(Sale.created_at.desc(), Sale.id.desc())
+        .limit(limit + 1)  # One extra row tells us whether there is a next page
+    )
+
+    if cursor:
+        created_at, sale_id = decode_cursor(cursor)
+        query = query.where(tuple_(Sale.created_at, Sale.id) < tuple_(created_at, sale_id))
+    else:
+        totals = (
+            select(
+                func.count(Sale.id).label("total_count"),
+                func.coalesce(func.sum(Sale.total_amount), 0).label("total_amount"),
+            )
+            .where(*filters)
+            .subquery()
+        )
+        query = query.add_columns(totals.c.total_count, totals.c.total_amount)
+
+    result = await db.execute(query)
+    rows = result.all()
+    sales = [row[0] for row in rows]
+
+    archived_filters = dict(
+        patient_id=patient_id, payment_method=payment_method, payment_status=payment_status, status=status,
+    )
+    if include_archived:
+        archived = await read_archived(
+            "sales", date_from, date_to, limit=limit + 1,
+            before=(created_at, sale_id) if cursor else None, **archived_filters,
+        )
+        if archived:
+            sales = sorted(sales + archived, key=lambda sale: (sale.created_at, sale.id), reverse=True)[:limit + 1]
+
+    page = {"items": sales[:limit], "next_cursor": None}
+    if len(sales) > limit:
+        last = sales[limit - 1]
+        page["next_cursor"] = encode_cursor(last.created_at, last.id)
+    if not cursor:
+        page["total_count"] = rows[0].total_count if rows else 0
+        page["total_amount"] = float(rows[0].total_amount) if rows else 0.0
+        if include_archived:
+            # From the per-file stats written at archive time where possible
+            totals = await archived_totals("sales", date_from, date_to, **archived_filters)
+            page["total_count"] += totals["rows"]
+            page["total_amount"] += totals["total_amount"]
+
+    return sale_page_serializer.response(page)
+
 @router.get("/chart-data")
-async def get_sales_chart_data(db: AsyncSession = Depends(get_db)):
+async def get_sales_chart_data(
+    days: int = Query(90, ge=1, le=3660, description="Number of days back from today"),
+    db: AsyncSession = Depends(get_db)
+):
+    # A bounded window lets Postgres scan only the monthly partitions it covers
+    since = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days - 1)
     query = select(
         func.date_trunc("day", Sale.created_at).label("day"),
         func.sum(Sale.total_amount).label("total")
-    ).group_by("day").order_by("day")
+    ).where(Sale.created_at >= since).group_by("day").order_by("day")
     
     result = await db.execute(query)
-    results = result.all()
+    totals = {row.day.date(): float(row.total) for row in result.all()}
+
+    # Closed sales older than the archive horizon are in the cold archive
+    for sale in await read_archived("sales", since, columns=["created_at", "total_amount"]):
+        day = sale.created_at.date()
+        totals[day] = totals.get(day, 0.0) + (sale.total_amount or 0.0)
 
     data = []
     prev_total = None
 
-    for row in results:
-        total = float(row.total)
+    for day, total in sorted(totals.items()):
         change = None
         if prev_total is not None and prev_total > 0:
             change = round(((total - prev_total) / prev_total) * 100, 2)
         data.append({
-            "date": row.day.strftime("%Y-%m-%d"),
+            "date": day.strftime("%Y-%m-%d"),
             "total": total,
             "change_percent": change
         })
@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ..core.auth import current_active_user
+from ..core.user_cache import invalidate_cached_user
 from ..db.session import get_db
 from ..models.user import User
 from ..schemas.user import UserRead, UserUpdate, UserOut, UserProfile
@@ -23,10 +24,13 @@ async def update_user_me(
     current_user: User = Depends(current_active_user),
     db: AsyncSession = Depends(get_db)
 ):
-    for key, value in user_update.dict(exclude_unset=True).items():
+    # current_user may be a detached copy from the user cache
+    db.add(current_user)
+    for key, value in user_update.model_dump(exclude_unset=True).items():
         setattr(current_user, key, value)
     
     await db.commit()
+    invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
     return current_user
 
@@ -65,10 +69,11 @@ async def update_user(
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
-    for key, value in user_update.dict(exclude_unset=True).items():
+    for key, value in user_update.model_dump(exclude_unset=True).items():
         setattr(user, key, value)
     
     await db.commit()
+    invalidate_cached_user(user_id)
     await db.refresh(user)
     return user
 
@@ -85,6 +90,7 @@ async def delete_user(
     
     await db.delete(user)
     await db.commit()
+    invalidate_cached_user(user_id)
 
 @router.get("/me/prescriptions", response_model=List[PrescriptionOut])
 def get_user_prescriptions(
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, Literal
+from datetime import datetime
+
+class InventoryAlertOut(BaseModel):
+    """Alert shaped for the dashboard AlertCard"""
+    id: int
+    type: Literal["expiry", "stock"]
+    priority: Literal["low", "medium", "high", "critical"]
+    title: str
+    description: str
+    medication_id: int
+    inventory_item_id: Optional[int] = None
+    details: Optional[dict] = None
+    time: datetime = Field(..., description="When the alert was raised")
+
+    model_config = ConfigDict(from_attributes=True)
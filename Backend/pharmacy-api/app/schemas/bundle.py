@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal, Dict, Any
+
+class BundleEntryRequest(BaseModel):
+    """How to process a bundle entry (FHIR Bundle.entry.request)"""
+    method: Literal["GET", "HEAD", "POST", "PUT", "DELETE", "PATCH"]
+    url: str = Field(..., description="Resource type to create, e.g. Patient")
+
+class BundleEntry(BaseModel):
+    fullUrl: Optional[str] = Field(None, description="urn:uuid: id other entries can reference")
+    resource: Dict[str, Any]
+    request: BundleEntryRequest
+
+class Bundle(BaseModel):
+    """FHIR Bundle of type transaction or batch"""
+    resourceType: Literal["Bundle"] = "Bundle"
+    type: Literal["transaction", "batch"]
+    entry: List[BundleEntry] = Field(default_factory=list)
+
+class BundleEntryResponse(BaseModel):
+    status: str = Field(..., description="HTTP status line, e.g. 201 Created")
+    location: Optional[str] = Field(None, description="Type/id of the created resource")
+    outcome: Optional[Dict[str, Any]] = Field(None, description="OperationOutcome for a failed entry")
+
+class BundleResponseEntry(BaseModel):
+    fullUrl: Optional[str] = None
+    response: BundleEntryResponse
+
+class BundleResponse(BaseModel):
+    resourceType: Literal["Bundle"] = "Bundle"
+    type: Literal["transaction-response", "batch-response"]
+    entry: List[BundleResponseEntry]
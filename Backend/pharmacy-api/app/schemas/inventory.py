@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 from .medication import CodeableConcept, Quantity
@@ -33,10 +33,30 @@ class InventoryItemCreate(BaseModel):
     purchase_date: datetime = Field(..., description="Purchase date")
     purchase_price: float = Field(..., description="Purchase price")
     supplier_id: int = Field(..., description="Reference to supplier organization")
+    stock_quantity: int = Field(0, description="Units currently on hand in this batch")
+
+class InventoryItemUpdate(InventoryItemCreate):
+    """InventoryItem update schema"""
+    version: Optional[int] = Field(
+        None, description="Version the client last read; the update is rejected with 409 if the item changed since"
+    )
 
 class InventoryItemOut(InventoryItemCreate):
     """FHIR-compliant InventoryItem response schema"""
     id: int
+    version: int = Field(1, description="Incremented on every change; send it back when updating")
+
+    model_config = ConfigDict(from_attributes=True)
+
+class InventoryItemSummary(BaseModel):
+    """Lightweight InventoryItem row for the stock grid"""
+    id: int
+    status: str
+    fhir_medication_id: int
+    medication_display: Optional[str] = Field(None, description="Medication display name")
+    batch_number: str
+    expiration_date: datetime
+    stock_quantity: int
+    supplier_id: int
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
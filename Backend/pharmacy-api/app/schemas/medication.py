@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 
@@ -18,6 +18,8 @@ class MedicationBase(BaseModel):
     ingredient: Optional[List[dict]] = None
     batch: Optional[dict] = None
     note: Optional[str] = None
+    low_stock_threshold: Optional[int] = None
+    expiry_alert_days: Optional[int] = None
 
 class MedicationCreate(MedicationBase):
     pass
@@ -30,8 +32,7 @@ class MedicationOut(MedicationBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 class Quantity(BaseModel):
     value: float
     unit: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, Dict, Any
 from datetime import datetime
 from app.models.medication_dispenses import DispenseStatus
@@ -49,5 +49,4 @@ class MedicationDispenseResponse(MedicationDispenseBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+class MedicineOut(BaseModel):
+    """Reference medicine catalog entry"""
+    id: int
+    name: str
+    active_ingredient: Optional[str] = None
+    category: Optional[str] = None
+    price: Optional[float] = None
+    manufacturer: Optional[str] = None
+    dosage_form: Optional[str] = None
+    effects: Optional[str] = None
+    ai_classification: Optional[dict] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
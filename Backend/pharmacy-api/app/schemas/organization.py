@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, ConfigDict
 from typing import Optional, List
 
 class Identifier(BaseModel):
@@ -45,5 +45,4 @@ class OrganizationOut(OrganizationCreate):
     """FHIR-compliant Organization response schema"""
     id: int
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,8 +1,12 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, AliasChoices, field_validator
 from typing import Optional, List, Dict, Any
 from datetime import date, datetime
 import re
 
+# Compiled once; validate_telecom runs for every contact point
+PHONE_SEPARATORS = re.compile(r'[\s\-\(\)]')
+PHONE_NUMBER = re.compile(r'^\+?[1-9]\d{1,14}$')
+
 
 class HumanName(BaseModel):
     """FHIR HumanName structure"""
@@ -38,7 +42,8 @@ class PatientCreate(BaseModel):
     insurance_company: Optional[str] = Field(None, description="Name of insurance company")
     insurance_number: Optional[str] = Field(None, description="Insurance policy number")
 
-    @validator('birthDate')
+    @field_validator('birthDate')
+    @classmethod
     def validate_birth_date(cls, v):
         if v > date.today():
             raise ValueError('Birth date cannot be in the future')
@@ -46,14 +51,15 @@ class PatientCreate(BaseModel):
             raise ValueError('Birth date seems invalid (before 1900)')
         return v
 
-    @validator('telecom')
+    @field_validator('telecom')
+    @classmethod
     def validate_telecom(cls, v):
         for contact in v:
             if contact.system == "phone":
                 # Remove any spaces, dashes, or parentheses
-                phone = re.sub(r'[\s\-\(\)]', '', contact.value)
+                phone = PHONE_SEPARATORS.sub('', contact.value)
                 # Check if it's a valid phone number (international format)
-                if not re.match(r'^\+?[1-9]\d{1,14}$', phone):
+                if not PHONE_NUMBER.match(phone):
                     raise ValueError('Invalid phone number format. Must be in international format (e.g., +1234567890)')
                 contact.value = phone
         return v
@@ -64,36 +70,26 @@ class PatientResponse(BaseModel):
     name: List[Dict[str, Any]] = Field(..., description="Name information in FHIR format")
     telecom: List[Dict[str, Any]] = Field(..., description="Contact information in FHIR format")
     address: List[Dict[str, Any]] = Field(..., description="Address information in FHIR format")
-    birthDate: Optional[date] = Field(None, description="Date of birth")
+    birthDate: Optional[date] = Field(
+        None,
+        validation_alias=AliasChoices("birth_date", "birthDate"),
+        description="Date of birth"
+    )
     insurance_company: Optional[str] = Field(None, description="Name of insurance company")
     insurance_number: Optional[str] = Field(None, description="Insurance policy number")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
+    @field_validator('name', 'telecom', 'address', mode='before')
     @classmethod
-    def from_orm(cls, obj):
-        if not obj:
-            return None
-            
-        # Convert JSON fields to lists for FHIR compliance
-        name_data = obj.name if isinstance(obj.name, list) else [obj.name]
-        telecom_data = obj.telecom if isinstance(obj.telecom, list) else [obj.telecom]
-        address_data = obj.address if isinstance(obj.address, list) else [obj.address]
-        
-        return cls(
-            id=obj.id,
-            name=name_data,
-            telecom=telecom_data,
-            address=address_data,
-            birthDate=obj.birth_date,
-            insurance_company=obj.insurance_company,
-            insurance_number=obj.insurance_number
-        )
+    def ensure_list(cls, v):
+        # Older rows store a single JSON object instead of a list
+        if v is None:
+            return []
+        return v if isinstance(v, list) else [v]
 
 class PatientOut(PatientCreate):
     """FHIR-compliant Patient response schema"""
     id: int
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
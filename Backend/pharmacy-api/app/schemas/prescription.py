@@ -1,5 +1,5 @@
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
 from enum import Enum
 
@@ -53,8 +53,7 @@ class PrescriptionCreate(BaseModel):
     prescriber_id: int
     medication_id: int  # Database medication ID
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PrescriptionUpdate(BaseModel):
     # FHIR MedicationRequest fields
@@ -87,8 +86,7 @@ class PrescriptionUpdate(BaseModel):
     prescriber_id: Optional[int] = None
     medication_id: Optional[int] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class PrescriptionOut(BaseModel):
     id: int
@@ -123,5 +121,4 @@ class PrescriptionOut(BaseModel):
     prescriber_id: int
     medication_id: int
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
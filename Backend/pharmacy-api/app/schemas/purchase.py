@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 from .medication import CodeableConcept, Quantity
@@ -47,13 +47,27 @@ class PurchaseItemOut(PurchaseItemCreate):
     """FHIR-compliant PurchaseItem response schema"""
     id: int
     purchase_id: int
+    batch_number: Optional[str] = Field(None, description="Batch number of the medication")
+    expiration_date: Optional[datetime] = Field(None, description="Expiration date of the medication")
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class PurchaseSupplierOut(BaseModel):
+    """Supplier organization summary embedded in purchase responses"""
+    id: int
+    name: str
+    identifier: List[dict]
+    active: Optional[bool] = None
+    type: List[dict]
+    telecom: Optional[List[dict]] = None
+    address: Optional[List[dict]] = None
+
+    model_config = ConfigDict(from_attributes=True)
 
 class PurchaseOut(PurchaseCreate):
     """FHIR-compliant Purchase response schema"""
     id: int
+    supplier: PurchaseSupplierOut = Field(..., description="Supplier organization")
+    purchase_items: List[PurchaseItemOut] = Field(..., description="List of purchase items")
 
-    class Config:
-        from_attributes = True 
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional, List, Dict
 from datetime import datetime
 
@@ -24,8 +24,7 @@ class SaleCreate(BaseModel):
 
 class SaleItemResponse(SaleItemCreate):
     id: int
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SaleResponse(BaseModel):
     id: int
@@ -37,5 +36,37 @@ class SaleResponse(BaseModel):
     customer_name: Optional[str] = None
     sale_items: List[SaleItemResponse]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+class SaleListItem(BaseModel):
+    """Compact sale line for listings (no charge_item / price_component payloads)"""
+    medication_id: Optional[int] = None
+    inventory_item_id: Optional[int] = None
+    quantity: int
+    unit_price: float
+    total_price: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SaleListEntry(BaseModel):
+    """Compact sale for listings"""
+    id: int
+    invoice_number: str
+    date: Optional[datetime] = None
+    created_at: datetime
+    patient_id: Optional[int] = None
+    customer_name: Optional[str] = None
+    payment_method: str
+    payment_status: str
+    status: Optional[str] = None
+    total_amount: float
+    sale_items: List[SaleListItem]
+
+    model_config = ConfigDict(from_attributes=True)
+
+class SalePage(BaseModel):
+    """One keyset page of sales"""
+    items: List[SaleListEntry]
+    next_cursor: Optional[str] = None
+    total_count: Optional[int] = None  # Only on the first page
+    total_amount: Optional[float] = None  # Only on the first page
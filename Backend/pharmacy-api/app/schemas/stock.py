@@ -0,0 +1,50 @@
+from pydantic import BaseModel, Field, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+
+class StockBatch(BaseModel):
+    """Quantity on hand for a single inventory batch"""
+    inventory_item_id: int
+    batch_number: Optional[str] = None
+    supplier_id: Optional[int] = None
+    quantity: int
+    expiration_date: Optional[datetime] = None
+
+class MedicationStockOut(BaseModel):
+    """Stock-on-hand projection for a medication"""
+    medication_id: int
+    total_quantity: int = Field(..., description="Units on hand: all batches plus unbatched_quantity")
+    batches: List[StockBatch] = Field(default_factory=list, description="Per-batch quantities")
+    unbatched_quantity: int = Field(0, description="Net movements not tied to a batch (sales and dispenses by medication)")
+    earliest_expiry: Optional[datetime] = Field(None, description="Earliest expiry among batches in stock")
+    last_purchase_price: Optional[float] = Field(None, description="Unit price of the most recent receipt")
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StockMovementOut(BaseModel):
+    """One entry of the append-only stock ledger"""
+    id: int
+    occurred_at: datetime
+    movement_type: str = Field(..., description="opening | receipt | receipt_reversal | sale | dispense | dispense_reversal | adjustment | removal")
+    medication_id: int
+    inventory_item_id: Optional[int] = None
+    quantity: int = Field(..., description="Signed change: positive into stock, negative out of stock")
+    balance_after: Optional[int] = Field(None, description="Batch balance after the movement")
+    reference_type: Optional[str] = None
+    reference_id: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class StockBalance(BaseModel):
+    """Balance of one batch (or a medication's unbatched stock) at a point in time"""
+    medication_id: int
+    inventory_item_id: Optional[int] = None
+    quantity: int
+
+class StockAsOfOut(BaseModel):
+    """Stock reconstructed from the ledger at a point in time"""
+    as_of: datetime
+    snapshot_at: Optional[datetime] = Field(None, description="Snapshot the replay started from")
+    total_quantity: int
+    balances: List[StockBalance] = Field(default_factory=list)
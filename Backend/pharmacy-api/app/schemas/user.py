@@ -1,6 +1,6 @@
 from typing import Optional, List
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, constr, root_validator, validator
+from pydantic import BaseModel, EmailStr, constr, model_validator
 from fastapi_users import schemas
 
 
@@ -43,19 +43,20 @@ class UserCreate(schemas.BaseUserCreate):
     address: str  # Accept as a simple string from the frontend
     birthdate: date
 
-    @root_validator(pre=True)
+    @model_validator(mode='before')
+    @classmethod
     def build_fhir_fields(cls, values):
         # Build FHIR name
         values['name'] = [
-            HumanName(family=values['second_name'], given=[values['first_name']]).dict()
+            HumanName(family=values['second_name'], given=[values['first_name']]).model_dump()
         ]
         # Build FHIR telecom
         values['telecom'] = [
-            ContactPoint(system="email", value=values['email']).dict(),
-            ContactPoint(system="phone", value=values['phone_number']).dict()
+            ContactPoint(system="email", value=values['email']).model_dump(),
+            ContactPoint(system="phone", value=values['phone_number']).model_dump()
         ]
         # Build FHIR address (as array)
-        values['fhir_address'] = [Address(text=values['address']).dict()]
+        values['fhir_address'] = [Address(text=values['address']).model_dump()]
         # FHIR birth_date
         values['birth_date'] = values['birthdate']
         return values
@@ -63,14 +64,14 @@ class UserCreate(schemas.BaseUserCreate):
 
 # Update schema
 class UserUpdate(BaseModel):
-    first_name: Optional[str]
-    second_name: Optional[str]
-    email: Optional[EmailStr]
-    password: Optional[str]
-    phone_number: Optional[str]
-    gender: Optional[str]
-    address: Optional[str]
-    birthdate: Optional[date]
+    first_name: Optional[str] = None
+    second_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    password: Optional[str] = None
+    phone_number: Optional[str] = None
+    gender: Optional[str] = None
+    address: Optional[str] = None
+    birthdate: Optional[date] = None
 
 
 # Output schema
@@ -1,48 +1,35 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-import os
-from dotenv import load_dotenv
-
-load_dotenv()
-
-EMAIL_HOST = os.getenv("EMAIL_HOST")
-EMAIL_PORT = int(os.getenv("EMAIL_PORT"))
-EMAIL_USER = os.getenv("EMAIL_USER")
-EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-
-# Debug print
-print(f"Email Configuration:")
-print(f"Host: {EMAIL_HOST}")
-print(f"Port: {EMAIL_PORT}")
-print(f"User: {EMAIL_USER}")
-print(f"Password: {'*' * len(EMAIL_PASSWORD) if EMAIL_PASSWORD else 'None'}")
+import logging
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
 
 def send_email(to_email: str, subject: str, html: str):
-    print(f"Attempting to send email to: {to_email}")
-    print(f"Using SMTP server: {EMAIL_HOST}:{EMAIL_PORT}")
-    
+    # smtplib / email.mime are only loaded once an email is actually sent, and
+    # the SMTP settings are read here rather than at import (EMAIL_PORT may be unset)
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    logger.info(f"Sending email to {to_email} via {settings.EMAIL_HOST}:{settings.EMAIL_PORT}")
+
     msg = MIMEMultipart("alternative")
     msg["Subject"] = subject
-    msg["From"] = EMAIL_USER
+    msg["From"] = settings.EMAIL_USER
     msg["To"] = to_email
 
     part = MIMEText(html, "html")
     msg.attach(part)
 
     try:
-        print("Connecting to SMTP server...")
-        with smtplib.SMTP(EMAIL_HOST, EMAIL_PORT) as server:
-            print("Starting TLS...")
+        with smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT) as server:
             server.starttls()
-            print("Logging in...")
-            server.login(EMAIL_USER, EMAIL_PASSWORD)
-            print("Sending email...")
-            server.sendmail(EMAIL_USER, to_email, msg.as_string())
-            print(f"Email sent successfully to {to_email}")
+            server.login(settings.EMAIL_USER, settings.EMAIL_PASSWORD)
+            server.sendmail(settings.EMAIL_USER, to_email, msg.as_string())
+            logger.info(f"Email sent successfully to {to_email}")
     except Exception as e:
-        print(f"Failed to send email: {str(e)}")
-        print(f"Error type: {type(e)}")
+        logger.error(f"Failed to send email to {to_email}: {type(e).__name__}: {e}")
         raise
 
     return True
@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def version_etag(last_modified: Optional[datetime]) -> Optional[str]:
+    """Weak ETag (FHIR style W/"<version>") from a row's last-modified timestamp."""
+    if last_modified is None:
+        return None
+    if last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    return f'W/"{int(last_modified.timestamp() * 1_000_000)}"'
+
+
+def resource_etag(obj) -> Optional[str]:
+    """ETag for a row with updated_at (falling back to created_at for never-updated rows)."""
+    return version_etag(getattr(obj, "updated_at", None) or getattr(obj, "created_at", None))
+
+
+async def probe_etag(db: AsyncSession, model, row_id) -> Optional[str]:
+    """Current ETag of a row, reading only its version columns (not the JSON payload)."""
+    version = model.updated_at
+    if hasattr(model, "created_at"):
+        version = func.coalesce(model.updated_at, model.created_at)
+    result = await db.execute(select(version).where(model.id == row_id))
+    return version_etag(result.scalar_one_or_none())
+
+
+def etag_matches(header: Optional[str], etag: Optional[str]) -> bool:
+    """Weak comparison of an ETag against an If-None-Match / If-Match header value."""
+    if not header or etag is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def if_none_match(request: Request, etag: Optional[str]) -> Optional[Response]:
+    """304 response when the client already has this version, else None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    return None
+
+
+def require_if_match(request: Request, etag: Optional[str]) -> None:
+    """Reject an update made against a stale copy (lost update) with 412."""
+    header = request.headers.get("if-match")
+    if header and not etag_matches(header, etag):
+        raise HTTPException(
+            status_code=412,
+            detail="Resource has changed since it was read (If-Match does not match the current ETag)"
+        )
+
+
+def with_etag(response: Response, etag: Optional[str]) -> Response:
+    if etag:
+        response.headers["ETag"] = etag
+    return response
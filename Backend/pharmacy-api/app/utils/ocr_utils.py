@@ -1,8 +1,5 @@
-import pytesseract
-from PIL import Image
 import re
 import os
-from app.fhir.snomed.live_lookup import LiveSNOMEDLookup  # ✅ correct
 
 class OCRProcessingError(Exception):
     """Raised when OCR processing fails."""
@@ -10,14 +7,19 @@ class OCRProcessingError(Exception):
 
 class PrescriptionDataExtractor:
     def __init__(self, tesseract_cmd: str = None):
-        if tesseract_cmd:
-            pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+        self.tesseract_cmd = tesseract_cmd
 
     def extract(self, image_path: str) -> dict:
         if not os.path.exists(image_path):
             raise OCRProcessingError(f"Image file not found: {image_path}")
         
         try:
+            # pytesseract / PIL are imported on first use to keep app startup light
+            import pytesseract
+            from PIL import Image
+
+            if self.tesseract_cmd:
+                pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
             image = Image.open(image_path)
             raw_text = pytesseract.image_to_string(image)
             if not raw_text.strip():
@@ -52,6 +54,8 @@ class PrescriptionDataExtractor:
         """
         Search for SNOMED CT concept by name using Snowstorm API.
         """
+        from app.fhir.snomed.live_lookup import LiveSNOMEDLookup  # Pulls in requests
+
         matched = []
         for med in meds:
             try:
@@ -65,3 +69,4 @@ class PrescriptionDataExtractor:
                 "snomed": concept  # {'code': ..., 'display': ...} or None
             })
         return matched
+
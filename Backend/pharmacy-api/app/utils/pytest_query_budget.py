@@ -0,0 +1,70 @@
+"""pytest plugin enforcing per-endpoint query budgets.
+
+Enable it from a conftest.py with ``pytest_plugins = ["app.utils.pytest_query_budget"]``.
+It switches query diagnostics on and adds:
+
+* ``@pytest.mark.query_budget(5)`` - fail the test if any request it makes
+  runs more than 5 statements. Per-endpoint limits can be given as well::
+
+      @pytest.mark.query_budget(10, endpoints={"POST /purchases/": 6})
+
+* the ``query_budget`` fixture, for code that doesn't go through a request::
+
+      with query_budget(3):
+          await stock.apply(...)
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from app.core.query_diagnostics import diagnostics, track_queries
+
+
+def _describe(endpoint, tracker, budget):
+    top = "\n".join(f"    {count}x {statement[:200]}" for statement, count in tracker.counts.most_common(5))
+    return f"{endpoint} ran {tracker.total} queries (budget {budget}):\n{top}"
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries, endpoints=None): fail if a request runs more statements than its budget",
+    )
+    diagnostics.enabled = True
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # Checked around the test call itself, so a blown budget is a test failure, not a teardown error
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        return (yield)
+
+    default = marker.args[0] if marker.args else None
+    endpoints = marker.kwargs.get("endpoints") or {}
+    violations = []
+
+    def observe(endpoint, tracker):
+        budget = endpoints.get(endpoint, default)
+        if budget is not None and tracker.total > budget:
+            violations.append(_describe(endpoint, tracker, budget))
+
+    diagnostics.observers.append(observe)
+    try:
+        result = yield
+    finally:
+        diagnostics.observers.remove(observe)
+    if violations:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(violations), pytrace=False)
+    return result
+
+
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def check(max_queries):
+        with track_queries() as tracker:
+            yield tracker
+        if tracker.total > max_queries:
+            pytest.fail("Query budget exceeded:\n" + _describe("block", tracker, max_queries), pytrace=False)
+    return check
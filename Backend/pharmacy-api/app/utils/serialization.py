@@ -0,0 +1,75 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Type
+
+from fastapi import HTTPException, Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+# Upper bound on distinct `fields=` projections compiled per serializer
+MAX_PROJECTIONS = 64
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[Set[str]]:
+    """Parse a comma-separated `fields=` projection into a set of top-level field names."""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+class ORMSerializer:
+    """Maps ORM rows to a response schema once and encodes straight to JSON.
+
+    Routes return the resulting Response directly, so FastAPI does not
+    re-validate the payload against `response_model` (which is still declared
+    on the route for the OpenAPI schema).
+    """
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+        self._adapters = (TypeAdapter(model), TypeAdapter(List[model]))
+        self._projections: Dict[FrozenSet[str], Tuple[TypeAdapter, TypeAdapter]] = {}
+
+    def _get_adapters(self, fields: Optional[Set[str]]) -> Tuple[TypeAdapter, TypeAdapter]:
+        if not fields:
+            return self._adapters
+        key = frozenset(fields)
+        adapters = self._projections.get(key)
+        if adapters is None:
+            # A projected model only reads the requested attributes, so
+            # relationships outside the projection are never touched.
+            projected = create_model(
+                f"{self.model.__name__}Projection",
+                __config__=ConfigDict(from_attributes=True),
+                **{
+                    name: (info.annotation, info)
+                    for name, info in self.model.model_fields.items()
+                    if name in key
+                },
+            )
+            adapters = (TypeAdapter(projected), TypeAdapter(List[projected]))
+            if len(self._projections) < MAX_PROJECTIONS:
+                self._projections[key] = adapters
+        return adapters
+
+    def to_model(self, obj: Any, fields: Optional[Set[str]] = None) -> BaseModel:
+        adapter, _ = self._get_adapters(fields)
+        return adapter.validate_python(obj, from_attributes=True)
+
+    def to_models(self, objs: Iterable[Any], fields: Optional[Set[str]] = None) -> List[BaseModel]:
+        _, list_adapter = self._get_adapters(fields)
+        return list_adapter.validate_python(list(objs), from_attributes=True)
+
+    def response(self, obj: Any, fields: Optional[Set[str]] = None, status_code: int = 200) -> Response:
+        adapter, _ = self._get_adapters(fields)
+        content = adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+        return Response(content=content, media_type="application/json", status_code=status_code)
+
+    def list_response(self, objs: Iterable[Any], fields: Optional[Set[str]] = None) -> Response:
+        _, list_adapter = self._get_adapters(fields)
+        content = list_adapter.dump_json(list_adapter.validate_python(list(objs), from_attributes=True))
+        return Response(content=content, media_type="application/json")
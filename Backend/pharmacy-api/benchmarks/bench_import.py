@@ -0,0 +1,108 @@
+"""NDJSON bulk import throughput benchmark.
+
+Generates Patient or Medication NDJSON (optionally gzip-compressed) and feeds
+it through the import pipeline: streamed line splitting, JSON parsing,
+schema validation and row building. Reports lines/sec for that CPU-bound part.
+
+With --insert the rows are also written to DATABASE_URL through
+NDJSONImporter, batch inserts and commits included. Point it at a scratch
+database: the rows are kept.
+
+Usage:
+    python benchmarks/bench_import.py [--type Patient] [--lines 50000] [--gzip] [--insert]
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.bulk_import import NDJSONImporter, iter_ndjson_lines
+
+
+def patient_line(i):
+    return {
+        "resourceType": "Patient",
+        "name": [{"family": f"Family{i}", "given": [f"Given{i}"]}],
+        "telecom": [{"system": "phone", "value": f"+2010{i:08d}"}],
+        "address": [{"line": [f"{i} Nile St"], "city": "Cairo", "country": "Egypt"}],
+        "birthDate": f"{1950 + i % 60}-0{1 + i % 9}-1{i % 9}",
+        "insurance_company": "Acme Health",
+        "insurance_number": f"INS-{i}",
+    }
+
+
+def medication_line(i):
+    return {
+        "resourceType": "Medication",
+        "status": "active",
+        "code": {"system": "http://snomed.info/sct", "value": str(387517004 + i), "display": f"Medication {i}"},
+        "form": {"text": "tablet"},
+        "amount": {"numerator": {"value": 500, "unit": "mg"}},
+    }
+
+
+def build_body(resource_type, count, compress):
+    make = patient_line if resource_type == "Patient" else medication_line
+    body = "".join(json.dumps(make(i)) + "\n" for i in range(count)).encode()
+    return gzip.compress(body) if compress else body
+
+
+async def chunked(body, size=64 * 1024):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+async def parse_and_validate(resource_type, body, compress):
+    importer = NDJSONImporter(resource_type)
+    rows = 0
+    line_number = 0
+    async for line in iter_ndjson_lines(chunked(body), gzipped=compress):
+        line_number += 1
+        if not line.strip():
+            continue
+        validated = importer._validate(line_number, line)
+        if validated is not None:
+            importer.to_row(validated, None)
+            rows += 1
+    return rows, importer.failed
+
+
+async def insert_all(resource_type, body, compress):
+    from app.database import AsyncSessionLocal, async_engine
+
+    async with AsyncSessionLocal() as db:
+        report = await NDJSONImporter(resource_type).run(db, iter_ndjson_lines(chunked(body), gzipped=compress))
+    await async_engine.dispose()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--type", choices=["Patient", "Medication"], default="Patient")
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--gzip", action="store_true")
+    parser.add_argument("--insert", action="store_true", help="also insert into DATABASE_URL")
+    args = parser.parse_args()
+
+    body = build_body(args.type, args.lines, args.gzip)
+    print(f"{args.lines} {args.type} lines, {len(body) / 1024 / 1024:.1f} MiB{' gzip' if args.gzip else ''}")
+
+    start = time.perf_counter()
+    rows, failed = asyncio.run(parse_and_validate(args.type, body, args.gzip))
+    elapsed = time.perf_counter() - start
+    print(f"parse + validate + build rows: {rows / elapsed:,.0f} lines/s ({failed} invalid)")
+
+    if args.insert:
+        start = time.perf_counter()
+        report = asyncio.run(insert_all(args.type, body, args.gzip))
+        elapsed = time.perf_counter() - start
+        print(f"end to end with inserts:      {report['imported'] / elapsed:,.0f} rows/s ({report['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
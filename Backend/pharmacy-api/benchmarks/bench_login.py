@@ -0,0 +1,94 @@
+"""Login burst benchmark: 50 concurrent password checks.
+
+Compares verifying bcrypt hashes inline on the event loop with verifying them
+on the password worker pool, and reports login latency plus the latency of a
+cheap "other request" that runs alongside the burst.
+
+Usage:
+    python benchmarks/bench_login.py [--concurrency 50] [--rounds 3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.security import (
+    get_password_hash,
+    verify_password,
+    verify_password_async,
+)
+
+PASSWORD = "correct horse battery staple"
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def login_inline(hashed, burst_start):
+    verify_password(PASSWORD, hashed)
+    return time.perf_counter() - burst_start
+
+
+async def login_pool(hashed, burst_start):
+    await verify_password_async(PASSWORD, hashed)
+    return time.perf_counter() - burst_start
+
+
+async def probe(stop: asyncio.Event, samples: list):
+    """Simulates unrelated requests; records how long each waits for the loop."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        samples.append(time.perf_counter() - start - 0.005)
+
+
+async def run_burst(login, hashed, concurrency):
+    stop = asyncio.Event()
+    probe_samples = []
+    probe_task = asyncio.create_task(probe(stop, probe_samples))
+    await asyncio.sleep(0)
+    # Every login arrives at once, so latency is measured from the burst start
+    burst_start = time.perf_counter()
+    latencies = await asyncio.gather(*(login(hashed, burst_start) for _ in range(concurrency)))
+    stop.set()
+    await probe_task
+    return list(latencies), probe_samples
+
+
+def report(name, latencies, probe_samples):
+    print(f"{name}:")
+    print(f"  login p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p99={percentile(latencies, 99) * 1000:.1f}ms")
+    if probe_samples:
+        print(f"  other-request stall max={max(probe_samples) * 1000:.1f}ms "
+              f"p99={percentile(probe_samples, 99) * 1000:.1f}ms")
+    else:
+        print("  other-request stall: probe never ran during the burst")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    hashed = get_password_hash(PASSWORD)
+
+    for name, login in (("inline", login_inline), ("worker pool", login_pool)):
+        latencies, probe_samples = [], []
+        for _ in range(args.rounds):
+            round_latencies, round_probe = await run_burst(login, hashed, args.concurrency)
+            latencies.extend(round_latencies)
+            probe_samples.extend(round_probe)
+        report(name, latencies, probe_samples)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+"""Purchase listing serialization benchmark.
+
+Serializes 1,000 purchases (5 items each) the old way -- hand-built dicts that
+FastAPI then re-validates against PurchaseOut and JSON-encodes -- and through
+the shared ORMSerializer, with and without a `fields=` projection.
+No database is needed; rows are built as transient ORM objects.
+
+Usage:
+    python benchmarks/bench_purchase_serialization.py [--purchases 1000] [--items 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import TypeAdapter
+
+from app.models import (  # noqa: F401  (register all mappers)
+    user, patient, medication, medication_request, medication_dispenses,
+    organization, prescription, purchase as purchase_models, sale, inventory, audit_log,
+)
+from app.models.organization import Organization
+from app.models.purchase import Purchase, PurchaseItem
+from app.schemas.purchase import PurchaseOut
+from app.utils.serialization import ORMSerializer
+
+CODE = {"system": "http://snomed.info/sct", "value": "387517004", "display": "Paracetamol"}
+QUANTITY = {"value": 10, "unit": "box", "system": "http://unitsofmeasure.org", "code": "1"}
+
+
+def build_purchases(count, items_per_purchase):
+    supplier = Organization(
+        id=1, name="Acme Pharma", identifier=[{"system": "urn:tax", "value": "1"}],
+        active=True, type=[{"text": "supplier"}], telecom=[], address=[],
+    )
+    now = datetime(2025, 1, 1)
+    purchases = []
+    for i in range(count):
+        p = Purchase(
+            id=i + 1, status="completed", category=CODE, priority="routine", item=CODE,
+            quantity=QUANTITY, parameter=None, order_date=now, expected_delivery_date=now,
+            actual_delivery_date=now, total_amount=100.0, payment_status="paid",
+            payment_method="cash", supplier_id=1,
+        )
+        p.supplier = supplier
+        p.purchase_items = [
+            PurchaseItem(
+                id=i * items_per_purchase + j + 1, sequence=j + 1, item=CODE, quantity=QUANTITY,
+                purchase_id=i + 1, medication_id=1, quantity_ordered=10, quantity_received=10,
+                unit_price=2.5, total_price=25.0, batch_number=f"B{i}-{j}",
+                expiration_date=now + timedelta(days=365),
+            )
+            for j in range(items_per_purchase)
+        ]
+        purchases.append(p)
+    return purchases
+
+
+def old_path(purchases):
+    def org_dict(org):
+        return {"id": org.id, "name": org.name, "identifier": org.identifier, "active": org.active,
+                "type": org.type, "telecom": org.telecom, "address": org.address}
+
+    def item_dict(item):
+        return {"id": item.id, "sequence": item.sequence, "item": item.item, "quantity": item.quantity,
+                "purchase_id": item.purchase_id, "medication_id": item.medication_id,
+                "quantity_ordered": item.quantity_ordered, "quantity_received": item.quantity_received,
+                "unit_price": item.unit_price, "total_price": item.total_price,
+                "batch_number": item.batch_number or "",
+                "expiration_date": item.expiration_date or datetime.utcnow()}
+
+    rows = [{
+        "id": p.id, "status": p.status, "category": p.category, "priority": p.priority,
+        "item": p.item, "quantity": p.quantity, "parameter": p.parameter,
+        "order_date": p.order_date, "expected_delivery_date": p.expected_delivery_date,
+        "actual_delivery_date": p.actual_delivery_date, "total_amount": p.total_amount,
+        "payment_status": p.payment_status, "payment_method": p.payment_method,
+        "supplier_id": p.supplier_id, "supplier": org_dict(p.supplier),
+        "purchase_items": [item_dict(item) for item in p.purchase_items],
+    } for p in purchases]
+    # What FastAPI does with a response_model: validate, dump, JSON-encode
+    adapter = TypeAdapter(List[PurchaseOut])
+    validated = adapter.validate_python(rows)
+    return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+
+def time_it(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--purchases", type=int, default=1000)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    purchases = build_purchases(args.purchases, args.items)
+    serializer = ORMSerializer(PurchaseOut)
+    summary_fields = {"id", "status", "order_date", "total_amount", "payment_status", "supplier_id"}
+
+    cases = [
+        ("dicts + response_model", lambda: old_path(purchases)),
+        ("ORMSerializer", lambda: serializer.list_response(purchases).body),
+        ("ORMSerializer fields=summary", lambda: serializer.list_response(purchases, summary_fields).body),
+    ]
+    for name, fn in cases:
+        seconds, size = time_it(fn, args.repeat)
+        print(f"{name:32s} {seconds * 1000:8.1f}ms  {size / 1024:8.1f}KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""Schema validation micro-benchmark.
+
+Reports validations per second for PatientCreate, PrescriptionCreate and
+PurchaseCreate, three ways: one model_validate call per payload, a single
+TypeAdapter(List[...]).validate_python over the batch, and validate_json
+straight from the request bytes (what FastAPI bodies and bulk import see).
+Also times PatientResponse serialization of ORM rows through ORMSerializer.
+No database is needed.
+
+Usage:
+    python benchmarks/bench_schema_validation.py [--count 10000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pydantic import TypeAdapter
+
+from app.models import (  # noqa: F401  (register all mappers)
+    user, patient as patient_models, medication, medication_request, medication_dispenses,
+    organization, prescription, purchase, sale, inventory, audit_log,
+)
+from app.models.patient import Patient
+from app.schemas.patient import PatientCreate, PatientResponse
+from app.schemas.prescription import PrescriptionCreate
+from app.schemas.purchase import PurchaseCreate
+from app.utils.serialization import ORMSerializer
+
+CODE = {"system": "http://snomed.info/sct", "value": "387517004", "display": "Paracetamol"}
+QUANTITY = {"value": 10, "unit": "box", "system": "http://unitsofmeasure.org", "code": "1"}
+
+
+def patient_payload(i):
+    return {
+        "name": [{"family": f"Family{i}", "given": [f"Given{i}", "Middle"]}],
+        "telecom": [
+            {"system": "phone", "value": f"+20 (10) {i:08d}"},
+            {"system": "email", "value": f"patient{i}@example.com"},
+        ],
+        "address": [{"line": [f"{i} Nile St"], "city": "Cairo", "country": "Egypt"}],
+        "birthDate": "1980-05-17",
+        "insurance_company": "Acme Health",
+        "insurance_number": f"INS-{i}",
+    }
+
+
+def prescription_payload(i):
+    return {
+        "identifier": [{"system": "http://example.com/prescriptions", "value": f"RX{i}"}],
+        "status": "active",
+        "intent": "order",
+        "subject": {"reference": f"Patient/{i}"},
+        "authored_on": "2025-03-25T12:00:00",
+        "requester": {"reference": "Practitioner/1"},
+        "dosage_instruction": [{
+            "sequence": 1,
+            "text": "Take one tablet three times daily",
+            "timing": {"repeat": {"frequency": 3, "period": 1, "periodUnit": "d"}},
+            "route": {"text": "oral"},
+            "dose_and_rate": [{"type": {"text": "ordered"}, "dose": {"value": 1, "unit": "tablet"}}],
+        }],
+        "prescription_source": "electronic",
+        "patient_id": i,
+        "prescriber_id": 1,
+        "medication_id": 1,
+    }
+
+
+def purchase_payload(i, items=5):
+    return {
+        "status": "completed",
+        "category": CODE,
+        "priority": "routine",
+        "item": CODE,
+        "quantity": QUANTITY,
+        "supplier": {"reference": "Organization/1"},
+        "order_date": "2025-01-01T00:00:00",
+        "expected_delivery_date": "2025-01-05T00:00:00",
+        "total_amount": 125.0,
+        "payment_status": "paid",
+        "payment_method": "cash",
+        "supplier_id": 1,
+        "purchase_items": [
+            {
+                "sequence": j + 1, "item": CODE, "quantity": QUANTITY, "medication_id": 1,
+                "quantity_ordered": 10, "quantity_received": 10, "unit_price": 2.5,
+                "total_price": 25.0, "batch_number": f"B{i}-{j}",
+                "expiration_date": "2026-01-01T00:00:00",
+            }
+            for j in range(items)
+        ],
+    }
+
+
+def best_of(repeat, fn):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_schema(name, model, payloads, repeat):
+    list_adapter = TypeAdapter(List[model])
+    body = json.dumps(payloads).encode()
+    count = len(payloads)
+
+    results = {
+        "model_validate": best_of(repeat, lambda: [model.model_validate(p) for p in payloads]),
+        "TypeAdapter.validate_python": best_of(repeat, lambda: list_adapter.validate_python(payloads)),
+        "TypeAdapter.validate_json": best_of(repeat, lambda: list_adapter.validate_json(body)),
+    }
+    for label, elapsed in results.items():
+        print(f"  {name:<20} {label:<28} {count / elapsed:>12,.0f} validations/s")
+
+
+def bench_patient_response(count, repeat):
+    rows = [
+        Patient(
+            id=i + 1,
+            name=[{"family": f"Family{i}", "given": [f"Given{i}"]}],
+            telecom=[{"system": "phone", "value": f"+2010{i:08d}"}],
+            address={"line": [f"{i} Nile St"], "city": "Cairo", "country": "Egypt"},
+            birth_date=date(1980, 5, 17),
+            insurance_company="Acme Health",
+            insurance_number=f"INS-{i}",
+        )
+        for i in range(count)
+    ]
+    serializer = ORMSerializer(PatientResponse)
+    elapsed = best_of(repeat, lambda: serializer.list_response(rows))
+    print(f"  {'PatientResponse':<20} {'ORMSerializer.list_response':<28} {count / elapsed:>12,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.count} payloads per schema, best of {args.repeat}")
+    bench_schema("PatientCreate", PatientCreate, [patient_payload(i) for i in range(args.count)], args.repeat)
+    bench_schema("PrescriptionCreate", PrescriptionCreate, [prescription_payload(i) for i in range(args.count)], args.repeat)
+    bench_schema("PurchaseCreate", PurchaseCreate, [purchase_payload(i) for i in range(args.count)], args.repeat)
+    bench_patient_response(args.count, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""Checkout throughput versus number of worker processes.
+
+For each worker count, starts the API under gunicorn (gunicorn_conf.py) on a
+local port, waits for /api/health/live, and drives POST /sales/ over real
+HTTP at a fixed concurrency per worker. Reports throughput, p50/p95 latency
+and scaling efficiency relative to one worker, i.e.
+rps(n) / (n * rps(1)); close to 1.0 means near-linear scaling.
+
+The database must already be seeded (see bench_workflows.py or
+generate_data.py) and migrated. SHARED_STATE_URL must point at a Redis
+instance when more than one worker is measured. Run on a machine with at
+least as many free cores as the largest worker count, with Postgres on other
+cores or another host, or the numbers will show CPU contention rather than
+the API's scaling.
+
+Usage:
+    python benchmarks/bench_workers.py --database-url postgresql+asyncpg://... \\
+        --shared-state-url redis://localhost:6379/0 [--workers 1 2 4 8] \\
+        [--requests-per-worker 500] [--concurrency-per-worker 16] [--port 8765] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from bench_workflows import checkout_request, git_commit, load_dataset, percentile  # noqa: E402
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def start_server(workers, args):
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url,
+        "SHARED_STATE_URL": args.shared_state_url or "",
+        "WEB_CONCURRENCY": str(workers),
+        "BIND": f"127.0.0.1:{args.port}",
+        # Only the checkout path is measured
+        "WARMUP_PATHS": "",
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "main:app", "-c", "gunicorn_conf.py"],
+        cwd=API_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+async def wait_until_live(client, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/api/health/live")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.5)
+    raise SystemExit("Server did not come up; run gunicorn_conf.py by hand to see the error")
+
+
+async def measure(workers, data, args, rng):
+    import httpx
+
+    requests = [checkout_request(data, rng) for _ in range(args.requests_per_worker * workers)]
+    concurrency = args.concurrency_per_worker * workers
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    server = start_server(workers, args)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=60) as client:
+            await wait_until_live(client)
+            # Let every worker open its pool and finish warmup
+            for method, url, body in requests[:args.warmup * workers]:
+                await client.request(method, url, json=body)
+
+            latencies, errors = [], {}
+            queue = iter(requests[args.warmup * workers:])
+
+            async def worker():
+                for method, url, body in queue:
+                    start = time.perf_counter()
+                    response = await client.request(method, url, json=body)
+                    latencies.append(time.perf_counter() - start)
+                    if response.status_code >= 400:
+                        errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    return {
+        "workers": workers,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+async def run(args):
+    from app.database import async_engine
+
+    rng = random.Random(args.seed)
+    data = await load_dataset()
+    await async_engine.dispose()
+    if not data["batches"] or not data["patient_ids"]:
+        raise SystemExit("The database has no inventory or patients; seed it first")
+
+    results = []
+    print(f"checkout (POST /sales/), {args.concurrency_per_worker} concurrent clients per worker")
+    for workers in args.workers:
+        result = await measure(workers, data, args, rng)
+        baseline = results[0]["throughput_rps"] / results[0]["workers"] if results else result["throughput_rps"] / workers
+        result["scaling_efficiency"] = round(result["throughput_rps"] / (baseline * workers), 2)
+        results.append(result)
+        print(f"  {workers:>2} worker(s)  {result['throughput_rps']:>9,.1f} req/s  p50 {result['p50_ms']:>8.1f} ms  "
+              f"p95 {result['p95_ms']:>8.1f} ms  efficiency {result['scaling_efficiency']:.2f}  "
+              f"errors {sum(result['errors'].values())}")
+    return {"commit": git_commit(), "cpu_count": os.cpu_count(), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="seeded database (defaults to DATABASE_URL)")
+    parser.add_argument("--shared-state-url", default=os.getenv("SHARED_STATE_URL"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests-per-worker", type=int, default=500)
+    parser.add_argument("--concurrency-per-worker", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="warmup requests per worker")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default benchmarks/results/workers-<commit>.json)")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("Pass --database-url or set DATABASE_URL")
+    if max(args.workers) > 1 and not args.shared_state_url:
+        raise SystemExit("Pass --shared-state-url or set SHARED_STATE_URL to run more than one worker")
+    os.environ["DATABASE_URL"] = args.database_url
+
+    report = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"workers-{report['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
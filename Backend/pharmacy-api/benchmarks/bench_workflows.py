@@ -0,0 +1,418 @@
+"""Load test for the core pharmacy workflows.
+
+Seeds a scratch Postgres database with a realistic dataset (suppliers,
+medications, inventory batches, patients, a practitioner and a year of sales),
+then drives the real FastAPI app in-process through an ASGI client and
+reports throughput and p50/p95/p99 latency for:
+
+    checkout       POST /sales/
+    receiving      POST /purchases/
+    inventory      GET  /inventory/
+    patient_search GET  /fhir/Patient/?last_name=...
+    prescription   POST /prescriptions/
+
+Results are written as JSON (tagged with the current git commit) so runs can
+be compared across commits. The database must already be migrated
+(`alembic upgrade head`) and should be a scratch one: seeded and generated
+rows are kept. Authentication is bypassed for the prescription scenario.
+
+Usage:
+    python benchmarks/bench_workflows.py --database-url postgresql+asyncpg://... \\
+        [--patients 5000] [--medications 500] [--sales-per-day 40] \\
+        [--requests 300] [--concurrency 10] [--seed 42] [--skip-seed] [--output results.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+CODE_SYSTEM = "http://snomed.info/sct"
+FAMILY_NAMES = ["Hassan", "Mostafa", "Ibrahim", "Mahmoud", "Ali", "Saleh", "Fahmy", "Nasser", "Khalil", "Adel"]
+GIVEN_NAMES = ["Omar", "Mona", "Youssef", "Nour", "Karim", "Salma", "Ahmed", "Laila", "Hany", "Dina"]
+CITIES = ["Cairo", "Giza", "Alexandria", "Mansoura", "Tanta"]
+SCENARIOS = ["checkout", "receiving", "inventory", "patient_search", "prescription"]
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --- Dataset ---
+
+def supplier_rows(count):
+    return [
+        {
+            "identifier": [{"system": "urn:tax-id", "value": f"TAX-{i}"}],
+            "active": True,
+            "type": [{"text": "supplier"}],
+            "name": f"Supplier {i}",
+            "telecom": [{"system": "phone", "value": f"+20 2 {i:08d}"}],
+            "address": [{"city": CITIES[i % len(CITIES)], "country": "Egypt"}],
+            "organization_type": "supplier",
+            "license_number": f"LIC-{i}",
+            "tax_id": f"TAX-{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def medication_rows(count, now):
+    return [
+        {
+            "resource_type": "Medication",
+            "status": "active",
+            "code_system": CODE_SYSTEM,
+            "code_value": str(387517004 + i),
+            "code_display": f"Medication {i}",
+            "form": {"text": "tablet"},
+            "amount": {"numerator": {"value": 500, "unit": "mg"}},
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def patient_rows(count, rng):
+    rows = []
+    for i in range(count):
+        rows.append({
+            "name": [{"family": f"{rng.choice(FAMILY_NAMES)}{i}", "given": [rng.choice(GIVEN_NAMES)]}],
+            "telecom": [{"system": "phone", "value": f"+2010{i:08d}"}],
+            "address": [{"line": [f"{i} Nile St"], "city": rng.choice(CITIES), "country": "Egypt"}],
+            "birth_date": date(1940, 1, 1) + timedelta(days=rng.randrange(365 * 80)),
+            "insurance_company": rng.choice([None, "Acme Health", "Nile Insurance"]),
+            "insurance_number": f"INS-{i}",
+        })
+    return rows
+
+
+def inventory_rows(medication_ids, supplier_ids, batches_per_medication, rng, now):
+    rows = []
+    for medication_id in medication_ids:
+        for b in range(batches_per_medication):
+            quantity = rng.randint(50, 500)
+            rows.append({
+                "identifier": [{"system": "urn:batch", "value": f"M{medication_id}-B{b}"}],
+                "status": "active",
+                "medication": {"reference": f"Medication/{medication_id}"},
+                "code": {"system": CODE_SYSTEM, "value": str(medication_id)},
+                "quantity": {"value": quantity, "unit": "tablet"},
+                "stock_quantity": quantity,
+                "fhir_medication_id": medication_id,
+                "batch_number": f"M{medication_id}-B{b}",
+                "expiration_date": now + timedelta(days=rng.randint(30, 900)),
+                "purchase_date": now - timedelta(days=rng.randint(1, 365)),
+                "purchase_price": round(rng.uniform(1, 50), 2),
+                "supplier_id": rng.choice(supplier_ids),
+            })
+    return rows
+
+
+async def seed(args, rng):
+    from app.core.bundle import bulk_insert
+    from app.core.partitions import ensure_partitions
+    from app.core.stock import rebuild_stock_on_hand
+    from app.database import AsyncSessionLocal
+    from app.models.inventory import InventoryItem
+    from app.models.medication import Medication
+    from app.models.organization import Organization
+    from app.models.patient import Patient
+    from app.models.sale import Sale, SaleItem
+    from app.models.user import User
+
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        supplier_ids = await bulk_insert(db, Organization, supplier_rows(args.suppliers))
+        medication_ids = await bulk_insert(db, Medication, medication_rows(args.medications, now))
+        patient_ids = await bulk_insert(db, Patient, patient_rows(args.patients, rng))
+        inventory = inventory_rows(medication_ids, supplier_ids, args.batches_per_medication, rng, now)
+        inventory_ids = await bulk_insert(db, InventoryItem, inventory)
+
+        practitioner = User(
+            email=f"bench-{rng.randrange(10**9)}@example.com", hashed_password="!", is_active=True,
+            is_verified=True, username=f"bench{rng.randrange(10**9)}",
+            identifier=[{"system": "urn:bench", "value": "prescriber"}], name=[{"family": "Bench"}],
+        )
+        db.add(practitioner)
+        await db.flush()
+
+        # A year of sales history, 1-4 lines each
+        sales, sale_lines = [], []
+        for day in range(365):
+            for n in range(args.sales_per_day):
+                created = now - timedelta(days=day, seconds=rng.randrange(86400))
+                items = []
+                for sequence in range(1, rng.randint(1, 4) + 1):
+                    index = rng.randrange(len(inventory_ids))
+                    quantity = rng.randint(1, 3)
+                    items.append({
+                        "sequence": sequence,
+                        "charge_item": {"code": {"text": "medication"}},
+                        "quantity": quantity,
+                        "unit_price": 10.0,
+                        "total_price": 10.0 * quantity,
+                        "medication_id": inventory[index]["fhir_medication_id"],
+                        "inventory_item_id": inventory_ids[index],
+                    })
+                sale_lines.append(items)
+                sales.append({
+                    "invoice_number": f"INV-SEED-{day}-{n}-{rng.randrange(10**9)}",
+                    "date": created,
+                    "created_at": created,
+                    "patient_id": rng.choice(patient_ids) if rng.random() < 0.6 else None,
+                    "payment_method": rng.choice(["cash", "card", "insurance"]),
+                    "payment_status": "paid",
+                    "status": "completed",
+                    "total_amount": sum(item["total_price"] for item in items),
+                })
+        await ensure_partitions(db, now - timedelta(days=365), now)
+        sale_ids = await bulk_insert(db, Sale, sales)
+        lines = [
+            dict(item, sale_id=sale_id, sale_created_at=sale["created_at"])
+            for sale_id, sale, items in zip(sale_ids, sales, sale_lines) for item in items
+        ]
+        await bulk_insert(db, SaleItem, lines, returning=False)
+
+        await rebuild_stock_on_hand(db)
+        await db.commit()
+
+    print(f"Seeded {len(supplier_ids)} suppliers, {len(medication_ids)} medications, "
+          f"{len(inventory_ids)} batches, {len(patient_ids)} patients, {len(sales)} sales / {len(lines)} lines")
+
+
+async def load_dataset():
+    """Ids the scenarios pick from (works on a freshly seeded or an existing database)."""
+    from sqlalchemy import select
+
+    from app.database import AsyncSessionLocal
+    from app.models.inventory import InventoryItem
+    from app.models.organization import Organization
+    from app.models.patient import Patient
+    from app.models.user import User
+
+    async with AsyncSessionLocal() as db:
+        batches = (await db.execute(select(InventoryItem.id, InventoryItem.fhir_medication_id))).all()
+        return {
+            "batches": [tuple(row) for row in batches],
+            "supplier_ids": (await db.execute(select(Organization.id))).scalars().all(),
+            "patient_ids": (await db.execute(select(Patient.id))).scalars().all(),
+            "prescriber": (await db.execute(select(User).limit(1))).scalar_one_or_none(),
+        }
+
+
+# --- Scenarios: each returns (method, url, json body) ---
+
+def checkout_request(data, rng):
+    items = []
+    for sequence in range(1, rng.randint(1, 3) + 1):
+        inventory_item_id, medication_id = rng.choice(data["batches"])
+        items.append({
+            "sequence": sequence,
+            "charge_item": {"code": {"text": "medication"}},
+            "quantity": 1,
+            "unit_price": 12.5,
+            "total_price": 12.5,
+            "medication_id": medication_id,
+            "inventory_item_id": inventory_item_id,
+        })
+    return "POST", "/sales/", {
+        "patient_id": rng.choice(data["patient_ids"]),
+        "payment_method": "cash",
+        "payment_status": "paid",
+        "status": "completed",
+        "sale_items": items,
+    }
+
+
+def receiving_request(data, rng):
+    code = {"system": CODE_SYSTEM, "value": "387517004", "display": "Paracetamol"}
+    quantity = {"value": 100, "unit": "box", "system": "http://unitsofmeasure.org", "code": "1"}
+    now = datetime.utcnow()
+    items = []
+    for sequence in range(1, 4):
+        _, medication_id = rng.choice(data["batches"])
+        items.append({
+            "sequence": sequence, "item": code, "quantity": quantity, "medication_id": medication_id,
+            "quantity_ordered": 100, "quantity_received": 100, "unit_price": 2.5, "total_price": 250.0,
+            "batch_number": f"BENCH-{rng.randrange(10**9)}",
+            "expiration_date": (now + timedelta(days=720)).isoformat(),
+        })
+    supplier_id = rng.choice(data["supplier_ids"])
+    return "POST", "/purchases/", {
+        "status": "completed", "category": code, "priority": "routine", "item": code, "quantity": quantity,
+        "supplier": {"reference": f"Organization/{supplier_id}"},
+        "order_date": now.isoformat(), "expected_delivery_date": (now + timedelta(days=3)).isoformat(),
+        "total_amount": 750.0, "payment_status": "paid", "payment_method": "cash",
+        "supplier_id": supplier_id, "purchase_items": items,
+    }
+
+
+def inventory_request(data, rng):
+    skip = rng.randrange(max(1, len(data["batches"]) - 100))
+    return "GET", f"/inventory/?skip={skip}&limit=100", None
+
+
+def patient_search_request(data, rng):
+    return "GET", f"/fhir/Patient/?last_name={rng.choice(FAMILY_NAMES)}{rng.randrange(100)}", None
+
+
+def prescription_request(data, rng):
+    _, medication_id = rng.choice(data["batches"])
+    patient_id = rng.choice(data["patient_ids"])
+    return "POST", "/prescriptions/", {
+        "identifier": [{"system": "http://example.com/prescriptions", "value": f"RX{rng.randrange(10**9)}"}],
+        "status": "active",
+        "intent": "order",
+        "subject": {"reference": f"Patient/{patient_id}"},
+        "authored_on": datetime.utcnow().isoformat(),
+        "requester": {"reference": f"Practitioner/{data['prescriber'].id}"},
+        "dosage_instruction": [{"sequence": 1, "text": "Take one tablet three times daily"}],
+        "prescription_source": "electronic",
+        "patient_id": patient_id,
+        "prescriber_id": data["prescriber"].id,
+        "medication_id": medication_id,
+    }
+
+
+REQUEST_BUILDERS = {
+    "checkout": checkout_request,
+    "receiving": receiving_request,
+    "inventory": inventory_request,
+    "patient_search": patient_search_request,
+    "prescription": prescription_request,
+}
+
+
+async def run_scenario(client, name, data, args, rng):
+    build = REQUEST_BUILDERS[name]
+    requests = [build(data, rng) for _ in range(args.warmup + args.requests)]
+    warmup, requests = requests[:args.warmup], requests[args.warmup:]
+    for method, url, body in warmup:
+        await client.request(method, url, json=body)
+
+    latencies, errors = [], {}
+    queue = iter(requests)
+
+    async def worker():
+        for method, url, body in queue:
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+    print(f"  {name:<15} {result['throughput_rps']:>9,.1f} req/s  p50 {result['p50_ms']:>8.1f} ms  "
+          f"p95 {result['p95_ms']:>8.1f} ms  p99 {result['p99_ms']:>8.1f} ms  errors {sum(errors.values())}")
+    return result
+
+
+async def run(args):
+    import httpx
+
+    from app.core.auth import current_active_user
+    from app.database import async_engine
+    from app.db.session import engine
+    from main import app
+
+    # echo=True on both engines would make this a logging benchmark
+    async_engine.sync_engine.echo = False
+    engine.sync_engine.echo = False
+
+    rng = random.Random(args.seed)
+    if not args.skip_seed:
+        await seed(args, rng)
+    data = await load_dataset()
+    if not data["batches"] or not data["patient_ids"] or data["prescriber"] is None:
+        raise SystemExit("Database has no inventory, patients or practitioner; run without --skip-seed")
+
+    prescriber = data["prescriber"]
+    app.dependency_overrides[current_active_user] = lambda: prescriber
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{args.requests} requests per scenario, concurrency {args.concurrency}")
+        for name in args.scenarios:
+            results[name] = await run_scenario(client, name, data, args, rng)
+
+    await async_engine.dispose()
+    await engine.dispose()
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("database_url", "output")},
+        "dataset": {
+            "batches": len(data["batches"]),
+            "suppliers": len(data["supplier_ids"]),
+            "patients": len(data["patient_ids"]),
+        },
+        "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="scratch database (defaults to DATABASE_URL)")
+    parser.add_argument("--suppliers", type=int, default=20)
+    parser.add_argument("--medications", type=int, default=500)
+    parser.add_argument("--batches-per-medication", type=int, default=3)
+    parser.add_argument("--patients", type=int, default=5000)
+    parser.add_argument("--sales-per-day", type=int, default=40)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--output", help="results file (default benchmarks/results/workflows-<commit>.json)")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        raise SystemExit("Pass --database-url or set DATABASE_URL")
+    # Both engines read DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = args.database_url
+
+    report = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"workflows-{report['commit'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
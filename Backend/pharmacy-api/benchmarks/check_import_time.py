@@ -0,0 +1,89 @@
+"""Import-time budget check for the API.
+
+Imports `main` in a fresh interpreter with `-X importtime` and fails (exit
+code 1) when the total import time exceeds the budget, or when one of the
+lazily loaded subsystems (OCR, FHIR resource builders, AI, SNOMED lookups)
+is imported at startup. Prints the slowest top-level imports either way.
+
+Usage:
+    python benchmarks/check_import_time.py [--budget-ms 2500] [--top 15] [--repeat 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+API_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Must only be imported on first use, never while importing the app
+LAZY_MODULES = (
+    "pytesseract",
+    "PIL",
+    "cv2",
+    "openai",
+    "fhir.resources",
+    "app.fhir",
+    "pandas",
+)
+
+
+def measure():
+    """Return ({module: (self_us, cumulative_us, depth)}, total_us) for one `import main`."""
+    # Startup must not depend on the email settings being present
+    env = {key: value for key, value in os.environ.items() if not key.startswith("EMAIL_")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=API_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing main failed:\n{result.stderr[-3000:]}")
+
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One separator space, then two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        modules[name] = (int(self_us), int(cumulative_us), depth)
+        if depth == 0:
+            total += int(cumulative_us)
+    return modules, total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=2500)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs (first run warms the .pyc cache)")
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.repeat)]
+    modules, total = min(runs, key=lambda run: run[1])
+
+    print(f"import main: {total / 1000:.0f} ms (best of {args.repeat}, budget {args.budget_ms:.0f} ms)")
+    top_level = sorted(
+        ((cumulative, name) for name, (_, cumulative, depth) in modules.items() if depth == 0), reverse=True
+    )
+    for cumulative, name in top_level[:args.top]:
+        print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+
+    failures = []
+    eager = sorted(
+        name for name in modules
+        if any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+    )
+    if eager:
+        failures.append("imported at startup but should be lazy: " + ", ".join(eager))
+    if total / 1000 > args.budget_ms:
+        failures.append(f"import time {total / 1000:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
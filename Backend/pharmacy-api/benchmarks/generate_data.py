@@ -0,0 +1,342 @@
+"""Deterministic synthetic data generator for scale testing.
+
+Writes FHIR-shaped suppliers (Organization), medications, inventory batches,
+patients and a sales history (Sale + SaleItem) straight into Postgres with
+COPY (asyncpg copy_records_to_table), in chunks, so 10M-row databases take
+minutes rather than hours and never have to fit in memory.
+
+* The same --seed and --end-date produce the same rows. Ids are assigned here,
+  continuing after the current max id of each table, and the id sequences are
+  advanced afterwards, so the app keeps inserting normally. Generate into an
+  empty, migrated database for identical ids across runs.
+* Referential integrity holds: every batch points at a generated medication
+  and supplier, and every sale line points at a generated batch of its medication.
+* Medication popularity is Zipfian (--zipf-s); daily sales volume is seasonal
+  (--seasonal-amplitude, peaking on --peak-day of the year) with a weekend
+  factor (--weekend-factor).
+
+Presets (--scale) size the run by roughly its total row count:
+    10k   2k patients, 500 medications, 3k sales     (~12k rows)
+    1m    100k patients, 5k medications, 300k sales  (~1M rows)
+    10m   1M patients, 20k medications, 3M sales     (~10M rows)
+Any individual count can be overridden.
+
+Usage:
+    python benchmarks/generate_data.py --database-url postgresql+asyncpg://... \\
+        [--scale 1m] [--seed 42] [--patients N] [--sales N] [--zipf-s 1.1] [--no-stock-rebuild]
+"""
+import argparse
+import asyncio
+import bisect
+import json
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+SCALES = {
+    "10k": {"suppliers": 20, "medications": 500, "batches_per_medication": 3, "patients": 2_000, "sales": 3_000},
+    "1m": {"suppliers": 100, "medications": 5_000, "batches_per_medication": 3, "patients": 100_000, "sales": 300_000},
+    "10m": {"suppliers": 500, "medications": 20_000, "batches_per_medication": 4, "patients": 1_000_000, "sales": 3_000_000},
+}
+
+CHUNK_SIZE = 50_000
+CODE_SYSTEM = "http://snomed.info/sct"
+FAMILY_NAMES = ["Hassan", "Mostafa", "Ibrahim", "Mahmoud", "Ali", "Saleh", "Fahmy", "Nasser", "Khalil", "Adel",
+                "Farouk", "Gamal", "Sabry", "Zaki", "Rashad", "Hamdy", "Naguib", "Soliman", "Yousry", "Tawfik"]
+GIVEN_NAMES = ["Omar", "Mona", "Youssef", "Nour", "Karim", "Salma", "Ahmed", "Laila", "Hany", "Dina",
+               "Mariam", "Tarek", "Heba", "Khaled", "Rana", "Amr", "Yasmin", "Sherif", "Aya", "Mohamed"]
+CITIES = ["Cairo", "Giza", "Alexandria", "Mansoura", "Tanta", "Assiut", "Luxor", "Aswan", "Ismailia", "Suez"]
+STREETS = ["Nile St", "Tahrir St", "Ramses St", "Pyramids Rd", "Corniche Rd", "El Horreya Rd"]
+FORMS = ["tablet", "capsule", "syrup", "injection", "cream", "drops"]
+INSURERS = [None, None, "Acme Health", "Nile Insurance", "Delta Care"]
+PAYMENT_METHODS = ["cash", "card", "insurance"]
+PAYMENT_WEIGHTS = list(accumulate([0.55, 0.3, 0.15]))
+LINES_PER_SALE = list(accumulate([0.5, 0.3, 0.15, 0.05]))  # 1..4 lines
+
+
+def chunks(rows, size=CHUNK_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def weighted_index(rng, cum_weights):
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+class Generator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.end = datetime.combine(args.end_date, datetime.min.time())
+        self.base = {}  # table -> first generated id - 1
+
+    # --- Distributions ---
+
+    def medication_popularity(self):
+        """Cumulative Zipf weights over medications, in a seeded random rank order."""
+        ranks = list(range(self.args.medications))
+        self.rng.shuffle(ranks)
+        weights = [1 / (rank + 1) ** self.args.zipf_s for rank in ranks]
+        return list(accumulate(weights))
+
+    def sales_per_day(self):
+        """Split --sales over --days with a yearly seasonal curve and a weekend factor."""
+        weights = []
+        for offset in range(self.args.days):
+            day = self.end - timedelta(days=self.args.days - 1 - offset)
+            season = 1 + self.args.seasonal_amplitude * math.cos(
+                2 * math.pi * (day.timetuple().tm_yday - self.args.peak_day) / 365.25
+            )
+            weekend = self.args.weekend_factor if day.weekday() >= 5 else 1.0
+            weights.append(season * weekend)
+        # Round the running total so the days add up to exactly --sales
+        total = sum(weights)
+        bounds = [round(self.args.sales * c / total) for c in accumulate(weights)]
+        return [b - a for a, b in zip([0] + bounds, bounds)]
+
+    # --- Rows (tuples in COPY column order) ---
+
+    def suppliers(self):
+        for i in range(self.args.suppliers):
+            yield (
+                self.base["organizations"] + i + 1,
+                json.dumps([{"system": "urn:eg:tax-id", "value": f"TAX-{i:06d}"}]),
+                True,
+                json.dumps([{"coding": [{"code": "supplier"}], "text": "supplier"}]),
+                f"Supplier {i}",
+                json.dumps([{"system": "phone", "value": f"+20 2 {self.rng.randrange(10**8):08d}", "use": "work"}]),
+                json.dumps([{"use": "work", "line": [f"{self.rng.randint(1, 200)} {self.rng.choice(STREETS)}"],
+                             "city": self.rng.choice(CITIES), "country": "EG"}]),
+                "supplier",
+                f"LIC-{i:06d}",
+                f"TAX-{i:06d}",
+            )
+
+    def medications(self):
+        for i in range(self.args.medications):
+            yield (
+                self.base["medications"] + i + 1,
+                "Medication",
+                "active",
+                CODE_SYSTEM,
+                str(300000000 + i),
+                f"Medication {i}",
+                json.dumps({"text": self.rng.choice(FORMS)}),
+                json.dumps({"numerator": {"value": self.rng.choice([5, 10, 250, 500, 1000]), "unit": "mg"}}),
+                self.end,
+                self.end,
+            )
+
+    def batch_id(self, medication_index, batch):
+        return self.base["inventory_items"] + medication_index * self.args.batches_per_medication + batch + 1
+
+    def inventory_items(self):
+        for m in range(self.args.medications):
+            medication_id = self.base["medications"] + m + 1
+            for b in range(self.args.batches_per_medication):
+                quantity = self.rng.randint(20, 1000)
+                batch_number = f"M{medication_id}-B{b}"
+                yield (
+                    self.batch_id(m, b),
+                    json.dumps([{"system": "urn:batch", "value": batch_number}]),
+                    "active",
+                    json.dumps({"reference": f"Medication/{medication_id}"}),
+                    json.dumps({"system": CODE_SYSTEM, "value": str(300000000 + m)}),
+                    json.dumps({"value": quantity, "unit": "unit"}),
+                    quantity,
+                    medication_id,
+                    batch_number,
+                    self.end + timedelta(days=self.rng.randint(-30, 1000)),
+                    self.end - timedelta(days=self.rng.randint(1, self.args.days)),
+                    round(self.rng.uniform(0.5, 80), 2),
+                    self.base["organizations"] + self.rng.randrange(self.args.suppliers) + 1,
+                )
+
+    def patients(self):
+        for i in range(self.args.patients):
+            family = self.rng.choice(FAMILY_NAMES)
+            given = self.rng.choice(GIVEN_NAMES)
+            telecom = [{"system": "phone", "value": f"+2010{self.rng.randrange(10**8):08d}", "use": "mobile"}]
+            if self.rng.random() < 0.4:
+                telecom.append({"system": "email", "value": f"{given.lower()}.{family.lower()}{i}@example.com"})
+            insurer = self.rng.choice(INSURERS)
+            yield (
+                self.base["patients"] + i + 1,
+                json.dumps([{"use": "official", "family": family, "given": [given]}]),
+                json.dumps(telecom),
+                json.dumps([{"use": "home", "line": [f"{self.rng.randint(1, 300)} {self.rng.choice(STREETS)}"],
+                             "city": self.rng.choice(CITIES), "postalCode": f"{self.rng.randint(11311, 11999)}",
+                             "country": "EG"}]),
+                date(1935, 1, 1) + timedelta(days=self.rng.randrange(365 * 85)),
+                insurer,
+                f"INS-{i:08d}" if insurer else None,
+                self.end,
+            )
+
+    def sales_and_lines(self, sales_out, lines_out):
+        """Fill sales / sale line tuples day by day (lines need the sale totals first)."""
+        popularity = self.medication_popularity()
+        sale_id = self.base["sales"]
+        line_id = self.base["sale_items"]
+        start = self.end - timedelta(days=self.args.days - 1)
+        for offset, count in enumerate(self.sales_per_day()):
+            day = start + timedelta(days=offset)
+            for _ in range(count):
+                sale_id += 1
+                created = day + timedelta(seconds=self.rng.randrange(8 * 3600, 22 * 3600))
+                total = 0.0
+                for sequence in range(1, weighted_index(self.rng, LINES_PER_SALE) + 2):
+                    m = weighted_index(self.rng, popularity)
+                    quantity = self.rng.randint(1, 3)
+                    unit_price = round(5 + (m % 97) * 1.5, 2)
+                    line_id += 1
+                    total += quantity * unit_price
+                    lines_out.append((
+                        line_id, sequence, json.dumps({"code": {"text": "medication"}}), sale_id, created,
+                        self.base["medications"] + m + 1,
+                        self.batch_id(m, self.rng.randrange(self.args.batches_per_medication)),
+                        quantity, unit_price, round(quantity * unit_price, 2),
+                    ))
+                patient_id = None
+                if self.rng.random() < self.args.registered_share:
+                    patient_id = self.base["patients"] + self.rng.randrange(self.args.patients) + 1
+                sales_out.append((
+                    sale_id, f"INV-SYN-{sale_id:010d}", created, created, patient_id,
+                    PAYMENT_METHODS[weighted_index(self.rng, PAYMENT_WEIGHTS)], "paid",
+                    round(total, 2), "completed",
+                ))
+                if len(sales_out) >= CHUNK_SIZE:
+                    yield
+        yield
+
+
+TABLES = {
+    "organizations": ("id", "identifier", "active", "type", "name", "telecom", "address",
+                      "organization_type", "license_number", "tax_id"),
+    "medications": ("id", "resource_type", "status", "code_system", "code_value", "code_display",
+                    "form", "amount", "created_at", "updated_at"),
+    "inventory_items": ("id", "identifier", "status", "medication", "code", "quantity", "stock_quantity",
+                        "fhir_medication_id", "batch_number", "expiration_date", "purchase_date",
+                        "purchase_price", "supplier_id"),
+    "patients": ("id", "name", "telecom", "address", "birth_date", "insurance_company",
+                 "insurance_number", "updated_at"),
+    "sales": ("id", "invoice_number", "date", "created_at", "patient_id", "payment_method",
+              "payment_status", "total_amount", "status"),
+    "sale_items": ("id", "sequence", "charge_item", "sale_id", "sale_created_at", "medication_id", "inventory_item_id",
+                   "quantity", "unit_price", "total_price"),
+}
+
+
+async def copy_rows(driver, table, rows):
+    count = 0
+    started = time.perf_counter()
+    for batch in chunks(rows):
+        await driver.copy_records_to_table(table, records=batch, columns=TABLES[table])
+        count += len(batch)
+    print(f"  {table:<16} {count:>12,} rows  {count / max(time.perf_counter() - started, 1e-9):>12,.0f} rows/s")
+
+
+async def generate(args):
+    from sqlalchemy import text
+
+    from app.core.partitions import ensure_partitions
+    from app.database import async_engine
+
+    async_engine.sync_engine.echo = False
+    gen = Generator(args)
+    async with async_engine.connect() as conn:
+        for table in TABLES:
+            gen.base[table] = (await conn.execute(text(f"SELECT coalesce(max(id), 0) FROM {table}"))).scalar()
+        # Sales are range-partitioned by month; COPY fails for a month without a partition
+        await ensure_partitions(conn, gen.end - timedelta(days=args.days - 1), gen.end)
+        await conn.commit()
+
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection  # asyncpg.Connection
+        async with driver.transaction():
+            await copy_rows(driver, "organizations", gen.suppliers())
+            await copy_rows(driver, "medications", gen.medications())
+            await copy_rows(driver, "inventory_items", gen.inventory_items())
+            await copy_rows(driver, "patients", gen.patients())
+
+            sales, lines = [], []
+            sale_count = line_count = 0
+            started = time.perf_counter()
+            for _ in gen.sales_and_lines(sales, lines):
+                await driver.copy_records_to_table("sales", records=sales, columns=TABLES["sales"])
+                await driver.copy_records_to_table("sale_items", records=lines, columns=TABLES["sale_items"])
+                sale_count += len(sales)
+                line_count += len(lines)
+                sales.clear()
+                lines.clear()
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            print(f"  {'sales':<16} {sale_count:>12,} rows  {'sale_items':<12} {line_count:>12,} rows  "
+                  f"{(sale_count + line_count) / elapsed:>12,.0f} rows/s")
+
+            # Ids were assigned here, so move the sequences past them
+            for table in TABLES:
+                await driver.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"(SELECT greatest(coalesce(max(id), 0), 1) FROM {table}))"
+                )
+
+        for table in TABLES:
+            await driver.execute(f"ANALYZE {table}")
+
+    if args.stock_rebuild:
+        from app.core.stock import rebuild_stock_on_hand
+        from app.database import AsyncSessionLocal
+
+        async with AsyncSessionLocal() as db:
+            rebuilt = await rebuild_stock_on_hand(db)
+            await db.commit()
+        print(f"  rebuilt stock-on-hand for {rebuilt} medications")
+
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="defaults to DATABASE_URL")
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=date(2025, 12, 31),
+                        help="last day of sales history (fixed by default so runs are reproducible)")
+    parser.add_argument("--days", type=int, default=365)
+    for name in SCALES["10k"]:
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, help=f"override the preset's {name}")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent of medication popularity")
+    parser.add_argument("--seasonal-amplitude", type=float, default=0.3, help="0 = flat, 0.3 = +/-30%%")
+    parser.add_argument("--peak-day", type=int, default=15, help="day of year with the most sales (flu season)")
+    parser.add_argument("--weekend-factor", type=float, default=0.8)
+    parser.add_argument("--registered-share", type=float, default=0.6, help="share of sales with a patient")
+    parser.add_argument("--no-stock-rebuild", dest="stock_rebuild", action="store_false")
+    args = parser.parse_args()
+
+    for name, value in SCALES[args.scale].items():
+        if getattr(args, name) is None:
+            setattr(args, name, value)
+    if not args.database_url:
+        raise SystemExit("Pass --database-url or set DATABASE_URL")
+    os.environ["DATABASE_URL"] = args.database_url
+
+    print(f"Generating scale {args.scale} with seed {args.seed}")
+    started = time.perf_counter()
+    asyncio.run(generate(args))
+    print(f"Done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+pytest_plugins = ["pytester", "app.utils.pytest_query_budget"]
@@ -0,0 +1,31 @@
+"""Gunicorn settings for running the API with several worker processes.
+
+Usage:
+    WEB_CONCURRENCY=4 SHARED_STATE_URL=redis://localhost:6379/0 \\
+        gunicorn main:app -c gunicorn_conf.py
+
+Each worker is a separate process with its own connection pools (two engines,
+up to 15 connections each), so size Postgres max_connections for
+WEB_CONCURRENCY x 30. Prometheus metrics and the auth user cache are kept per
+worker; everything else that must be seen by all workers goes through
+SHARED_STATE_URL.
+"""
+import os
+
+from app.core.config import settings
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+# Startup warmup opens pool connections and fills the caches before serving
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+
+def on_starting(server):
+    if server.cfg.workers > 1 and not settings.SHARED_STATE_URL:
+        raise RuntimeError(
+            "SHARED_STATE_URL must be set when running more than one worker: verification codes, "
+            "export jobs and change events would otherwise be visible to one worker only"
+        )
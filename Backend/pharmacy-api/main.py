@@ -1,4 +1,6 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
 # Import routers
@@ -15,7 +17,26 @@ from app.routes.medication_request import router as medication_request_router
 from app.routes.user import router as user_router
 from app.routes.medication_dispenses import router as medication_dispense_router
 from app.routes.inventory import router as inventory_router
+from app.routes.events import router as events_router
+from app.routes.bundle import router as bundle_router
+from app.routes.export import router as export_router
+from app.routes.bulk_import import router as bulk_import_router
+from app.routes.health import router as health_router
 from app.api.v1.endpoints.auth import router as custom_auth_router
+from app.api.v1.endpoints.medicine_database import router as medicine_database_router
+from app.core.security import shutdown_password_executor
+from app.core.alerts import alert_engine
+from app.core.events import event_bus
+from app.core.ledger import run_snapshots_periodically
+from app.core.partitions import run_maintenance_periodically
+from app.core.archive import run_archival_periodically
+from app.core.export import export_manager
+from app.core.response_cache import response_cache
+from app.core.metrics import MetricsMiddleware, metrics
+from app.core.query_diagnostics import QueryDiagnosticsMiddleware
+from app.core.health import warm_up
+from app.core.config import settings
+from app.database import AsyncSessionLocal, async_engine
 
 app = FastAPI(
     title="Pharmacy System API",
@@ -50,6 +71,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, DB time / query count and response size, served on /metrics
+app.add_middleware(MetricsMiddleware)
+# Slow-query log and N+1 warnings, only active with QUERY_DIAGNOSTICS=true
+app.add_middleware(QueryDiagnosticsMiddleware)
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(patient_router)
@@ -64,10 +90,57 @@ app.include_router(medication_request_router)
 app.include_router(user_router)
 app.include_router(medication_dispense_router)
 app.include_router(inventory_router)
+app.include_router(events_router)
+app.include_router(bundle_router)
+app.include_router(export_router)
+app.include_router(bulk_import_router)
+app.include_router(health_router)
 app.include_router(custom_auth_router, prefix="/auth")
+app.include_router(medicine_database_router, prefix="/medicine-database", tags=["medicine-database"])
+
+@app.on_event("startup")
+async def warm_up_before_serving():
+    # Runs before the server accepts connections; readiness reports 503 until it's done
+    app.state.warmed_up = False
+    if settings.WARMUP_ENABLED:
+        app.state.warmup = await warm_up(app)
+    app.state.warmed_up = True
+
+@app.on_event("startup")
+async def start_background_tasks():
+    app.state.alert_task = asyncio.create_task(
+        alert_engine.run_periodically(AsyncSessionLocal, settings.ALERT_SCAN_INTERVAL_SECONDS)
+    )
+    app.state.event_relay_task = asyncio.create_task(event_bus.relay_from_other_workers())
+    app.state.stock_snapshot_task = asyncio.create_task(
+        run_snapshots_periodically(AsyncSessionLocal, settings.STOCK_SNAPSHOT_INTERVAL_SECONDS)
+    )
+    app.state.partition_task = asyncio.create_task(
+        run_maintenance_periodically(async_engine, settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+    )
+    app.state.archival_task = asyncio.create_task(
+        run_archival_periodically(AsyncSessionLocal, settings.ARCHIVE_INTERVAL_SECONDS)
+    )
+
+@app.on_event("shutdown")
+async def shutdown_background_tasks():
+    app.state.alert_task.cancel()
+    app.state.event_relay_task.cancel()
+    app.state.stock_snapshot_task.cancel()
+    app.state.partition_task.cancel()
+    app.state.archival_task.cancel()
+    export_manager.shutdown()
+    shutdown_password_executor()
 
 # Health check
 @app.get("/api/health", tags=["System"], summary="Health check")
 def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
+@app.get("/api/cache/stats", tags=["System"], summary="Response cache statistics")
+def cache_stats():
+    return response_cache.stats()
+
+@app.get("/metrics", tags=["System"], summary="Prometheus metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.expose(), media_type="text/plain; version=0.0.4")
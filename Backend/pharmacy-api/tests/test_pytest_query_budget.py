@@ -0,0 +1,71 @@
+import pytest
+
+INNER_TESTS = """
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.core.query_diagnostics import diagnostics, track_queries
+
+engine = create_engine("sqlite://")
+
+
+def run_queries(count):
+    with engine.connect() as conn:
+        for _ in range(count):
+            conn.execute(text("SELECT 1"))
+
+
+def request(endpoint, count):
+    # What QueryDiagnosticsMiddleware does around each request
+    with track_queries() as tracker:
+        run_queries(count)
+    diagnostics.finish_request(endpoint, tracker)
+
+
+@pytest.mark.query_budget(3)
+def test_request_within_budget():
+    request("GET /sales/", 3)
+
+
+@pytest.mark.query_budget(3)
+def test_request_over_budget():
+    request("GET /sales/", 4)
+
+
+@pytest.mark.query_budget(10, endpoints={"POST /purchases/": 2})
+def test_endpoint_over_its_own_budget():
+    request("GET /sales/", 5)
+    request("POST /purchases/", 3)
+
+
+def test_block_within_budget(query_budget):
+    with query_budget(2):
+        run_queries(2)
+
+
+def test_block_over_budget(query_budget):
+    with query_budget(2):
+        run_queries(3)
+"""
+
+
+@pytest.fixture
+def inner(pytester):
+    pytester.makeconftest('pytest_plugins = ["app.utils.pytest_query_budget"]')
+    pytester.makepyfile(INNER_TESTS)
+    return pytester.runpytest("-p", "no:cacheprovider")
+
+
+def test_budgets_pass_and_fail(inner):
+    inner.assert_outcomes(passed=2, failed=3)
+
+
+def test_failures_name_the_endpoint_and_statement(inner):
+    inner.stdout.fnmatch_lines([
+        "*GET /sales/ ran 4 queries (budget 3):*",
+        "*POST /purchases/ ran 3 queries (budget 2):*",
+        "*block ran 3 queries (budget 2):*",
+        "*3x SELECT ?*",
+    ])
+    assert "test_endpoint_over_its_own_budget" in inner.stdout.str()
+    assert "GET /sales/ ran 5 queries" not in inner.stdout.str()